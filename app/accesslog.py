@@ -0,0 +1,189 @@
+# accesslog.py
+"""
+Log de accesos estructurado (una línea JSON por petición).
+
+Cada entrada tiene la ruta, el estado, la duración, el tiempo y número de
+consultas en la base de datos, los bytes de la respuesta y el usuario
+autenticado. El hilo de la petición solo encola el registro: un
+QueueListener en segundo plano lo convierte a JSON y lo escribe en
+Config.ACCESS_LOG ("-" para stdout). Si la cola se llena los registros se
+descartan y se cuentan en la métrica access_log_dropped_total, de modo que
+un disco lento nunca frena una petición.
+
+Los GET y HEAD exitosos, que son la mayoría del tráfico, se muestrean con
+Config.ACCESS_LOG_SAMPLE_RATE; cada entrada indica la tasa con la que se
+muestreó para poder reponderar los conteos. Los errores (estado >= 400),
+las peticiones lentas y los demás métodos se registran siempre.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from flask import Flask, g, request
+from app.config import Config
+from app.metrics import ACCESS_LOG_DROPPED, UNMATCHED_ROUTE
+
+SAMPLED_METHODS = ("GET", "HEAD")
+
+logger = logging.getLogger("app.access")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+class AccessLogFormatter(logging.Formatter):
+    """Convierte la entrada de un registro de acceso en una línea JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")}
+        entry.update(getattr(record, "access", None) or {"message": record.getMessage()})
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler que descarta los registros si la cola está llena.
+
+    Los descartes se cuentan en access_log_dropped_total (GET /metrics).
+    """
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            ACCESS_LOG_DROPPED.inc()
+
+
+_handler = None
+_listener = None
+_lock = threading.Lock()
+
+
+def _forget_listener():
+    # El hilo del listener no existe en el proceso hijo
+    global _handler, _listener, _lock
+    if _handler is not None:
+        logger.removeHandler(_handler)
+    _handler = _listener = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_listener)
+
+
+def _target_handler() -> logging.Handler:
+    if Config.ACCESS_LOG == "-":
+        handler = logging.StreamHandler(sys.stdout)
+    else:
+        # Reabre el archivo si logrotate lo mueve
+        handler = WatchedFileHandler(Config.ACCESS_LOG, encoding="utf-8")
+    handler.setFormatter(AccessLogFormatter())
+    return handler
+
+
+def get_access_handler() -> DroppingQueueHandler:
+    """Handler del log de accesos; el listener arranca en el primer uso de cada proceso"""
+    global _handler, _listener
+    handler = _handler
+    if handler is not None:
+        return handler
+    with _lock:
+        if _handler is None:
+            log_queue = queue.Queue(Config.ACCESS_LOG_QUEUE_SIZE)
+            _listener = QueueListener(log_queue, _target_handler())
+            _listener.start()
+            _handler = DroppingQueueHandler(log_queue)
+            logger.addHandler(_handler)
+        return _handler
+
+
+def stop_access_log():
+    """Escribe los registros pendientes y detiene el listener, si existe"""
+    global _handler, _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            logger.removeHandler(_handler)
+        _handler = _listener = None
+
+
+atexit.register(stop_access_log)
+
+
+def sample_rate(method: str, status: int, seconds: float) -> float:
+    """Fracción de las peticiones como esta que se registran"""
+    if status >= 400 or 0 < Config.ACCESS_LOG_SLOW_MS <= seconds * 1000:
+        return 1.0
+    if method in SAMPLED_METHODS:
+        return Config.ACCESS_LOG_SAMPLE_RATE
+    return 1.0
+
+
+def log_access(method: str, route: str, path: str, status: int, seconds: float, stats=None,
+               response_bytes: int = None, user_id: str = None, trace_id: str = None):
+    """
+    Registra una petición en el log de accesos, si le toca según el muestreo.
+
+    Args:
+        stats (QueryStats, opcional): Consultas de la petición.
+        response_bytes (int, opcional): Tamaño del cuerpo, si se conoce.
+        user_id (str, opcional): Usuario autenticado.
+        trace_id (str, opcional): Traza de la petición.
+    """
+    if not Config.ACCESS_LOG:
+        return
+    rate = sample_rate(method, status, seconds)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    entry = {
+        "method": method,
+        "route": route,
+        "path": path,
+        "status": status,
+        "duration_ms": round(seconds * 1000, 3),
+        "db_ms": round(stats.milliseconds, 3) if stats is not None else None,
+        "db_queries": stats.count if stats is not None else None,
+        "bytes": response_bytes,
+        "user_id": user_id,
+        "sample_rate": rate,
+    }
+    if trace_id:
+        entry["trace_id"] = trace_id
+    get_access_handler()
+    logger.info("%s %s %s", method, path, status, extra={"access": entry})
+
+
+def init_access_log(app: Flask):
+    """
+    Registra el log de accesos en la aplicación.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    @app.before_request
+    def _start_access_timer():
+        g.access_started = time.perf_counter()
+
+    @app.after_request
+    def _log_access(response):
+        started = g.get("access_started")
+        if not Config.ACCESS_LOG or started is None:
+            return response
+        rule = request.url_rule
+        user = g.get("user")
+        trace_root = g.get("trace_root")
+        log_access(
+            request.method, rule.rule if rule is not None else UNMATCHED_ROUTE, request.path,
+            response.status_code, time.perf_counter() - started, g.get("query_stats"),
+            response.content_length, user.get("sub") if user else None,
+            trace_root.trace.trace_id if trace_root is not None else None,
+        )
+        return response
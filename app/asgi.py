@@ -0,0 +1,207 @@
+# asgi.py
+"""
+Modo de servicio ASGI con consultas asíncronas.
+
+Las rutas de lectura más usadas (listado y detalle de lugares, conteos y
+comentarios) se atienden en el event loop con un engine asíncrono de
+SQLAlchemy (asyncpg en PostgreSQL, aiosqlite en SQLite), de modo que un
+worker puede tener muchas consultas en vuelo mientras espera a la base de
+datos. El resto de la API sigue siendo la aplicación Flask, que se ejecuta
+en un pool de hilos. Las respuestas se serializan con los mismos modelos de
+flask-restx, así que ambos modos retornan el mismo JSON.
+
+Las lecturas asíncronas no pasan por los hooks de Flask: tienen métricas,
+Server-Timing y log de accesos, pero no trazas, perfilado por petición ni
+muestreo continuo de pilas. Las rutas que delegan a Flask sí los tienen.
+"""
+import json
+import re
+import time
+from urllib.parse import parse_qs
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from flask_restx import marshal
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from app.config import Config
+from app.db.models import Place, Comment
+from app.accesslog import log_access
+from app.metrics import IN_FLIGHT, observe_request
+from app.querystats import log_request, server_timing, track_queries
+from app.routes.comments import comment_to_dict
+from app.routes.places import latest_comments_query, place_detail, place_summary
+
+# Driver asíncrono por backend
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+COUNT_CATEGORIES = ("Desayunos y Comidas", "Bebidas y Cafetería", "Snacks")
+
+
+def async_database_uri(uri: str) -> str:
+    """
+    URI del engine asíncrono equivalente a una URI síncrona.
+
+    Config.ASYNC_DATABASE_URI tiene prioridad, por ejemplo para pasar
+    opciones de conexión propias de asyncpg.
+
+    Raises:
+        ValueError: Si el backend no tiene un driver asíncrono conocido.
+    """
+    if Config.ASYNC_DATABASE_URI:
+        return Config.ASYNC_DATABASE_URI
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay un driver asíncrono para {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    """Adaptador WSGI a ASGI que atiende varias peticiones en paralelo"""
+
+    async def __call__(self, scope, receive, send):
+        # asgiref ejecuta la app WSGI en un único hilo compartido (thread_sensitive); dentro
+        # de un ThreadSensitiveContext cada petición tiene su propio hilo. Flask es seguro entre hilos
+        async with ThreadSensitiveContext():
+            await super().__call__(scope, receive, send)
+
+
+class AsyncReadApp:
+    """
+    Aplicación ASGI: lecturas asíncronas y el resto delegado a Flask.
+
+    Args:
+        flask_app (Flask): Aplicación Flask completa.
+        api (Api): API de flask-restx con los modelos de respuesta.
+        engine (AsyncEngine, opcional): Engine asíncrono (por defecto se crea
+            a partir de SQLALCHEMY_DATABASE_URI de la aplicación).
+    """
+
+    def __init__(self, flask_app, api, engine=None):
+        self.fallback = ThreadedWsgiToAsgi(flask_app)
+        self.models = api.models
+        self.engine = engine or create_async_engine(
+            async_database_uri(flask_app.config["SQLALCHEMY_DATABASE_URI"]),
+            pool_size=Config.ASYNC_POOL_SIZE,
+            pool_pre_ping=True
+        )
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        # (patrón, manejador, modelo de respuesta, ruta equivalente de Flask para las métricas)
+        self.routes = (
+            (re.compile(r"^/api/places$"), self.list_places, "Place", "/api/places"),
+            (re.compile(r"^/api/places/counts$"), self.count_places, "PlaceCounts", "/api/places/counts"),
+            (re.compile(r"^/api/places/(?P<place_id>[^/]+)$"), self.get_place, "Place",
+             "/api/places/<string:place_id>"),
+            (re.compile(r"^/api/places/(?P<place_id>[^/]+)/comments$"), self.list_comments, "Comment",
+             "/api/places/<string:place_id>/comments"),
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+
+        if scope["type"] == "http" and scope["method"] == "GET":
+            for pattern, handler, model, route in self.routes:
+                match = pattern.match(scope["path"])
+                if match:
+                    started = time.perf_counter()
+                    args = parse_qs(scope["query_string"].decode("latin-1"))
+                    IN_FLIGHT.inc()
+                    try:
+                        with track_queries() as stats:
+                            data, status = await handler(args, **match.groupdict())
+                    finally:
+                        IN_FLIGHT.dec()
+                    total = time.perf_counter() - started
+                    observe_request(route, "GET", status, total)
+                    log_request("GET", scope["path"], status, stats, total)
+                    headers = [(b"server-timing", server_timing(stats, total).encode())] if Config.SERVER_TIMING else []
+                    sent = await self._send_json(scope, send, marshal(data, self.models[model]), status, headers)
+                    log_access("GET", route, scope["path"], status, total, stats, sent)
+                    return
+
+        await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _send_json(self, scope, send, data, status, extra_headers=()):
+        body = (json.dumps(data) + "\n").encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *extra_headers,
+        ]
+        # Mismo comportamiento que flask-cors con la configuración por defecto
+        origin = dict(scope["headers"]).get(b"origin")
+        if origin:
+            headers += [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+        else:
+            headers.append((b"access-control-allow-origin", b"*"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+        return len(body)
+
+    async def list_places(self, args):
+        """GET /api/places"""
+        category = args.get("category", [None])[0]
+        if category and category.lower() == "all":
+            category = None
+        query = select(Place).options(selectinload(Place.menu_items))
+        if category:
+            query = query.where(Place.category == category)
+        async with self.sessions() as session:
+            places = (await session.scalars(query)).all()
+            latest = dict((await session.execute(latest_comments_query(category))).all())
+            return [place_summary(p, latest.get(p.id, "")) for p in places], 200
+
+    async def count_places(self, args):
+        """GET /api/places/counts"""
+        query = select(Place.category, func.count()).group_by(Place.category)
+        async with self.sessions() as session:
+            by_category = dict((await session.execute(query)).all())
+        counts = {"all": sum(by_category.values())}
+        counts.update({category: by_category.get(category, 0) for category in COUNT_CATEGORIES})
+        return counts, 200
+
+    async def get_place(self, args, place_id):
+        """GET /api/places/<place_id>"""
+        async with self.sessions() as session:
+            p = await session.get(Place, place_id, options=[selectinload(Place.menu_items)])
+            if not p:
+                return {"error": "Place not found"}, 404
+            return place_detail(p), 200
+
+    async def list_comments(self, args, place_id):
+        """GET /api/places/<place_id>/comments"""
+        async with self.sessions() as session:
+            place = await session.get(
+                Place, place_id,
+                options=[selectinload(Place.comments).selectinload(Comment.user)]
+            )
+            if not place:
+                return {"error": "Place not found"}, 404
+            return [comment_to_dict(c) for c in place.comments], 200
+
+
+def create_asgi_app(flask_app, api=None, engine=None) -> AsyncReadApp:
+    """
+    Crea la aplicación ASGI a partir de la aplicación Flask.
+
+    Args:
+        flask_app (Flask): Aplicación creada con create_app().
+        api (Api, opcional): API de flask-restx (por defecto flask_app.extensions["api"]).
+        engine (AsyncEngine, opcional): Engine asíncrono a usar.
+
+    Returns:
+        AsyncReadApp: Aplicación ASGI.
+    """
+    return AsyncReadApp(flask_app, api or flask_app.extensions["api"], engine=engine)
@@ -0,0 +1,152 @@
+"""
+Comandos de línea de comandos (flask <comando>)
+"""
+import os
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from app.datagen import generate_dataset
+from app.exporter import EXPORTS, export_ndjson, parse_since
+from app.importer import detect_format, import_catalog
+from app.passwords import set_auto_pool_size
+from app.roster import register_students
+from app.server import serve
+from app.sweeper import ACTIONS, sweep_uploads
+
+
+@click.command("import-catalog")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Formato del archivo (por defecto se deduce de la extensión).")
+@click.option("--workers", type=int, help="Procesos para validar las filas.")
+@click.option("--batch-size", type=int, help="Filas por transacción.")
+@with_appcontext
+def import_catalog_command(path, fmt, workers, batch_size):
+    """Importa lugares y menús desde un archivo CSV o JSONL."""
+    fmt = fmt or detect_format(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        report = import_catalog(f, fmt, workers=workers, batch_size=batch_size)
+
+    for error in report["errors"]:
+        click.echo(f"Fila {error['row']}: {error['error']}", err=True)
+
+    click.echo(
+        f"{report['places']} lugares y {report['menu_items']} platillos importados "
+        f"en {report['elapsed_seconds']}s ({report['rows_per_second']} filas/s), "
+        f"{len(report['errors'])} errores"
+    )
+
+
+@click.command("export")
+@click.argument("entity", type=click.Choice(sorted(EXPORTS)))
+@click.option("--since", help="Solo filas creadas o modificadas desde esta fecha (ISO 8601); no incluye las eliminadas.")
+@click.option("--output", "-o", type=click.File("w", encoding="utf-8"), default="-", help="Archivo de salida (por defecto stdout).")
+@with_appcontext
+def export_command(entity, since, output):
+    """Exporta una entidad en formato NDJSON."""
+    try:
+        since = parse_since(since)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--since")
+
+    for chunk in export_ndjson(entity, since=since):
+        output.write(chunk)
+
+
+@click.command("register-students")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Formato del archivo (por defecto se deduce de la extensión).")
+@click.option("--batch-size", type=int, help="Usuarios por transacción.")
+@with_appcontext
+def register_students_command(path, fmt, batch_size):
+    """Registra estudiantes desde una lista CSV (name,email,password) o JSONL."""
+    # El comando es el único proceso: puede usar todos los núcleos para los hashes
+    set_auto_pool_size(os.cpu_count() or 1)
+    fmt = fmt or detect_format(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        report = register_students(f, fmt, batch_size=batch_size)
+
+    for error in report["errors"]:
+        click.echo(f"Fila {error['row']}: {error['error']}", err=True)
+    for conflict in report["conflicts"]:
+        click.echo(f"Fila {conflict['row']}: {conflict['email']}: {conflict['error']}", err=True)
+
+    click.echo(
+        f"{report['registered']} estudiantes registrados de {report['rows']} filas "
+        f"en {report['elapsed_seconds']}s ({report['rows_per_second']} usuarios/s, "
+        f"{report['hash_seconds']}s en hashes), {len(report['errors'])} errores, "
+        f"{len(report['conflicts'])} conflictos"
+    )
+
+
+@click.command("sweep-uploads")
+@click.option("--apply", is_flag=True, help="Retira los huérfanos (por defecto solo se reportan).")
+@click.option("--action", type=click.Choice(ACTIONS), help="Mover a cuarentena o eliminar.")
+@click.option("--grace-hours", type=float, help="Antigüedad mínima de los archivos a retirar.")
+@click.option("--batch-size", type=int, help="Archivos revisados por consulta.")
+@with_appcontext
+def sweep_uploads_command(apply, action, grace_hours, batch_size):
+    """Busca archivos subidos que ningún lugar referencia."""
+    grace_seconds = None if grace_hours is None else int(grace_hours * 3600)
+    report = sweep_uploads(dry_run=not apply, action=action, grace_seconds=grace_seconds, batch_size=batch_size)
+
+    for name in report["orphans"]:
+        click.echo(name)
+
+    verb = "retirados" if apply else "por retirar (simulación)"
+    click.echo(
+        f"{report['scanned']} archivos revisados en {report['elapsed_seconds']}s: "
+        f"{report['referenced']} en uso, {report['recent']} recientes, "
+        f"{len(report['orphans'])} huérfanos {verb} ({report['orphaned_bytes']} bytes, acción: {report['action']})",
+        err=True
+    )
+
+
+@click.command("generate-data")
+@click.option("--users", type=int, default=1000, show_default=True, help="Usuarios a crear.")
+@click.option("--places", type=int, default=100, show_default=True, help="Lugares a crear.")
+@click.option("--comments", type=int, default=100000, show_default=True, help="Comentarios en total.")
+@click.option("--seed", type=int, default=0, show_default=True, help="Semilla del generador.")
+@click.option("--zipf", type=float, default=1.1, show_default=True, help="Exponente de Zipf de los comentarios por lugar.")
+@click.option("--batch-size", type=int, help="Filas por transacción.")
+@with_appcontext
+def generate_data_command(users, places, comments, seed, zipf, batch_size):
+    """Llena la base de datos con datos sintéticos para benchmarks."""
+    try:
+        report = generate_dataset(users, places, comments, seed=seed, zipf=zipf, batch_size=batch_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"{report['users']} usuarios, {report['places']} lugares, {report['menu_items']} platillos y "
+        f"{report['comments']} comentarios generados en {report['elapsed_seconds']}s "
+        f"({report['comments_per_second']} comentarios/s)"
+    )
+
+
+@click.command("serve")
+@click.option("--bind", "-b", help="Dirección de escucha (por defecto WEB_BIND).")
+@click.option("--workers", "-w", type=int, help="Procesos (por defecto 2 por núcleo + 1).")
+@click.option("--threads", type=int, help="Hilos por worker (por defecto WEB_THREADS).")
+@click.option("--asgi", is_flag=True, help="Servir el modo ASGI con workers de uvicorn.")
+@with_appcontext
+def serve_command(bind, workers, threads, asgi):
+    """Sirve la aplicación en producción con gunicorn."""
+    try:
+        serve(current_app._get_current_object(), bind=bind, workers=workers, threads=threads, asgi=asgi)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+
+def register_commands(app: Flask):
+    """
+    Registra todos los comandos de la aplicación.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    app.cli.add_command(import_catalog_command)
+    app.cli.add_command(export_command)
+    app.cli.add_command(register_students_command)
+    app.cli.add_command(sweep_uploads_command)
+    app.cli.add_command(generate_data_command)
+    app.cli.add_command(serve_command)
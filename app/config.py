@@ -15,13 +15,158 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or LOCAL_DB_URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Modo ASGI: URI del engine asíncrono (vacío = la anterior con asyncpg/aiosqlite)
+    ASYNC_DATABASE_URI = os.environ.get("ASYNC_DATABASE_URI", "")
+    ASYNC_POOL_SIZE = int(os.environ.get("ASYNC_POOL_SIZE", 20))
+    
+    # Servidor de producción (flask --app main serve)
+    WEB_BIND = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+    # Workers del servidor (0 = 2 por núcleo + 1)
+    WEB_WORKERS = int(os.environ.get("WEB_WORKERS", 0))
+    WEB_THREADS = int(os.environ.get("WEB_THREADS", 4))
+    WEB_TIMEOUT = int(os.environ.get("WEB_TIMEOUT", 30))
+    # Rutas que cada worker pide al arrancar, separadas por comas
+    WARMUP_PATHS = os.environ.get("WARMUP_PATHS", "/api/places/counts,/api/places")
+
+    # Observabilidad: encabezado Server-Timing y aviso en el log si una petición excede las consultas
+    SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") == "1"
+    QUERY_COUNT_WARN = int(os.environ.get("QUERY_COUNT_WARN", 50))
+    # Endpoint /metrics de Prometheus (con gunicorn, definir también PROMETHEUS_MULTIPROC_DIR)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    # Perfilado de una petición con X-Profile: <token> (vacío = deshabilitado)
+    PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+    PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "..", "profiles"))
+    # pstats (cProfile) o speedscope (muestreo)
+    PROFILE_FORMAT = os.environ.get("PROFILE_FORMAT", "pstats")
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", 1))
+    # Muestreo continuo de pilas, consultable en /api/admin/profile/stacks
+    SAMPLER_ENABLED = os.environ.get("SAMPLER_ENABLED", "0") == "1"
+    SAMPLER_INTERVAL_MS = float(os.environ.get("SAMPLER_INTERVAL_MS", 10))
+    SAMPLER_MAX_STACKS = int(os.environ.get("SAMPLER_MAX_STACKS", 5000))
+    SAMPLER_MAX_DEPTH = int(os.environ.get("SAMPLER_MAX_DEPTH", 64))
+    # Directorio compartido para combinar las pilas de todos los workers (vacío = solo el proceso)
+    SAMPLER_DIR = os.environ.get("SAMPLER_DIR", "")
+    SAMPLER_FLUSH_SECONDS = float(os.environ.get("SAMPLER_FLUSH_SECONDS", 10))
+    # Estadísticas por huella de consulta (/api/admin/queries) y registro de consultas lentas
+    QUERY_FINGERPRINTS = os.environ.get("QUERY_FINGERPRINTS", "1") == "1"
+    QUERY_FINGERPRINTS_MAX = int(os.environ.get("QUERY_FINGERPRINTS_MAX", 1000))
+    # Milisegundos a partir de los cuales una consulta es lenta (0 = no registrar)
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+    # Segundos mínimos entre dos EXPLAIN de la misma consulta (solo PostgreSQL)
+    SLOW_QUERY_EXPLAIN_INTERVAL = int(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+    # Trazas en formato Zipkin: archivo JSON (un span por línea) y/o collector (vacíos = deshabilitado)
+    TRACE_FILE = os.environ.get("TRACE_FILE", "")
+    TRACE_COLLECTOR_URL = os.environ.get("TRACE_COLLECTOR_URL", "")
+    # Fracción de peticiones que se trazan (las de llamadores de confianza siguen su traceparent)
+    TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 1.0))
+    # Obedecer la marca "muestreada" de un traceparent recibido (solo detrás de servicios propios)
+    TRACE_TRUST_INCOMING = os.environ.get("TRACE_TRUST_INCOMING", "0") == "1"
+    # Trazas pendientes de exportar antes de empezar a descartar
+    TRACE_QUEUE_SIZE = int(os.environ.get("TRACE_QUEUE_SIZE", 1000))
+    # Log de accesos en JSON: "-" = stdout, una ruta = archivo, vacío = deshabilitado
+    ACCESS_LOG = os.environ.get("ACCESS_LOG", "")
+    # Fracción de los GET/HEAD exitosos que se registran; errores y peticiones lentas siempre
+    ACCESS_LOG_SAMPLE_RATE = float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", 0.1))
+    # Milisegundos a partir de los cuales una petición es lenta (0 = sin excepción por lentitud)
+    ACCESS_LOG_SLOW_MS = float(os.environ.get("ACCESS_LOG_SLOW_MS", 1000))
+    # Registros pendientes de escribir antes de empezar a descartar
+    ACCESS_LOG_QUEUE_SIZE = int(os.environ.get("ACCESS_LOG_QUEUE_SIZE", 10000))
     
     # Uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "..", "uploads")
     ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+    MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))
+    # Margen para los demás campos del formulario multipart
+    MAX_CONTENT_LENGTH = MAX_UPLOAD_SIZE + 1024 * 1024
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    # Backend de almacenamiento: "local" o "s3"
+    STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local")
+    # Lectura desde S3: "presigned" (redirección a una URL firmada) o "proxy"
+    STORAGE_READ_MODE = os.environ.get("STORAGE_READ_MODE", "presigned")
+    S3_BUCKET = os.environ.get("S3_BUCKET", "")
+    S3_PREFIX = os.environ.get("S3_PREFIX", "uploads/")
+    # Para MinIO u otros servicios compatibles, p. ej. http://localhost:9000
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL", "")
+    S3_REGION = os.environ.get("S3_REGION", "")
+    S3_MULTIPART_THRESHOLD = int(os.environ.get("S3_MULTIPART_THRESHOLD", 8 * 1024 * 1024))
+    S3_MAX_CONCURRENCY = int(os.environ.get("S3_MAX_CONCURRENCY", 10))
+    S3_PRESIGNED_EXPIRES = int(os.environ.get("S3_PRESIGNED_EXPIRES", 3600))
+    # Delegar el envío de archivos al proxy: "", "x-accel-redirect" o "x-sendfile"
+    UPLOAD_OFFLOAD = os.environ.get("UPLOAD_OFFLOAD", "")
+    # Location interna de nginx que apunta a UPLOAD_FOLDER
+    UPLOAD_ACCEL_PREFIX = os.environ.get("UPLOAD_ACCEL_PREFIX", "/_protected_uploads/")
+    RESIZE_ACCEL_PREFIX = os.environ.get("RESIZE_ACCEL_PREFIX", "/_protected_resized/")
+    # Barrido de uploads huérfanos (flask sweep-uploads)
+    UPLOAD_GC_GRACE_SECONDS = int(os.environ.get("UPLOAD_GC_GRACE_SECONDS", 24 * 3600))
+    UPLOAD_GC_BATCH_SIZE = int(os.environ.get("UPLOAD_GC_BATCH_SIZE", 500))
+    # "quarantine" (mover a UPLOAD_QUARANTINE_DIR, recuperable) o "delete"
+    UPLOAD_GC_ACTION = os.environ.get("UPLOAD_GC_ACTION", "quarantine")
+    UPLOAD_QUARANTINE_DIR = os.environ.get("UPLOAD_QUARANTINE_DIR", "quarantine")
+    
+    # Procesamiento de imágenes (miniaturas y placeholder)
+    IMAGE_PROCESSING = os.environ.get("IMAGE_PROCESSING", "1") == "1"
+    IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", 2))
+    IMAGE_VARIANT_FORMAT = os.environ.get("IMAGE_VARIANT_FORMAT", "webp")
+    IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", 80))
+    IMAGE_THUMBNAIL_SIZES = {"sm": 160, "md": 480, "lg": 1024}
+    
+    # Redimensionado bajo demanda (/uploads/<archivo>?w=&h=&fmt=)
+    RESIZE_CACHE_FOLDER = os.environ.get("RESIZE_CACHE_FOLDER", os.path.join(os.path.dirname(__file__), "..", "cache", "resized"))
+    RESIZE_CACHE_MAX_BYTES = int(os.environ.get("RESIZE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    RESIZE_MAX_DIMENSION = int(os.environ.get("RESIZE_MAX_DIMENSION", 2048))
+    # Anchos y altos que se pueden pedir (0, libre, siempre se admite): acota las variantes
+    # distintas que un cliente puede forzar a generar y a ocupar la caché
+    RESIZE_ALLOWED_DIMENSIONS = os.environ.get("RESIZE_ALLOWED_DIMENSIONS", "100,160,200,320,480,640,800,1024,1280,1600,1920,2048")
     
     # Seguridad
     SECRET_KEY = os.environ.get("SECRET_KEY", secrets.token_hex(32))
+    # Tokens de acceso (por defecto se firman con SECRET_KEY, que debe ser la misma en todos los workers)
+    TOKEN_SECRET = os.environ.get("TOKEN_SECRET", "")
+    TOKEN_TTL = int(os.environ.get("TOKEN_TTL", 15 * 60))
+    # Tokens revocados al cerrar sesión: tamaño de la tabla y archivo compartido (p. ej. /dev/shm/cucei-foods-revoked)
+    TOKEN_REVOCATION_SLOTS = int(os.environ.get("TOKEN_REVOCATION_SLOTS", 65536))
+    TOKEN_REVOCATION_FILE = os.environ.get("TOKEN_REVOCATION_FILE", "")
+    # Límite de intentos de login (token bucket por correo y por IP)
+    LOGIN_THROTTLE = os.environ.get("LOGIN_THROTTLE", "1") == "1"
+    LOGIN_EMAIL_ATTEMPTS = int(os.environ.get("LOGIN_EMAIL_ATTEMPTS", 5))
+    LOGIN_EMAIL_WINDOW = int(os.environ.get("LOGIN_EMAIL_WINDOW", 5 * 60))
+    LOGIN_IP_ATTEMPTS = int(os.environ.get("LOGIN_IP_ATTEMPTS", 30))
+    LOGIN_IP_WINDOW = int(os.environ.get("LOGIN_IP_WINDOW", 60))
+    LOGIN_THROTTLE_SLOTS = int(os.environ.get("LOGIN_THROTTLE_SLOTS", 65536))
+    # Proxies de confianza delante de la aplicación (nginx = 1); la IP del cliente se toma de
+    # X-Forwarded-For. Solo si la aplicación no es alcanzable sin pasar por ellos
+    TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", 0))
+    # IPs de los proxies a las que gunicorn acepta encabezados X-Forwarded-* (con TRUSTED_PROXIES)
+    FORWARDED_ALLOW_IPS = os.environ.get("FORWARDED_ALLOW_IPS", "*")
+    # Prefijo de los archivos compartidos, p. ej. /dev/shm/cucei-foods-login (vacío = memoria anónima)
+    LOGIN_THROTTLE_FILE = os.environ.get("LOGIN_THROTTLE_FILE", "")
+    # Token para los endpoints de administración (vacío = deshabilitados)
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+    # Método de Werkzeug con su costo, p. ej. "scrypt:32768:8:1" o "pbkdf2:sha256:600000"
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_SALT_LENGTH = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+    # Procesos para el hash de contraseñas por cada proceso web (0 = en el hilo de la petición).
+    # El total es workers web × este valor: conviene que no pase de los núcleos (núcleos // workers).
+    # -1 = automático: 1 por proceso, núcleos // workers con `flask serve` y todos los núcleos en
+    # los comandos de registro masivo
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", -1))
+    # Hashes que pueden esperar turno además de los que están en ejecución
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 64))
+    
+    # Importación masiva
+    IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", os.cpu_count() or 1))
+    IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", 1000))
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 5000))
+    # Filas máximas de POST /api/admin/students: los hashes corren en el pool del worker web y
+    # deben terminar antes de WEB_TIMEOUT (~50 ms por hash scrypt y proceso). Listas mayores:
+    # flask register-students
+    ROSTER_WEB_MAX_ROWS = int(os.environ.get("ROSTER_WEB_MAX_ROWS", 300))
+    
+    # Datos sintéticos (flask generate-data): filas por transacción
+    DATAGEN_BATCH_SIZE = int(os.environ.get("DATAGEN_BATCH_SIZE", 20000))
+    
+    # Exportación NDJSON
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
     
     # Crear carpeta de uploads si no existe
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
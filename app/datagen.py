@@ -0,0 +1,272 @@
+# datagen.py
+"""
+Generador determinista de datos sintéticos para benchmarks.
+
+Crea usuarios, lugares con horarios y menús realistas por categoría, y
+comentarios repartidos entre los lugares con una distribución de Zipf: unos
+pocos lugares concentran la mayoría de los comentarios, como en producción.
+Con la misma semilla se generan exactamente los mismos datos (incluidos los
+IDs), de modo que las mediciones son comparables entre commits.
+
+Las filas se insertan por lotes con executemany; en PostgreSQL con psycopg2
+los comentarios se cargan con COPY. La calificación de cada lugar se calcula
+durante la generación, así que no hace falta recalcularla al final.
+"""
+import bisect
+import csv
+import io
+import itertools
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.config import Config
+from app.db.models import db, User, Place, MenuItem, Comment, utcnow
+from app.passwords import hash_password
+
+DEFAULT_PASSWORD = "password123"
+SQLITE_CACHE_KB = 256 * 1024
+DAYS = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+
+# Horarios entre semana, menús y rango de precios por categoría
+CATEGORIES = {
+    "Desayunos y Comidas": {
+        "hours": ["07:00-16:00", "08:00-17:00", "08:00-15:00, 17:00-20:00", "09:00-18:00"],
+        "menu": {
+            "Desayunos": ["Chilaquiles", "Huevos rancheros", "Molletes", "Hot cakes", "Omelette", "Enfrijoladas"],
+            "Comidas": ["Tacos de guisado", "Torta ahogada", "Enchiladas", "Pozole", "Milanesa", "Comida corrida"],
+        },
+        "prices": (35, 95),
+    },
+    "Bebidas y Cafetería": {
+        "hours": ["07:00-20:00", "07:30-19:00", "08:00-21:00"],
+        "menu": {
+            "Bebidas": ["Café americano", "Capuchino", "Latte", "Chocolate", "Té chai", "Frappé"],
+            "Panadería": ["Concha", "Cuernito", "Galleta de avena", "Muffin", "Pan de elote"],
+        },
+        "prices": (18, 65),
+    },
+    "Snacks": {
+        "hours": ["10:00-19:00", "11:00-20:00", "09:00-14:00, 16:00-19:00"],
+        "menu": {
+            "Snacks": ["Papas preparadas", "Elote en vaso", "Fruta picada", "Dorilocos", "Nachos", "Jícamas"],
+            "Bebidas": ["Agua fresca", "Refresco", "Jugo natural", "Licuado"],
+        },
+        "prices": (15, 55),
+    },
+}
+PLACE_NAMES = ["Cafetería", "Cocina", "Fonda", "Antojitos", "Barra", "Rincón", "Kiosko", "Comedor"]
+PLACE_SUFFIXES = ["Central", "del Módulo", "Universitaria", "La Económica", "Don Pepe", "Las Palmas", "Express"]
+OPINIONS = {
+    1: ["Muy mala experiencia", "La comida llegó fría", "No lo recomiendo"],
+    2: ["Regular, algo caro", "Tardaron mucho", "Le falta sazón"],
+    3: ["Está bien para salir del paso", "Normal, nada especial", "Precio justo"],
+    4: ["Muy buena comida", "Buen servicio y rápido", "Porciones generosas"],
+    5: ["Excelente, volveré", "Lo mejor de CUCEI", "Todo delicioso"],
+}
+EXTRAS = ["", "", " La fila es larga a mediodía.", " Aceptan tarjeta.", " Hay mesas afuera.", " Buena música."]
+
+
+def user_email(seed: int, i: int) -> str:
+    """Correo del usuario i generado con la semilla dada"""
+    return f"user{seed}-{i}@alumnos.udg.mx"
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def zipf_cum_weights(n: int, exponent: float) -> list:
+    """Pesos acumulados de Zipf: el elemento k (desde 1) pesa 1 / k^exponent"""
+    return list(itertools.accumulate(1 / k ** exponent for k in range(1, n + 1)))
+
+
+def generate_schedule(rng: random.Random, category: str) -> dict:
+    """Horario semanal con sábado reducido y domingo casi siempre cerrado"""
+    weekday = rng.choice(CATEGORIES[category]["hours"])
+    schedule = {day: weekday for day in DAYS[:5]}
+    schedule["sabado"] = rng.choice(["09:00-14:00", "10:00-15:00", "Cerrado"])
+    schedule["domingo"] = "Cerrado" if rng.random() < 0.85 else "10:00-14:00"
+    return schedule
+
+
+def generate_menu(rng: random.Random, category: str) -> list:
+    """Platillos de un lugar según su categoría"""
+    low, high = CATEGORIES[category]["prices"]
+    items = []
+    for menu_category, dishes in CATEGORIES[category]["menu"].items():
+        for dish in rng.sample(dishes, rng.randint(2, len(dishes))):
+            items.append({"category": menu_category, "dish_name": dish,
+                          "price": float(rng.randrange(low, high + 1, 5))})
+    return items
+
+
+def _insert(session, table, rows):
+    session.execute(insert(table), rows)
+
+
+def _sqlite_executemany(session, table, rows):
+    """executemany directo de sqlite3, sin el procesamiento de parámetros de SQLAlchemy"""
+    columns = list(rows[0])
+    # Mismo formato con el que SQLAlchemy guarda DateTime en SQLite
+    dates = [i for i, c in enumerate(columns) if isinstance(rows[0][c], datetime)]
+    values = []
+    for row in rows:
+        value = [row[c] for c in columns]
+        for i in dates:
+            value[i] = value[i].isoformat(" ", "microseconds")
+        values.append(tuple(value))
+    sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    connection = session.connection()
+    # Caché de páginas amplia: las llaves primarias UUID se insertan en orden aleatorio
+    connection.exec_driver_sql(f"PRAGMA cache_size = -{SQLITE_CACHE_KB}")
+    connection.exec_driver_sql(sql, values)
+
+
+def _copy(session, table, rows):
+    """COPY ... FROM STDIN en PostgreSQL (psycopg2)"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[c] for c in columns])
+    buffer.seek(0)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _bulk_loader(dialect):
+    """Carga más rápida disponible para la tabla de comentarios"""
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        return _copy
+    if dialect.name == "sqlite":
+        return _sqlite_executemany
+    return _insert
+
+
+def _batched_insert(session, table, rows, batch_size: int, loader=_insert) -> int:
+    """Inserta las filas de un iterable en transacciones de batch_size"""
+    total = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return total
+        loader(session, table, batch)
+        session.commit()
+        total += len(batch)
+
+
+def generate_dataset(users: int, places: int, comments: int, seed: int = 0,
+                     zipf: float = 1.1, batch_size: int = None) -> dict:
+    """
+    Llena la base de datos con datos sintéticos.
+
+    Todos los usuarios tienen la contraseña DEFAULT_PASSWORD (se calcula un
+    solo hash) y el correo user_email(seed, i).
+
+    Args:
+        users (int): Usuarios a crear (al menos 1 si hay comentarios).
+        places (int): Lugares a crear (al menos 1 si hay comentarios).
+        comments (int): Comentarios en total.
+        seed (int): Semilla; los mismos parámetros generan los mismos datos.
+        zipf (float): Exponente de la distribución de comentarios por lugar.
+        batch_size (int, opcional): Filas por transacción.
+
+    Returns:
+        dict: Filas creadas por tabla, tiempo total y comentarios por segundo.
+
+    Raises:
+        ValueError: Si los parámetros son inválidos o la semilla ya se usó.
+    """
+    if min(users, places, comments) < 0:
+        raise ValueError("Las cantidades no pueden ser negativas")
+    if comments and not (users and places):
+        raise ValueError("Los comentarios requieren al menos un usuario y un lugar")
+    batch_size = batch_size or Config.DATAGEN_BATCH_SIZE
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    now = utcnow()
+
+    session = Session(db.engine)
+    try:
+        if users and session.execute(select(User.id).where(User.email == user_email(seed, 0))).first():
+            raise ValueError(f"La base ya contiene datos generados con la semilla {seed}")
+
+        # Usuarios
+        password_hash = hash_password(DEFAULT_PASSWORD)
+        user_ids = [_uuid(rng) for _ in range(users)]
+        _batched_insert(session, User.__table__, ({
+            "id": user_id, "name": f"Estudiante {i}", "email": user_email(seed, i),
+            "password_hash": password_hash, "created_at": now, "updated_at": now
+        } for i, user_id in enumerate(user_ids)), batch_size)
+
+        # Comentarios por lugar (Zipf) y calificaciones según la calidad de cada lugar
+        place_ids = [_uuid(rng) for _ in range(places)]
+        quality = [rng.uniform(2.2, 4.8) for _ in range(places)]
+        cum_weights = zipf_cum_weights(places, zipf) if places else []
+        # El lugar más popular no es siempre el primero creado
+        ranking = list(range(places))
+        rng.shuffle(ranking)
+        total_weight = cum_weights[-1] if cum_weights else 0
+        targets = [ranking[bisect.bisect(cum_weights, rng.random() * total_weight)] for _ in range(comments)]
+        ratings = [min(5, max(1, round(rng.gauss(quality[p], 1.0)))) for p in targets]
+        sums, counts = [0] * places, [0] * places
+        for p, r in zip(targets, ratings):
+            sums[p] += r
+            counts[p] += 1
+
+        # Lugares y menús
+        categories = list(CATEGORIES)
+        place_rows, menu_rows = [], []
+        for i, place_id in enumerate(place_ids):
+            category = rng.choice(categories)
+            place_rows.append({
+                "id": place_id,
+                "name": f"{rng.choice(PLACE_NAMES)} {rng.choice(PLACE_SUFFIXES)} {i}",
+                "schedule": generate_schedule(rng, category),
+                "category": category,
+                "image_url": "",
+                "rating": sums[i] / counts[i] if counts[i] else 0.0,
+                "num_ratings": counts[i],
+                "created_at": now,
+                "updated_at": now,
+            })
+            for item in generate_menu(rng, category):
+                menu_rows.append({"id": _uuid(rng), "place_id": place_id, **item,
+                                  "created_at": now, "updated_at": now})
+        _batched_insert(session, Place.__table__, place_rows, batch_size)
+        _batched_insert(session, MenuItem.__table__, menu_rows, batch_size)
+
+        # Comentarios del último año en orden cronológico, generados por lotes
+        # sin materializarlos todos; el orden mantiene secuenciales los índices de fecha
+        first = now - timedelta(days=365)
+        step = 365 * 24 * 3600 / max(comments, 1)
+        comment_rows = ({
+            "id": _uuid(rng),
+            "place_id": place_ids[p],
+            "user_id": user_ids[rng.randrange(users)],
+            "text": rng.choice(OPINIONS[r]) + "." + rng.choice(EXTRAS),
+            "rating": r,
+            "created_at": (created := first + timedelta(seconds=(j + rng.random()) * step)),
+            "updated_at": created,
+        } for j, (p, r) in enumerate(zip(targets, ratings)))
+        inserted = _batched_insert(session, Comment.__table__, comment_rows, batch_size,
+                                   loader=_bulk_loader(session.get_bind().dialect))
+    finally:
+        session.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "users": users,
+        "places": places,
+        "menu_items": len(menu_rows),
+        "comments": inserted,
+        "elapsed_seconds": round(elapsed, 3),
+        "comments_per_second": round(inserted / elapsed, 1) if elapsed else 0.0,
+    }
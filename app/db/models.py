@@ -1,10 +1,17 @@
 import uuid
+from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.dialects.postgresql import JSONB
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.passwords import hash_password, verify_password
 
 db = SQLAlchemy()
 
+
+def utcnow():
+    """Fecha y hora actual en UTC (sin zona horaria, como se guarda en la base de datos)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -13,6 +20,9 @@ class User(db.Model):
     email = db.Column(db.String(150), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
 
+    created_at = db.Column(db.DateTime, default=utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, index=True)
+
     comments = db.relationship("Comment", backref="user", cascade="all, delete-orphan")
 
     def set_password(self, pw):
@@ -22,7 +32,7 @@ class User(db.Model):
         Args:
             pw (str): Contraseña en texto plano.
         """
-        self.password_hash = generate_password_hash(pw)
+        self.password_hash = hash_password(pw)
 
     def check_password(self, pw):
         """
@@ -34,7 +44,7 @@ class User(db.Model):
         Returns:
             bool: True si la contraseña es correcta, False en caso contrario.
         """
-        return check_password_hash(self.password_hash, pw)
+        return verify_password(self.password_hash, pw)
 
 
 class Place(db.Model):
@@ -48,6 +58,9 @@ class Place(db.Model):
     rating = db.Column(db.Float, default=0.0)
     num_ratings = db.Column(db.Integer, default=0)
 
+    created_at = db.Column(db.DateTime, default=utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, index=True)
+
     menu_items = db.relationship("MenuItem", backref="place", cascade="all, delete-orphan")
     comments = db.relationship("Comment", backref="place", cascade="all, delete-orphan")
 
@@ -61,6 +74,9 @@ class MenuItem(db.Model):
     dish_name = db.Column(db.String(200), nullable=False)
     price = db.Column(db.Float, nullable=False)
 
+    created_at = db.Column(db.DateTime, default=utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, index=True)
+
 
 class Comment(db.Model):
     __tablename__ = 'comments'
@@ -71,3 +87,6 @@ class Comment(db.Model):
 
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, default=0)
+
+    created_at = db.Column(db.DateTime, default=utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow, index=True)
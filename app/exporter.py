@@ -0,0 +1,108 @@
+# exporter.py
+"""
+Exportación de datos en formato NDJSON (un objeto JSON por línea).
+
+Las consultas se leen con cursores del lado del servidor y se emiten por
+lotes, de modo que la memoria usada no depende del tamaño de la tabla.
+
+La exportación incremental (since) filtra por updated_at: incluye las filas
+creadas o modificadas, pero no refleja las eliminadas (tampoco los platillos
+que PUT /api/places/<id> reemplaza). Para ver las bajas hace falta una
+exportación completa. Las filas sin updated_at (anteriores a la columna) se
+incluyen siempre.
+"""
+import json
+from datetime import date, datetime, timezone
+from sqlalchemy import or_, select
+from app.config import Config
+from app.db.models import db, User, Place, MenuItem, Comment
+
+# Columnas exportadas por entidad (nunca se exporta password_hash)
+EXPORTS = {
+    "places": (Place, ("id", "name", "schedule", "category", "image_url", "rating", "num_ratings")),
+    "menu_items": (MenuItem, ("id", "place_id", "category", "dish_name", "price")),
+    "comments": (Comment, ("id", "place_id", "user_id", "text", "rating")),
+    "users": (User, ("id", "name", "email")),
+}
+
+
+def parse_since(value):
+    """
+    Convierte el parámetro since (ISO 8601) a datetime UTC sin zona horaria.
+
+    Args:
+        value (str): Fecha en formato ISO 8601 o vacío.
+
+    Returns:
+        datetime | None: Fecha normalizada o None si no se especificó.
+    """
+    if not value:
+        return None
+    try:
+        since = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Fecha inválida para since: {value}")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def export_rows(entity: str, since=None, batch_size=None):
+    """
+    Genera las filas de una entidad como diccionarios.
+
+    Args:
+        entity (str): Nombre de la entidad (places, menu_items, comments, users).
+        since (datetime, opcional): Solo filas modificadas desde esta fecha.
+        batch_size (int, opcional): Filas por lote leído del cursor.
+
+    Yields:
+        dict: Fila exportada.
+    """
+    if entity not in EXPORTS:
+        raise ValueError(f"Entidad desconocida: {entity}")
+
+    model, columns = EXPORTS[entity]
+    table = model.__table__
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+
+    query = select(*[table.c[name] for name in columns + ("created_at", "updated_at")])
+    if since is not None:
+        # Las filas sin fecha no se pueden descartar: pudieron cambiar en cualquier momento
+        query = query.where(or_(table.c.updated_at >= since, table.c.updated_at.is_(None)))
+    # Orden estable para que las exportaciones incrementales sean reproducibles
+    query = query.order_by(table.c.updated_at, table.c.id)
+
+    with db.engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(query)
+        for row in result.mappings():
+            yield dict(row)
+
+
+def export_ndjson(entity: str, since=None, batch_size=None):
+    """
+    Genera una exportación NDJSON agrupando las líneas por lote.
+
+    Args:
+        entity (str): Nombre de la entidad.
+        since (datetime, opcional): Solo filas modificadas desde esta fecha.
+        batch_size (int, opcional): Filas por bloque emitido.
+
+    Yields:
+        str: Bloque de líneas NDJSON.
+    """
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    lines = []
+    for row in export_rows(entity, since=since, batch_size=batch_size):
+        lines.append(json.dumps(row, default=_json_default, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,227 @@
+# images.py
+"""
+Procesamiento en segundo plano de las imágenes subidas.
+
+Por cada imagen original se generan variantes re-codificadas sin metadatos
+EXIF: miniaturas de tamaño fijo y un placeholder diminuto y difuminado. Las
+variantes se nombran a partir del archivo original (foto.jpg -> foto_sm.webp)
+para que las URLs puedan calcularse sin consultar el disco.
+
+El original también se sirve públicamente, así que antes de calcular su
+nombre y guardarlo strip_metadata le quita el EXIF (que puede incluir la
+ubicación GPS).
+"""
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config import Config
+from PIL import ExifTags, Image, ImageFilter, ImageOps, UnidentifiedImageError, features
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = "placeholder"
+PLACEHOLDER_SIZE = 16
+# Metadatos de image.info que pueden identificar al autor o el lugar
+PRIVATE_METADATA = ("exif", "Raw profile type exif", "xmp", "XML:com.adobe.xmp", "comment")
+# Calidad al re-codificar un JPEG original que hubo que rotar
+ORIGINAL_QUALITY = 95
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_format() -> str:
+    """Formato de las variantes: WebP si Pillow lo soporta, si no JPEG"""
+    if Config.IMAGE_VARIANT_FORMAT == "webp" and not features.check("webp"):
+        return "jpeg"
+    return Config.IMAGE_VARIANT_FORMAT
+
+
+def variant_filename(filename: str, size: str) -> str:
+    """
+    Nombre del archivo de una variante.
+
+    Args:
+        filename (str): Nombre del archivo original.
+        size (str): Nombre del tamaño (sm, md, lg o placeholder).
+
+    Returns:
+        str: Nombre de la variante.
+    """
+    stem = os.path.splitext(filename)[0]
+    ext = "jpg" if variant_format() == "jpeg" else variant_format()
+    return f"{stem}_{size}.{ext}"
+
+
+def parse_variant(filename: str):
+    """
+    Identifica si un nombre de archivo corresponde a una variante.
+
+    Returns:
+        tuple | None: (stem del original, tamaño) o None si no es una variante.
+    """
+    stem, _ = os.path.splitext(filename)
+    base, sep, size = stem.rpartition("_")
+    if sep and base and (size in Config.IMAGE_THUMBNAIL_SIZES or size == PLACEHOLDER):
+        return base, size
+    return None
+
+
+def image_variants(image_url: str) -> dict:
+    """
+    URLs de las variantes de una imagen subida.
+
+    Args:
+        image_url (str): URL de la imagen original.
+
+    Returns:
+        dict: URL por tamaño, vacío si la imagen no es un upload local.
+    """
+    if not image_url or not image_url.startswith("/uploads/"):
+        return {}
+    filename = image_url[len("/uploads/"):]
+    sizes = list(Config.IMAGE_THUMBNAIL_SIZES) + [PLACEHOLDER]
+    return {size: f"/uploads/{variant_filename(filename, size)}" for size in sizes}
+
+
+def _has_private_metadata(image) -> bool:
+    if any(key in image.info for key in PRIVATE_METADATA):
+        return True
+    # Fragmentos de texto de PNG (autor, comentarios, software...)
+    return bool(getattr(image, "text", None))
+
+
+def strip_metadata(path: str) -> bool:
+    """
+    Quita el EXIF y demás metadatos privados de una imagen JPEG o PNG.
+
+    La orientación EXIF se aplica a los píxeles antes de descartarla. Los
+    JPEG sin rotar se re-codifican con sus tablas de cuantización
+    originales (quality="keep"), por lo que la pérdida es mínima. Las
+    imágenes sin metadatos, los GIF y los archivos que Pillow no puede
+    decodificar se dejan intactos.
+
+    Args:
+        path (str): Archivo a limpiar; se reemplaza en el mismo lugar.
+
+    Returns:
+        bool: True si el archivo se re-codificó.
+
+    Raises:
+        Image.DecompressionBombError: Si la imagen excede Image.MAX_IMAGE_PIXELS.
+    """
+    try:
+        with Image.open(path) as original:
+            fmt = original.format
+            if fmt not in ("JPEG", "PNG") or not _has_private_metadata(original):
+                return False
+            options = {"icc_profile": original.info.get("icc_profile")}
+            if original.getexif().get(ExifTags.Base.Orientation, 1) != 1:
+                image = ImageOps.exif_transpose(original)
+                if fmt == "JPEG":
+                    options["quality"] = ORIGINAL_QUALITY
+            else:
+                image = original
+                if fmt == "JPEG":
+                    options.update(quality="keep", subsampling="keep")
+            image.load()
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    # Sin los parámetros exif y pnginfo Pillow no copia los metadatos
+                    image.save(f, format=fmt, **options)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    except (UnidentifiedImageError, OSError):
+        logger.debug("No se pudieron quitar los metadatos de %s", path, exc_info=True)
+        return False
+    return True
+
+
+def _save_variant(storage, image, name, fmt, quality):
+    fd, tmp_path = tempfile.mkstemp(dir=storage.temp_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # Sin el parámetro exif Pillow no copia los metadatos del original
+            image.save(f, format=fmt, quality=quality, optimize=True)
+        storage.save(name, tmp_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def process_image(filename: str, storage=None) -> list:
+    """
+    Genera las variantes de una imagen original.
+
+    Args:
+        filename (str): Nombre del archivo original en el almacenamiento.
+        storage (StorageBackend, opcional): Backend a usar (por defecto el configurado).
+
+    Returns:
+        list: Nombres de las variantes generadas.
+    """
+    storage = storage or get_storage()
+    fmt = variant_format()
+    generated = []
+
+    with storage.open(filename) as source, Image.open(source) as original:
+        # Aplicar la orientación EXIF antes de descartar los metadatos
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if fmt == "webp" and "A" in image.getbands() else "RGB")
+
+        for size, max_side in Config.IMAGE_THUMBNAIL_SIZES.items():
+            thumb = image.copy()
+            thumb.thumbnail((max_side, max_side), Image.LANCZOS)
+            name = variant_filename(filename, size)
+            _save_variant(storage, thumb, name, fmt, Config.IMAGE_QUALITY)
+            generated.append(name)
+
+        placeholder = image.copy()
+        placeholder.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        placeholder = placeholder.filter(ImageFilter.GaussianBlur(1))
+        name = variant_filename(filename, PLACEHOLDER)
+        _save_variant(storage, placeholder, name, fmt, 30)
+        generated.append(name)
+
+    return generated
+
+
+def _process_safely(filename, storage):
+    try:
+        return process_image(filename, storage)
+    except Exception:
+        logger.warning("No se pudieron generar las variantes de %s", filename, exc_info=True)
+        return []
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.IMAGE_WORKERS, thread_name_prefix="images")
+        return _executor
+
+
+def schedule_processing(filename: str):
+    """
+    Encola el procesamiento de una imagen en el pool de trabajadores.
+
+    Pillow libera el GIL al decodificar, redimensionar y codificar, por lo que
+    un pool de hilos basta para sacar el trabajo del hilo de la petición.
+
+    Args:
+        filename (str): Nombre del archivo original ya guardado.
+
+    Returns:
+        Future | None: Futuro con los nombres generados, o None si está deshabilitado.
+    """
+    if not Config.IMAGE_PROCESSING:
+        return None
+    # El backend se resuelve aquí, con la configuración vigente en la petición
+    return _get_executor().submit(_process_safely, filename, get_storage())
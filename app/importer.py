@@ -0,0 +1,312 @@
+# importer.py
+"""
+Importación masiva del catálogo de lugares y menús desde CSV o JSONL.
+
+Formatos aceptados:
+- JSONL: un lugar por línea, con la forma
+  {"name", "category", "schedule", "image_url", "menu": [{"category", "dish_name", "price"}]}
+- CSV: una fila por platillo con las columnas
+  name, category, schedule, image_url, menu_category, dish_name, price.
+  Las filas con el mismo (name, category) se agrupan en un solo lugar; una fila
+  sin dish_name solo define el lugar.
+"""
+import csv
+import json
+import math
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.config import Config
+from app.db.models import db, Place, MenuItem
+
+CSV_PLACE_FIELDS = ("name", "category", "schedule", "image_url")
+
+
+def detect_format(filename: str) -> str:
+    """Deduce el formato (csv o jsonl) a partir de la extensión del archivo"""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Formato no soportado: {filename}")
+
+
+def read_records(stream, fmt: str):
+    """
+    Lee los registros de un archivo de catálogo.
+
+    Args:
+        stream: Archivo de texto abierto.
+        fmt (str): "csv" o "jsonl".
+
+    Returns:
+        tuple: (records, errors, rows) donde records es una lista de
+        (row, record), errors una lista de errores de lectura y rows el
+        número de filas leídas.
+    """
+    if fmt == "jsonl":
+        return read_jsonl(stream)
+    if fmt == "csv":
+        return _read_csv(stream)
+    raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def read_jsonl(stream):
+    """
+    Lee un archivo JSONL con un objeto por línea (las líneas vacías se omiten).
+
+    Returns:
+        tuple: (records, errors, rows) como read_records.
+    """
+    records, errors, rows = [], [], 0
+    for row, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        rows += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            errors.append({"row": row, "error": f"JSON inválido: {e}"})
+            continue
+        if not isinstance(record, dict):
+            errors.append({"row": row, "error": "Se esperaba un objeto JSON"})
+            continue
+        records.append((row, record))
+    return records, errors, rows
+
+
+def _read_csv(stream):
+    # Agrupa las filas de menú por lugar conservando el orden de aparición
+    places = {}
+    rows = 0
+    # La fila 1 es el encabezado
+    for row, data in enumerate(csv.DictReader(stream), start=2):
+        rows += 1
+        key = (data.get("name"), data.get("category"))
+        if key not in places:
+            record = {field: data.get(field) for field in CSV_PLACE_FIELDS}
+            record["menu"] = []
+            places[key] = (row, record)
+
+        if data.get("dish_name"):
+            places[key][1]["menu"].append({
+                "_row": row,
+                "category": data.get("menu_category"),
+                "dish_name": data.get("dish_name"),
+                "price": data.get("price")
+            })
+    return list(places.values()), [], rows
+
+
+def check_text(value, field, max_length, required=True):
+    """
+    Valida un campo de texto de un registro importado.
+
+    Args:
+        value: Valor leído.
+        field (str): Nombre del campo para el mensaje de error.
+        max_length (int): Longitud máxima.
+        required (bool): Si el campo puede venir vacío.
+
+    Returns:
+        str: Valor sin espacios al inicio y al final ("" si es opcional y viene vacío).
+
+    Raises:
+        ValueError: Si el valor falta, no es texto o es demasiado largo.
+    """
+    if value is None or value == "":
+        if required:
+            raise ValueError(f"El campo '{field}' es requerido")
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"El campo '{field}' debe ser texto")
+    value = value.strip()
+    if required and not value:
+        raise ValueError(f"El campo '{field}' es requerido")
+    if len(value) > max_length:
+        raise ValueError(f"El campo '{field}' excede {max_length} caracteres")
+    return value
+
+
+def validate_record(row: int, record: dict):
+    """
+    Valida y normaliza un lugar con su menú.
+
+    Args:
+        row (int): Número de fila del lugar en el archivo.
+        record (dict): Registro leído.
+
+    Returns:
+        tuple: (place, menu, errors). place es None si el lugar es inválido;
+        los platillos inválidos se descartan y se reportan en errors.
+    """
+    errors = []
+    try:
+        name = check_text(record.get("name"), "name", 200)
+        category = check_text(record.get("category"), "category", 100)
+        image_url = check_text(record.get("image_url"), "image_url", 300, required=False)
+
+        schedule = record.get("schedule") or {}
+        if isinstance(schedule, str):
+            try:
+                schedule = json.loads(schedule)
+            except ValueError:
+                raise ValueError("El campo 'schedule' no es JSON válido")
+        if not isinstance(schedule, dict):
+            raise ValueError("El campo 'schedule' debe ser un objeto")
+
+        menu = record.get("menu") or []
+        if not isinstance(menu, list):
+            raise ValueError("El campo 'menu' debe ser una lista")
+    except ValueError as e:
+        return None, [], [{"row": row, "error": str(e)}]
+
+    place = {"name": name, "category": category, "schedule": schedule, "image_url": image_url}
+
+    items = []
+    for m in menu:
+        item_row = m.get("_row", row) if isinstance(m, dict) else row
+        try:
+            if not isinstance(m, dict):
+                raise ValueError("Cada elemento del menú debe ser un objeto")
+            price = m.get("price")
+            try:
+                price = float(price)
+            except (TypeError, ValueError):
+                raise ValueError("El campo 'price' debe ser numérico")
+            # float() acepta "nan" e "inf", y JSON los literales NaN e Infinity
+            if not math.isfinite(price):
+                raise ValueError("El campo 'price' debe ser un número finito")
+            if price < 0:
+                raise ValueError("El campo 'price' no puede ser negativo")
+            items.append({
+                "category": check_text(m.get("category"), "menu_category", 100),
+                "dish_name": check_text(m.get("dish_name"), "dish_name", 200),
+                "price": price
+            })
+        except ValueError as e:
+            errors.append({"row": item_row, "error": str(e)})
+
+    return place, items, errors
+
+
+def _validate_chunk(chunk):
+    return [validate_record(row, record) for row, record in chunk]
+
+
+def validate_records(records, workers=None, chunk_size=None):
+    """
+    Valida los registros, repartiéndolos en un pool de procesos si son muchos.
+
+    Args:
+        records (list): Lista de (row, record).
+        workers (int, opcional): Número de procesos. 1 valida en línea.
+        chunk_size (int, opcional): Registros por tarea del pool.
+
+    Returns:
+        list: Resultados de validate_record en el mismo orden de entrada.
+    """
+    workers = workers or Config.IMPORT_WORKERS
+    chunk_size = chunk_size or Config.IMPORT_CHUNK_SIZE
+
+    # Para archivos pequeños el costo de levantar el pool no compensa
+    if workers <= 1 or len(records) <= chunk_size:
+        return _validate_chunk(records)
+
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    # spawn: el endpoint corre en workers con hilos y un fork puede heredar locks tomados
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        results = []
+        for chunk_result in executor.map(_validate_chunk, chunks):
+            results.extend(chunk_result)
+        return results
+
+
+def load_places(session, validated, batch_size=None):
+    """
+    Inserta los lugares y menús validados en transacciones por lotes.
+
+    Args:
+        session (Session): Sesión de la base de datos.
+        validated (list): Lista de (place, menu) ya validados.
+        batch_size (int, opcional): Filas (lugares + platillos) por transacción.
+
+    Returns:
+        tuple: (num_places, num_menu_items) insertados.
+    """
+    batch_size = batch_size or Config.IMPORT_BATCH_SIZE
+    place_rows, menu_rows = [], []
+    total_places = total_items = 0
+
+    def flush():
+        if place_rows:
+            session.execute(insert(Place.__table__), place_rows)
+        if menu_rows:
+            session.execute(insert(MenuItem.__table__), menu_rows)
+        session.commit()
+        place_rows.clear()
+        menu_rows.clear()
+
+    for place, menu in validated:
+        place_id = str(uuid.uuid4())
+        place_rows.append({"id": place_id, "rating": 0.0, "num_ratings": 0, **place})
+        for item in menu:
+            menu_rows.append({"id": str(uuid.uuid4()), "place_id": place_id, **item})
+
+        total_places += 1
+        total_items += len(menu)
+
+        if len(place_rows) + len(menu_rows) >= batch_size:
+            flush()
+
+    flush()
+    return total_places, total_items
+
+
+def import_catalog(stream, fmt: str, workers=None, batch_size=None) -> dict:
+    """
+    Importa un catálogo completo y genera un reporte.
+
+    Args:
+        stream: Archivo de texto abierto.
+        fmt (str): "csv" o "jsonl".
+        workers (int, opcional): Procesos para la validación.
+        batch_size (int, opcional): Filas por transacción.
+
+    Returns:
+        dict: Reporte con lugares y platillos insertados, filas leídas,
+        errores por fila, tiempo total y filas por segundo.
+    """
+    start = time.perf_counter()
+
+    records, errors, rows = read_records(stream, fmt)
+
+    validated = []
+    for place, menu, record_errors in validate_records(records, workers=workers):
+        errors.extend(record_errors)
+        if place is not None:
+            validated.append((place, menu))
+
+    session_db = Session(db.engine)
+    try:
+        num_places, num_items = load_places(session_db, validated, batch_size=batch_size)
+    finally:
+        session_db.close()
+
+    elapsed = time.perf_counter() - start
+    errors.sort(key=lambda e: e["row"])
+
+    return {
+        "rows": rows,
+        "places": num_places,
+        "menu_items": num_items,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round((num_places + num_items) / elapsed, 1) if elapsed else 0.0
+    }
@@ -0,0 +1,205 @@
+# metrics.py
+"""
+Métricas en formato Prometheus (GET /metrics).
+
+Las métricas se definen una sola vez al importar el módulo y las
+combinaciones de etiquetas conocidas se enlazan de antemano (labels() se
+resuelve una vez), de modo que en el camino de cada petición solo se
+incrementa un contador o se observa un histograma. Las combinaciones de
+ruta, método y estado de la latencia se enlazan la primera vez que ocurren
+y se guardan en diccionarios anidados: las peticiones siguientes no crean
+objetos.
+
+Con varios procesos (gunicorn) cada uno lleva sus propios contadores. Si
+la variable de entorno PROMETHEUS_MULTIPROC_DIR apunta a un directorio
+vacío al arrancar, prometheus_client escribe los valores en archivos
+compartidos y /metrics agrega los de todos los workers.
+
+prometheus_client es opcional: sin él las métricas no hacen nada y
+/metrics no se registra.
+"""
+import os
+import time
+from flask import Flask, Response, g, request
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.config import Config
+
+try:
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                                   Histogram, generate_latest, multiprocess)
+except ImportError:  # pragma: no cover - prometheus_client es opcional
+    Counter = None
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+UNMATCHED_ROUTE = "<sin ruta>"
+
+
+class _NullMetric:
+    """Métrica que no hace nada cuando prometheus_client no está instalado"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+
+if Counter is not None:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds", "Duración de las peticiones HTTP",
+        ("route", "method", "status")
+    )
+    # livesum: con varios procesos suma solo los workers vivos
+    IN_FLIGHT = Gauge("http_requests_in_flight", "Peticiones en curso", multiprocess_mode="livesum")
+    POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Conexiones obtenidas del pool")
+    POOL_CHECKOUT_WAIT = Histogram(
+        "db_pool_checkout_wait_seconds", "Tiempo para obtener una conexión del pool (espera o conexión nueva)",
+        buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+    )
+    POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Esperas del pool que excedieron pool_timeout")
+    POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Conexiones en uso", multiprocess_mode="livesum")
+    _cache_requests = Counter("cache_requests_total", "Consultas a cachés por resultado", ("cache", "result"))
+    UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes recibidos en archivos subidos")
+    UPLOAD_SIZE = Histogram(
+        "upload_size_bytes", "Tamaño de los archivos subidos",
+        buckets=(10_000, 100_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000, 50_000_000)
+    )
+    _password_hash = Histogram(
+        "password_hash_duration_seconds", "Duración del hash y la verificación de contraseñas",
+        ("operation",), buckets=(.01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+    )
+    ACCESS_LOG_DROPPED = Counter("access_log_dropped_total", "Registros del log de accesos descartados por la cola llena")
+else:  # pragma: no cover - prometheus_client es opcional
+    REQUEST_LATENCY = IN_FLIGHT = POOL_CHECKOUTS = POOL_CHECKOUT_WAIT = POOL_TIMEOUTS = POOL_CHECKED_OUT = \
+        _cache_requests = UPLOAD_BYTES = UPLOAD_SIZE = _password_hash = ACCESS_LOG_DROPPED = _NullMetric()
+
+# Hijos enlazados de antemano para el camino caliente
+RESIZE_CACHE_HITS = _cache_requests.labels("resize", "hit")
+RESIZE_CACHE_MISSES = _cache_requests.labels("resize", "miss")
+PASSWORD_HASH = _password_hash.labels("hash")
+PASSWORD_VERIFY = _password_hash.labels("verify")
+
+# route -> method -> status -> hijo del histograma de latencia
+_latency_children = {}
+
+
+def _latency_child(route: str, method: str, status: int):
+    try:
+        return _latency_children[route][method][status]
+    except KeyError:
+        # Dos hilos pueden llegar aquí a la vez: labels() retorna el mismo hijo
+        child = REQUEST_LATENCY.labels(route, method, str(status))
+        _latency_children.setdefault(route, {}).setdefault(method, {})[status] = child
+        return child
+
+
+def observe_request(route: str, method: str, status: int, seconds: float):
+    """Registra la duración de una petición"""
+    _latency_child(route, method, status).observe(seconds)
+
+
+def instrument_pool(engine):
+    """
+    Mide las conexiones obtenidas del pool del engine.
+
+    La espera se mide alrededor de Pool._do_get, que bloquea hasta que se
+    libera una conexión (o abre una nueva). Al desechar el engine se crea un
+    pool nuevo, que se instrumenta de nuevo.
+    """
+    def wrap(pool):
+        if getattr(pool, "_metrics_wrapped", False):
+            return
+        do_get = pool._do_get
+
+        def timed_do_get():
+            started = time.perf_counter()
+            try:
+                return do_get()
+            except PoolTimeoutError:
+                POOL_TIMEOUTS.inc()
+                raise
+            finally:
+                POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+        pool._do_get = timed_do_get
+        pool._metrics_wrapped = True
+
+    wrap(engine.pool)
+    event.listen(engine, "engine_disposed", lambda eng: wrap(eng.pool))
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, record, proxy):
+        POOL_CHECKOUTS.inc()
+        POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, record):
+        POOL_CHECKED_OUT.dec()
+
+
+def render():
+    """
+    Métricas del proceso, o de todos los workers en modo multiproceso.
+
+    Returns:
+        tuple: (cuerpo, tipo de contenido).
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Descarta los valores en vivo de un worker que terminó (modo multiproceso)"""
+    if MULTIPROCESS and Counter is not None:
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app: Flask):
+    """
+    Registra las métricas de peticiones y el endpoint /metrics.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    if Counter is None or not Config.METRICS_ENABLED:
+        return
+
+    # El engine se toma de la extensión: app.db.models importa este módulo (vía passwords)
+    with app.app_context():
+        instrument_pool(app.extensions["sqlalchemy"].engine)
+
+    @app.before_request
+    def _start_request_metrics():
+        IN_FLIGHT.inc()
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            rule = request.url_rule
+            observe_request(rule.rule if rule is not None else UNMATCHED_ROUTE, request.method,
+                            response.status_code, time.perf_counter() - started)
+        return response
+
+    @app.teardown_request
+    def _end_request_metrics(exc=None):
+        if g.pop("metrics_started", None) is not None:
+            IN_FLIGHT.dec()
+
+    def metrics():
+        body, content_type = render()
+        return Response(body, content_type=content_type)
+
+    app.add_url_rule("/metrics", "metrics", metrics)
@@ -0,0 +1,187 @@
+# passwords.py
+"""
+Hash y verificación de contraseñas en un pool de procesos.
+
+Derivar una contraseña (scrypt o pbkdf2) consume decenas de milisegundos de
+CPU; en el hilo de la petición bloquea al worker y, por el GIL, a los demás
+hilos del proceso. Aquí el trabajo se envía a un pool de procesos acotado y
+el hilo de la petición solo espera el resultado.
+
+Cada proceso web tiene su propio pool, así que su tamaño se multiplica por
+el número de workers: por defecto (PASSWORD_HASH_WORKERS=-1) es un proceso,
+y quien sabe cuántos procesos comparten la máquina lo ajusta con
+set_auto_pool_size (el servidor de producción y los comandos masivos).
+
+El algoritmo y su costo se configuran con Config.PASSWORD_HASH_METHOD usando
+el formato de Werkzeug ("scrypt:32768:8:1", "pbkdf2:sha256:600000"). Los
+hashes creados con otros parámetros siguen siendo válidos y se regeneran al
+iniciar sesión (needs_rehash).
+
+Si un proceso del pool muere (p. ej. lo mata el OOM killer) el pool queda
+inutilizable: se descarta y la operación se reintenta una vez en uno nuevo.
+"""
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import check_password_hash, generate_password_hash
+from app.config import Config
+from app.metrics import PASSWORD_HASH, PASSWORD_VERIFY
+
+_executor = None
+_executor_key = None
+_slots = None
+_executor_lock = threading.Lock()
+_auto_pool_size = 1
+
+
+def set_auto_pool_size(workers: int):
+    """Procesos del pool cuando PASSWORD_HASH_WORKERS es automático (-1)"""
+    global _auto_pool_size
+    _auto_pool_size = max(1, workers)
+
+
+def pool_size() -> int:
+    """Procesos del pool de hashes (0 = en el hilo que llama)"""
+    workers = Config.PASSWORD_HASH_WORKERS
+    return _auto_pool_size if workers < 0 else workers
+
+
+def _get_executor():
+    global _executor, _executor_key, _slots
+    workers = pool_size()
+    key = (workers, Config.PASSWORD_HASH_QUEUE)
+    with _executor_lock:
+        if _executor is None or _executor_key != key:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # spawn: un fork de un proceso con hilos (escritores, miniaturas) puede heredar locks tomados
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _executor_key = key
+            # Limita el trabajo encolado para que un pico de logins no acumule memoria sin fin
+            _slots = threading.BoundedSemaphore(workers + Config.PASSWORD_HASH_QUEUE)
+        return _executor, _slots
+
+
+def _discard_executor(executor):
+    global _executor
+    with _executor_lock:
+        # Otro hilo pudo haberlo reemplazado ya
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _retrying(call):
+    """Ejecuta call(executor, slots); si el pool está roto lo reemplaza y reintenta una vez"""
+    executor, slots = _get_executor()
+    try:
+        return call(executor, slots)
+    except BrokenProcessPool:
+        _discard_executor(executor)
+    return call(*_get_executor())
+
+
+def _run(func, *args):
+    """Ejecuta func en el pool, o en el hilo actual si está deshabilitado"""
+    if pool_size() <= 0:
+        return func(*args)
+
+    def call(executor, slots):
+        with slots:
+            return executor.submit(func, *args).result()
+    return _retrying(call)
+
+
+def warm_up():
+    """
+    Arranca los procesos del pool para que el primer login no pague el costo
+    de crearlos e importar Werkzeug en ellos.
+    """
+    workers = pool_size()
+    if workers <= 0:
+        return
+    executor, _ = _get_executor()
+    # Los procesos se crean bajo demanda: una tarea por proceso los arranca todos
+    list(executor.map(abs, range(workers)))
+
+
+def hash_password(password: str) -> str:
+    """
+    Genera el hash de una contraseña con los parámetros configurados.
+
+    Args:
+        password (str): Contraseña en texto plano.
+
+    Returns:
+        str: Hash en el formato de Werkzeug (método$sal$hash).
+    """
+    with PASSWORD_HASH.time():
+        return _run(generate_password_hash, password, Config.PASSWORD_HASH_METHOD, Config.PASSWORD_SALT_LENGTH)
+
+
+def hash_passwords(passwords) -> list:
+    """
+    Genera los hashes de varias contraseñas repartiéndolos entre los procesos del pool.
+
+    Args:
+        passwords (list): Contraseñas en texto plano.
+
+    Returns:
+        list: Hashes en el mismo orden.
+    """
+    method, salt_length = Config.PASSWORD_HASH_METHOD, Config.PASSWORD_SALT_LENGTH
+    workers = pool_size()
+    if workers <= 0 or len(passwords) <= 1:
+        return [generate_password_hash(p, method, salt_length) for p in passwords]
+    # Lotes por tarea para amortizar el envío entre procesos sin desbalancear la carga
+    chunksize = max(1, len(passwords) // (workers * 8))
+    return _retrying(lambda executor, slots: list(executor.map(
+        generate_password_hash, passwords,
+        [method] * len(passwords), [salt_length] * len(passwords),
+        chunksize=chunksize
+    )))
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """
+    Verifica una contraseña contra su hash.
+
+    Args:
+        password_hash (str): Hash almacenado.
+        password (str): Contraseña en texto plano.
+
+    Returns:
+        bool: True si la contraseña es correcta.
+    """
+    if not password_hash or not password:
+        return False
+    with PASSWORD_VERIFY.time():
+        return _run(check_password_hash, password_hash, password)
+
+
+@functools.lru_cache(maxsize=8)
+def _normalized_method(method: str) -> str:
+    # Werkzeug completa los parámetros omitidos ("scrypt" -> "scrypt:32768:8:1")
+    return generate_password_hash("", method, salt_length=1).split("$", 1)[0]
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Indica si un hash se creó con parámetros distintos a los configurados.
+
+    Args:
+        password_hash (str): Hash almacenado.
+
+    Returns:
+        bool: True si conviene regenerarlo.
+    """
+    try:
+        method, salt, _ = password_hash.split("$", 2)
+    except ValueError:
+        return True
+    return method != _normalized_method(Config.PASSWORD_HASH_METHOD) or len(salt) != Config.PASSWORD_SALT_LENGTH
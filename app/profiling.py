@@ -0,0 +1,207 @@
+# profiling.py
+"""
+Perfilado bajo demanda de una sola petición.
+
+Una petición con el encabezado X-Profile (o el parámetro _profile) igual a
+Config.PROFILE_TOKEN se ejecuta bajo un perfilador y el resultado se
+guarda en Config.PROFILE_DIR; la respuesta indica el archivo en
+X-Profile-File. Hay dos formatos:
+
+- pstats: cProfile, con el tiempo exacto de cada función (snakeviz,
+  python -m pstats). Agrega el costo de medir cada llamada.
+- speedscope: un hilo muestrea la pila del hilo de la petición cada
+  PROFILE_SAMPLE_INTERVAL_MS; el archivo se abre en https://speedscope.app.
+
+Sin token configurado el único costo por petición es leer
+Config.PROFILE_TOKEN. Solo se perfila una petición a la vez por proceso.
+"""
+import cProfile
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import Flask, g, request
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("pstats", "speedscope")
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_active = threading.Lock()
+
+
+def frame_stack(frame, max_depth: int = None) -> tuple:
+    """
+    Pila de un frame, de la raíz a la hoja.
+
+    Args:
+        frame: Frame de la hoja.
+        max_depth (int, opcional): Niveles a conservar, los más cercanos a la hoja.
+
+    Returns:
+        tuple: (función, archivo, línea de inicio) por nivel.
+    """
+    stack = []
+    while frame is not None and (max_depth is None or len(stack) < max_depth):
+        code = frame.f_code
+        # co_qualname (Clase.método) solo existe desde Python 3.11
+        stack.append((getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def speedscope_document(name: str, stacks, interval: float) -> dict:
+    """
+    Documento de speedscope con un perfil muestreado.
+
+    Args:
+        name (str): Nombre del perfil.
+        stacks: Pares (pila de frame_stack, número de muestras).
+        interval (float): Segundos que representa cada muestra.
+
+    Returns:
+        dict: Documento listo para json.dump.
+    """
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in stacks:
+        ids = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                function, filename, line = frame
+                frames.append({"name": function, "file": filename, "line": line})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(count * interval)
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "cucei-foods",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+class _CProfileSession:
+    extension = "pstats"
+
+    def __init__(self):
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+
+    def save(self, path: str, name: str):
+        self._profiler.dump_stats(path)
+
+
+class _SamplingSession:
+    extension = "speedscope.json"
+
+    def __init__(self):
+        self.interval = Config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self._target = threading.get_ident()
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._stacks[frame_stack(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: str, name: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(speedscope_document(name, self._stacks.items(), self.interval), f)
+
+
+def _requested_token() -> str:
+    return request.headers.get("X-Profile") or request.args.get("_profile") or ""
+
+
+def profile_filename(method: str, path: str, extension: str) -> str:
+    """Nombre del archivo de un perfil: fecha, método y ruta"""
+    now = time.time()
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}-{method}-{slug[:80]}.{extension}"
+
+
+def init_profiling(app: Flask):
+    """
+    Registra el perfilado bajo demanda en la aplicación.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    @app.before_request
+    def _start_profile():
+        token = Config.PROFILE_TOKEN
+        if not token:
+            return
+        supplied = _requested_token()
+        if not supplied or not hmac.compare_digest(supplied.encode(), token.encode()):
+            return
+        fmt = request.headers.get("X-Profile-Format") or request.args.get("_profile_format") or Config.PROFILE_FORMAT
+        if fmt not in FORMATS:
+            return
+        # Dos perfiladores a la vez se estorban (y cProfile no lo permite en 3.12+)
+        if not _active.acquire(blocking=False):
+            return
+        session = _CProfileSession() if fmt == "pstats" else _SamplingSession()
+        g.profile_session = session
+        session.start()
+
+    @app.after_request
+    def _save_profile(response):
+        session = g.pop("profile_session", None)
+        if session is None:
+            return response
+        try:
+            session.stop()
+            os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+            filename = profile_filename(request.method, request.path, session.extension)
+            session.save(os.path.join(Config.PROFILE_DIR, filename),
+                         f"{request.method} {request.path} {response.status_code}")
+        except Exception:
+            # Un perfil que no se pudo guardar no debe cambiar la respuesta
+            logger.warning("No se pudo guardar el perfil de %s %s", request.method, request.path, exc_info=True)
+            return response
+        finally:
+            _active.release()
+        response.headers["X-Profile-File"] = filename
+        return response
+
+    @app.teardown_request
+    def _abort_profile(exc=None):
+        # La petición terminó sin pasar por after_request
+        session = g.pop("profile_session", None)
+        if session is not None:
+            session.stop()
+            _active.release()
@@ -0,0 +1,135 @@
+# querystats.py
+"""
+Conteo y tiempo de las consultas SQL por petición.
+
+Los eventos de SQLAlchemy registran cada sentencia en los colectores
+activos del contexto (una ContextVar, válida tanto en hilos como en
+asyncio). Cada petición de Flask abre un colector y al terminar agrega el
+encabezado Server-Timing con el número de consultas y el tiempo en la base
+de datos, y lo registra en el log. track_queries() abre un colector en
+cualquier bloque de código, por ejemplo en los tests.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+_collectors = ContextVar("query_collectors", default=())
+
+
+class QueryStats:
+    """Consultas ejecutadas mientras el colector está activo"""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if record_statements else None
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _collectors.get() and context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _collectors.get()
+    started = getattr(context, "_query_started", None)
+    if not collectors or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for stats in collectors:
+        stats.count += 1
+        stats.seconds += elapsed
+        if stats.statements is not None:
+            stats.statements.append(statement)
+
+
+def start_tracking(record_statements: bool = False):
+    """
+    Activa un colector en el contexto actual.
+
+    Returns:
+        tuple: (QueryStats, token para stop_tracking).
+    """
+    stats = QueryStats(record_statements)
+    return stats, _collectors.set(_collectors.get() + (stats,))
+
+
+def stop_tracking(token):
+    """Desactiva el colector creado con start_tracking"""
+    _collectors.reset(token)
+
+
+@contextmanager
+def track_queries(record_statements: bool = False):
+    """
+    Cuenta las consultas ejecutadas dentro del bloque.
+
+    Args:
+        record_statements (bool): Guardar también el SQL de cada consulta.
+
+    Yields:
+        QueryStats: Colector con el conteo y el tiempo acumulado.
+    """
+    stats, token = start_tracking(record_statements)
+    try:
+        yield stats
+    finally:
+        stop_tracking(token)
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    """Valor del encabezado Server-Timing"""
+    return f'db;dur={stats.milliseconds:.3f};desc="{stats.count} consultas", total;dur={total_seconds * 1000:.3f}'
+
+
+def log_request(method: str, path: str, status: int, stats: QueryStats, total_seconds: float):
+    """Registra las consultas de una petición (WARNING si exceden QUERY_COUNT_WARN)"""
+    level = logging.WARNING if stats.count > Config.QUERY_COUNT_WARN else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(level, "%s %s %s: %d consultas, %.1f ms en la base de datos, %.1f ms en total",
+                   method, path, status, stats.count, stats.milliseconds, total_seconds * 1000)
+
+
+def init_query_stats(app: Flask):
+    """
+    Registra el conteo de consultas por petición en la aplicación.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    @app.before_request
+    def _start_request_stats():
+        g.query_stats, g.query_stats_token = start_tracking()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _add_server_timing(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+        total = time.perf_counter() - g.request_started
+        if Config.SERVER_TIMING:
+            response.headers["Server-Timing"] = server_timing(stats, total)
+        log_request(request.method, request.path, response.status_code, stats, total)
+        return response
+
+    @app.teardown_request
+    def _stop_request_stats(exc=None):
+        token = g.pop("query_stats_token", None)
+        if token is not None:
+            stop_tracking(token)
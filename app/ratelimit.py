@@ -0,0 +1,136 @@
+# ratelimit.py
+"""
+Límites de intentos de inicio de sesión.
+
+Cada llave (correo o IP) tiene un token bucket: admite ráfagas de hasta
+`capacity` intentos y recupera `capacity` intentos por `window` segundos.
+Los buckets viven en una tabla compartida de app.shm de 24 bytes por
+entrada; un bucket lleno equivale a uno inexistente, así que su entrada
+se reutiliza sin necesidad de limpieza.
+
+Detrás de un proxy todos los clientes llegan con la IP del proxy: con
+Config.TRUSTED_PROXIES la IP del cliente se toma de X-Forwarded-For, de
+modo que cada cliente tiene su propio bucket.
+"""
+import math
+import struct
+import threading
+import time
+from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app.config import Config
+from app.shm import SharedTable
+
+# Llave, intentos disponibles y momento de la última actualización
+SLOT = struct.Struct("<Qdd")
+
+
+class TokenBucketLimiter(SharedTable):
+    """Token buckets por llave en una tabla compartida"""
+
+    def __init__(self, capacity: int, window: float, slots: int, path: str = None):
+        super().__init__(slots, SLOT, path)
+        self.capacity = float(capacity)
+        self.rate = capacity / window
+
+    def _available(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def hit(self, name: str) -> float:
+        """
+        Consume un intento de la llave si hay disponibles.
+
+        Args:
+            name (str): Llave del bucket (correo, IP, etc.).
+
+        Returns:
+            float: 0 si el intento se admite, o los segundos que faltan para
+            que vuelva a haber uno disponible.
+        """
+        key = self.key(name)
+        now = time.time()
+        with self.locked():
+            found, free, fallback = None, None, None
+            for index, (slot_key, tokens, updated) in self.probe(key):
+                if slot_key == key:
+                    found = (index, self._available(tokens, updated, now))
+                    break
+                if slot_key == 0:
+                    free = index if free is None else free
+                    break
+                available = self._available(tokens, updated, now)
+                if free is None and available >= self.capacity:
+                    free = index
+                if fallback is None or available > fallback[1]:
+                    fallback = (index, available)
+
+            if found is not None:
+                index, tokens = found
+            else:
+                # Sin espacio se reemplaza el bucket con más intentos disponibles
+                index, tokens = (free, self.capacity) if free is not None else (fallback[0], self.capacity)
+
+            if tokens < 1:
+                self.write(index, key, tokens, now)
+                return (1 - tokens) / self.rate
+            self.write(index, key, tokens - 1, now)
+            return 0.0
+
+
+_limiters = None
+_limiters_lock = threading.Lock()
+
+
+def get_login_limiters():
+    """
+    Limitadores de intentos de login del proceso.
+
+    Returns:
+        tuple: (limitador por correo, limitador por IP).
+    """
+    global _limiters
+    with _limiters_lock:
+        if _limiters is None:
+            path = Config.LOGIN_THROTTLE_FILE
+            _limiters = (
+                TokenBucketLimiter(Config.LOGIN_EMAIL_ATTEMPTS, Config.LOGIN_EMAIL_WINDOW,
+                                   Config.LOGIN_THROTTLE_SLOTS, path and f"{path}.email"),
+                TokenBucketLimiter(Config.LOGIN_IP_ATTEMPTS, Config.LOGIN_IP_WINDOW,
+                                   Config.LOGIN_THROTTLE_SLOTS, path and f"{path}.ip"),
+            )
+        return _limiters
+
+
+def check_login_attempt(email: str, ip: str) -> int:
+    """
+    Registra un intento de login y decide si se admite.
+
+    Se llama antes de consultar la base de datos o calcular el hash, de modo
+    que los intentos rechazados no consumen CPU ni conexiones.
+
+    Args:
+        email (str): Correo del intento.
+        ip (str): Dirección IP del cliente.
+
+    Returns:
+        int: 0 si se admite, o los segundos para el encabezado Retry-After.
+    """
+    if not Config.LOGIN_THROTTLE:
+        return 0
+    by_email, by_ip = get_login_limiters()
+    wait = by_ip.hit(ip or "")
+    if not wait and email:
+        wait = by_email.hit(email.strip().lower())
+    return math.ceil(wait)
+
+
+def init_trusted_proxies(app: Flask):
+    """
+    Toma la IP y el esquema del cliente de los encabezados X-Forwarded-* que
+    agregan los Config.TRUSTED_PROXIES proxies de confianza.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    if Config.TRUSTED_PROXIES > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXIES, x_proto=Config.TRUSTED_PROXIES)
@@ -0,0 +1,271 @@
+# resizer.py
+"""
+Redimensionado de imágenes bajo demanda con caché en disco.
+
+La primera petición de una variante (ancho, alto, formato) la genera y la
+guarda en una caché acotada por tamaño con desalojo LRU; las siguientes se
+sirven directamente. Si varias peticiones piden la misma variante a la vez,
+solo una la genera y las demás esperan su resultado (single-flight).
+"""
+import functools
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from app.config import Config
+from app.metrics import RESIZE_CACHE_HITS, RESIZE_CACHE_MISSES
+from PIL import Image, ImageOps
+from app.storage import get_storage
+
+# Formatos de salida aceptados y su extensión
+FORMATS = {"webp": "webp", "jpeg": "jpg", "jpg": "jpg", "png": "png"}
+PILLOW_FORMATS = {"webp": "WEBP", "jpg": "JPEG", "png": "PNG"}
+
+
+class DiskLRUCache:
+    """
+    Caché de archivos en disco acotada por tamaño total.
+
+    El índice LRU vive en memoria y se reconstruye al iniciar a partir de la
+    fecha de modificación de los archivos. Cada proceso lleva su propio
+    índice, por lo que con varios workers el límite es aproximado.
+    """
+
+    def __init__(self, folder: str, max_bytes: int):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        files = []
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+        self._evict()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, key)
+
+    def get(self, key: str):
+        """
+        Busca una entrada y la marca como usada recientemente.
+
+        Returns:
+            str | None: Ruta del archivo o None si no está en caché.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self.path(key)
+            try:
+                # Persistir el orden LRU para el próximo arranque
+                os.utime(path)
+            except FileNotFoundError:
+                # Otro proceso la desalojó
+                self._total -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+        return path
+
+    def put(self, key: str, write) -> str:
+        """
+        Agrega una entrada escribiéndola de forma atómica.
+
+        Args:
+            key (str): Nombre del archivo en la caché.
+            write (callable): Función que recibe la ruta temporal y escribe el archivo.
+
+        Returns:
+            str: Ruta final del archivo.
+        """
+        path = self.path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        size = os.path.getsize(path)
+        with self._lock:
+            if key in self._entries:
+                self._total -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total += size
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Siempre conserva la entrada más reciente aunque exceda el límite
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+
+class SingleFlight:
+    """Asegura que solo un hilo ejecute el trabajo de una misma llave a la vez"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Ejecuta func una sola vez para todas las llamadas concurrentes con la misma llave.
+
+        Returns:
+            Resultado de func (o su excepción) compartido entre las llamadas.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_flights = SingleFlight()
+
+
+def get_cache() -> DiskLRUCache:
+    """Caché de variantes redimensionadas del proceso"""
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.folder != Config.RESIZE_CACHE_FOLDER:
+            _cache = DiskLRUCache(Config.RESIZE_CACHE_FOLDER, Config.RESIZE_CACHE_MAX_BYTES)
+        return _cache
+
+
+def allowed_dimensions() -> frozenset:
+    """Anchos y altos admitidos (Config.RESIZE_ALLOWED_DIMENSIONS, hasta RESIZE_MAX_DIMENSION)"""
+    return _parse_dimensions(Config.RESIZE_ALLOWED_DIMENSIONS, Config.RESIZE_MAX_DIMENSION)
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_dimensions(value: str, maximum: int) -> frozenset:
+    return frozenset(d for d in (int(part) for part in value.split(",") if part.strip()) if 0 < d <= maximum)
+
+
+def parse_resize_args(args):
+    """
+    Valida los parámetros w, h y fmt.
+
+    Args:
+        args (MultiDict): Parámetros de la petición.
+
+    Returns:
+        tuple: (ancho, alto, extensión); 0 indica dimensión libre.
+
+    Raises:
+        ValueError: Si algún parámetro es inválido.
+    """
+    allowed = allowed_dimensions()
+    dims = []
+    for name in ("w", "h"):
+        raw = args.get(name) or "0"
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValueError(f"El parámetro {name} debe ser un entero")
+        if value != 0 and value not in allowed:
+            raise ValueError(f"El parámetro {name} debe ser uno de: {', '.join(map(str, sorted(allowed)))}")
+        dims.append(value)
+
+    fmt = (args.get("fmt") or Config.IMAGE_VARIANT_FORMAT).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    return dims[0], dims[1], FORMATS[fmt]
+
+
+def cache_key(filename: str, width: int, height: int, ext: str) -> str:
+    """Nombre del archivo en caché para una variante"""
+    return f"{filename.replace('.', '_')}-{width}x{height}.{ext}"
+
+
+def resize_image(source, target: str, width: int, height: int, ext: str):
+    """
+    Redimensiona una imagen para que quepa en width x height sin deformarla.
+
+    Args:
+        source: Ruta o archivo abierto de la imagen original.
+        target (str): Ruta donde se escribe el resultado.
+        width (int): Ancho máximo (0 = libre).
+        height (int): Alto máximo (0 = libre).
+        ext (str): Extensión del formato de salida.
+    """
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        bounds = (width or image.width, height or image.height)
+        image.thumbnail(bounds, Image.LANCZOS)
+        # CMYK, paleta, escala de grises, etc. se llevan a RGB(A), que todos los formatos aceptan
+        alpha = ext != "jpg" and ("A" in image.getbands() or "transparency" in image.info)
+        mode = "RGBA" if alpha else "RGB"
+        if image.mode != mode:
+            image = image.convert(mode)
+        image.save(target, format=PILLOW_FORMATS[ext], quality=Config.IMAGE_QUALITY)
+
+
+def get_resized(filename: str, width: int, height: int, ext: str) -> str:
+    """
+    Obtiene una variante redimensionada desde la caché o la genera.
+
+    Args:
+        filename (str): Nombre del archivo original en el almacenamiento.
+        width (int): Ancho máximo.
+        height (int): Alto máximo.
+        ext (str): Extensión del formato de salida.
+
+    Returns:
+        str: Ruta de la variante en la caché local.
+    """
+    cache = get_cache()
+    key = cache_key(filename, width, height, ext)
+
+    path = cache.get(key)
+    if path:
+        RESIZE_CACHE_HITS.inc()
+        return path
+    RESIZE_CACHE_MISSES.inc()
+
+    storage = get_storage()
+
+    def write(tmp_path):
+        with storage.open(filename) as source:
+            resize_image(source, tmp_path, width, height, ext)
+
+    def generate():
+        # Otra petición pudo generarla mientras esperábamos el turno
+        return cache.get(key) or cache.put(key, write)
+
+    return _flights.do(key, generate)
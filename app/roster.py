@@ -0,0 +1,200 @@
+# roster.py
+"""
+Registro masivo de estudiantes desde una lista (CSV o JSONL).
+
+Formatos aceptados:
+- CSV con las columnas name, email, password.
+- JSONL con un objeto {"name", "email", "password"} por línea.
+
+Los correos ya registrados se detectan con una consulta por cada
+LOOKUP_CHUNK_SIZE correos (por debajo del límite de parámetros de SQLite),
+los hashes se calculan en paralelo en el pool de app.passwords y los
+usuarios se insertan por lotes.
+"""
+import csv
+import time
+import uuid
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import Config
+from app.db.models import db, User, utcnow
+from app.importer import check_text, read_jsonl
+from app.passwords import hash_passwords
+
+EMAIL_DOMAIN = "@alumnos.udg.mx"
+LOOKUP_CHUNK_SIZE = 500
+
+
+class RosterTooLarge(ValueError):
+    """La lista excede las filas permitidas"""
+
+
+def read_roster(stream, fmt: str):
+    """
+    Lee los registros de una lista de estudiantes.
+
+    Args:
+        stream: Archivo de texto abierto.
+        fmt (str): "csv" o "jsonl".
+
+    Returns:
+        tuple: (records, errors, rows) como en app.importer.read_records.
+    """
+    if fmt == "jsonl":
+        return read_jsonl(stream)
+    if fmt == "csv":
+        # La fila 1 es el encabezado
+        records = list(enumerate(csv.DictReader(stream), start=2))
+        return records, [], len(records)
+    raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def validate_student(row: int, record: dict):
+    """
+    Valida y normaliza un estudiante.
+
+    Returns:
+        tuple: (student, error) donde uno de los dos es None.
+    """
+    try:
+        name = check_text(record.get("name"), "name", 150)
+        email = check_text(record.get("email"), "email", 150)
+        password = record.get("password")
+        if not password or not isinstance(password, str):
+            raise ValueError("El campo 'password' es requerido")
+        if not email.endswith(EMAIL_DOMAIN):
+            raise ValueError(f"El correo debe ser {EMAIL_DOMAIN}")
+    except ValueError as e:
+        return None, {"row": row, "error": str(e)}
+    return {"row": row, "name": name, "email": email, "password": password}, None
+
+
+def find_registered(session, emails) -> set:
+    """Correos de la lista que ya existen, con una consulta por cada LOOKUP_CHUNK_SIZE correos"""
+    registered = set()
+    for start in range(0, len(emails), LOOKUP_CHUNK_SIZE):
+        chunk = emails[start:start + LOOKUP_CHUNK_SIZE]
+        registered.update(session.execute(select(User.email).where(User.email.in_(chunk))).scalars())
+    return registered
+
+
+def insert_students(session, students, batch_size=None):
+    """
+    Inserta los estudiantes en transacciones por lotes.
+
+    Si otro proceso registra uno de los correos entre la verificación y la
+    inserción, ese lote se reintenta fila por fila para aislar el conflicto.
+
+    Args:
+        session (Session): Sesión de la base de datos.
+        students (list): Estudiantes validados con su password_hash.
+        batch_size (int, opcional): Usuarios por transacción.
+
+    Returns:
+        tuple: (num_insertados, conflicts)
+    """
+    batch_size = batch_size or Config.IMPORT_BATCH_SIZE
+    table = User.__table__
+    inserted, conflicts = 0, []
+
+    for start in range(0, len(students), batch_size):
+        batch = students[start:start + batch_size]
+        now = utcnow()
+        rows = [{
+            "id": str(uuid.uuid4()),
+            "name": s["name"],
+            "email": s["email"],
+            "password_hash": s["password_hash"],
+            "created_at": now,
+            "updated_at": now
+        } for s in batch]
+        try:
+            session.execute(insert(table), rows)
+            session.commit()
+            inserted += len(rows)
+        except IntegrityError:
+            session.rollback()
+            for student, row in zip(batch, rows):
+                try:
+                    session.execute(insert(table), row)
+                    session.commit()
+                    inserted += 1
+                except IntegrityError:
+                    session.rollback()
+                    conflicts.append({"row": student["row"], "email": student["email"], "error": "Este correo ya está registrado"})
+
+    return inserted, conflicts
+
+
+def register_students(stream, fmt: str, batch_size=None, max_rows=None) -> dict:
+    """
+    Registra una lista completa de estudiantes y genera un reporte.
+
+    Args:
+        stream: Archivo de texto abierto.
+        fmt (str): "csv" o "jsonl".
+        batch_size (int, opcional): Usuarios por transacción.
+        max_rows (int, opcional): Filas máximas; la lista se rechaza sin registrar a nadie.
+
+    Returns:
+        dict: Reporte con filas leídas, usuarios registrados, errores de
+        validación, conflictos por correo duplicado, tiempo total y
+        usuarios por segundo.
+
+    Raises:
+        RosterTooLarge: Si la lista tiene más de max_rows filas.
+    """
+    start = time.perf_counter()
+
+    records, errors, rows = read_roster(stream, fmt)
+    if max_rows and rows > max_rows:
+        raise RosterTooLarge(
+            f"La lista tiene {rows} filas y el máximo por petición es {max_rows}; "
+            "para listas grandes usa flask register-students"
+        )
+
+    students, conflicts, seen = [], [], set()
+    for row, record in records:
+        student, error = validate_student(row, record)
+        if error:
+            errors.append(error)
+        elif student["email"] in seen:
+            conflicts.append({"row": row, "email": student["email"], "error": "Correo repetido en el archivo"})
+        else:
+            seen.add(student["email"])
+            students.append(student)
+
+    session_db = Session(db.engine)
+    try:
+        registered = find_registered(session_db, [s["email"] for s in students])
+        new = []
+        for student in students:
+            if student["email"] in registered:
+                conflicts.append({"row": student["row"], "email": student["email"], "error": "Este correo ya está registrado"})
+            else:
+                new.append(student)
+
+        hash_start = time.perf_counter()
+        for student, password_hash in zip(new, hash_passwords([s["password"] for s in new])):
+            student["password_hash"] = password_hash
+        hash_seconds = time.perf_counter() - hash_start
+
+        inserted, insert_conflicts = insert_students(session_db, new, batch_size=batch_size)
+        conflicts.extend(insert_conflicts)
+    finally:
+        session_db.close()
+
+    elapsed = time.perf_counter() - start
+    errors.sort(key=lambda e: e["row"])
+    conflicts.sort(key=lambda c: c["row"])
+
+    return {
+        "rows": rows,
+        "registered": inserted,
+        "errors": errors,
+        "conflicts": conflicts,
+        "hash_seconds": round(hash_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(inserted / elapsed, 1) if elapsed else 0.0
+    }
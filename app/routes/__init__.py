@@ -6,6 +6,7 @@ from app.routes.uploads import create_upload_routes
 from app.routes.auth import create_auth_routes
 from app.routes.places import create_places_routes
 from app.routes.comments import create_comments_routes
+from app.routes.admin import create_admin_routes
 
 
 def register_routes(api: Api):
@@ -19,3 +20,4 @@ def register_routes(api: Api):
     create_auth_routes(api)
     create_places_routes(api)
     create_comments_routes(api)
+    create_admin_routes(api)
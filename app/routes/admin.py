@@ -0,0 +1,235 @@
+import hmac
+import io
+from functools import wraps
+from flask import request, Response, stream_with_context
+from flask_restx import Resource, Api, fields, Namespace, abort
+from app.config import Config
+from app.exporter import EXPORTS, export_ndjson, parse_since
+from app.importer import detect_format, import_catalog
+from app.roster import RosterTooLarge, register_students
+from app.profiling import speedscope_document
+from app.sampler import collapsed, combined_stacks, get_sampler
+from app.slowqueries import get_query_stats
+
+
+def admin_required(func):
+    """Restringe un endpoint a peticiones con un X-Admin-Token válido"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get("X-Admin-Token", "")
+        if not Config.ADMIN_TOKEN or not hmac.compare_digest(token, Config.ADMIN_TOKEN):
+            abort(403, "No autorizado")
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def create_admin_routes(api: Api) -> Namespace:
+    """Crea las rutas de administración"""
+
+    api_ns = api.namespace('admin', path='/api/admin', description='Endpoints de administración')
+
+    # Modelos para la documentación
+    row_error_model = api_ns.model('RowError', {
+        'row': fields.Integer(description='Número de fila en el archivo'),
+        'error': fields.String(description='Descripción del error')
+    })
+
+    import_report_model = api_ns.model('ImportReport', {
+        'rows': fields.Integer(description='Filas leídas'),
+        'places': fields.Integer(description='Lugares insertados'),
+        'menu_items': fields.Integer(description='Platillos insertados'),
+        'errors': fields.List(fields.Nested(row_error_model), description='Errores por fila'),
+        'elapsed_seconds': fields.Float(description='Duración total'),
+        'rows_per_second': fields.Float(description='Filas insertadas por segundo')
+    })
+
+    conflict_model = api_ns.model('RowConflict', {
+        'row': fields.Integer(description='Número de fila en el archivo'),
+        'email': fields.String(description='Correo en conflicto'),
+        'error': fields.String(description='Descripción del conflicto')
+    })
+
+    roster_report_model = api_ns.model('RosterReport', {
+        'rows': fields.Integer(description='Filas leídas'),
+        'registered': fields.Integer(description='Usuarios registrados'),
+        'errors': fields.List(fields.Nested(row_error_model), description='Errores de validación por fila'),
+        'conflicts': fields.List(fields.Nested(conflict_model), description='Correos ya registrados o repetidos'),
+        'hash_seconds': fields.Float(description='Tiempo calculando hashes'),
+        'elapsed_seconds': fields.Float(description='Duración total'),
+        'rows_per_second': fields.Float(description='Usuarios registrados por segundo')
+    })
+
+    @api_ns.route('/import')
+    class CatalogImport(Resource):
+        @admin_required
+        @api_ns.marshal_with(import_report_model)
+        def post(self):
+            """
+            Importa lugares y menús de forma masiva desde un archivo CSV o JSONL.
+
+            Returns:
+                Response: Reporte de la importación.
+            """
+            file = request.files.get("file")
+            if not file:
+                abort(400, "El archivo es requerido")
+
+            try:
+                fmt = request.form.get("format") or detect_format(file.filename)
+                stream = io.TextIOWrapper(file.stream, encoding="utf-8", newline="")
+                return import_catalog(stream, fmt)
+            except ValueError as e:
+                abort(400, str(e))
+
+    @api_ns.route('/students')
+    class StudentRoster(Resource):
+        @admin_required
+        @api_ns.marshal_with(roster_report_model)
+        def post(self):
+            """
+            Registra estudiantes de forma masiva desde un archivo CSV o JSONL.
+
+            Returns:
+                Response: Reporte del registro.
+            """
+            file = request.files.get("file")
+            if not file:
+                abort(400, "El archivo es requerido")
+
+            try:
+                fmt = request.form.get("format") or detect_format(file.filename)
+                stream = io.TextIOWrapper(file.stream, encoding="utf-8", newline="")
+                return register_students(stream, fmt, max_rows=Config.ROSTER_WEB_MAX_ROWS)
+            except RosterTooLarge as e:
+                abort(413, str(e))
+            except ValueError as e:
+                abort(400, str(e))
+
+    sampler_status_model = api_ns.model('SamplerStatus', {
+        'pid': fields.Integer(description='Proceso que respondió'),
+        'interval_ms': fields.Float(description='Milisegundos entre muestras'),
+        'samples': fields.Integer(description='Muestras tomadas'),
+        'stacks': fields.Integer(description='Pilas distintas en memoria'),
+        'dropped': fields.Integer(description='Muestras descartadas por el límite de pilas'),
+        'elapsed_seconds': fields.Float(description='Segundos desde que inició el muestreo'),
+        'sampler_cpu_seconds': fields.Float(description='CPU consumida por el sampler'),
+        'overhead_percent': fields.Float(description='Porcentaje de un núcleo usado por el sampler')
+    })
+
+    @api_ns.route('/profile/sampler')
+    class SamplerStatus(Resource):
+        @admin_required
+        @api_ns.marshal_with(sampler_status_model)
+        def get(self):
+            """
+            Estado del muestreo continuo de pilas y su costo en CPU.
+
+            Returns:
+                Response: Estado del sampler del proceso.
+            """
+            if not Config.SAMPLER_ENABLED:
+                abort(404, "El muestreo de pilas está deshabilitado")
+            return get_sampler().status()
+
+    @api_ns.route('/profile/stacks')
+    @api_ns.doc(params={'format': 'collapsed (por defecto) o speedscope'})
+    class SampledStacks(Resource):
+        @admin_required
+        def get(self):
+            """
+            Pilas muestreadas de los hilos de las peticiones.
+
+            Returns:
+                Response: Pilas plegadas (flamegraph.pl, speedscope) o un documento de speedscope.
+            """
+            if not Config.SAMPLER_ENABLED:
+                abort(404, "El muestreo de pilas está deshabilitado")
+
+            fmt = request.args.get("format", "collapsed")
+            stacks = combined_stacks()
+            if fmt == "collapsed":
+                return Response(collapsed(stacks.most_common()), mimetype="text/plain")
+            if fmt == "speedscope":
+                document = speedscope_document("Muestreo de peticiones", stacks.most_common(),
+                                               Config.SAMPLER_INTERVAL_MS / 1000)
+                return document
+            abort(400, f"Formato no soportado: {fmt}")
+
+    query_stats_model = api_ns.model('QueryFingerprintStats', {
+        'fingerprint': fields.String(description='Huella de la consulta'),
+        'query': fields.String(description='SQL normalizado'),
+        'count': fields.Integer(description='Ejecuciones'),
+        'slow': fields.Integer(description='Ejecuciones que excedieron SLOW_QUERY_MS'),
+        'total_seconds': fields.Float(description='Tiempo total'),
+        'mean_seconds': fields.Float(description='Tiempo promedio'),
+        'max_seconds': fields.Float(description='Tiempo máximo'),
+        'plan': fields.String(description='Último plan capturado (PostgreSQL)')
+    })
+
+    query_orders = {"total": "total_seconds", "mean": "mean_seconds", "max": "max_seconds", "count": "count"}
+
+    @api_ns.route('/queries')
+    @api_ns.doc(params={
+        'order': 'total (por defecto), mean, max o count',
+        'limit': 'Número de consultas (por defecto 50)'
+    })
+    class QueryStats(Resource):
+        @admin_required
+        @api_ns.marshal_list_with(query_stats_model)
+        def get(self):
+            """
+            Estadísticas por huella de las consultas SQL del proceso.
+
+            Returns:
+                Response: Consultas ordenadas de mayor a menor costo.
+            """
+            order = request.args.get("order", "total")
+            if order not in query_orders:
+                abort(400, f"Orden no soportado: {order}")
+            try:
+                limit = int(request.args.get("limit", 50))
+            except ValueError:
+                abort(400, "El parámetro limit debe ser un entero")
+            return get_query_stats().top(limit, query_orders[order])
+
+        @admin_required
+        def delete(self):
+            """
+            Reinicia las estadísticas por huella del proceso.
+            """
+            get_query_stats().reset()
+            return {"message": "Estadísticas reiniciadas"}, 200
+
+    @api_ns.route('/export/<string:entity>')
+    @api_ns.doc(params={
+        'entity': 'places, menu_items, comments o users',
+        'since': 'Solo filas creadas o modificadas desde esta fecha (ISO 8601); no incluye las eliminadas'
+    })
+    class Export(Resource):
+        @admin_required
+        def get(self, entity):
+            """
+            Exporta una entidad completa en formato NDJSON.
+
+            Args:
+                entity (str): Nombre de la entidad a exportar.
+
+            Returns:
+                Response: Flujo NDJSON con una fila por línea.
+            """
+            if entity not in EXPORTS:
+                abort(404, f"Entidad desconocida: {entity}")
+
+            try:
+                since = parse_since(request.args.get("since"))
+            except ValueError as e:
+                abort(400, str(e))
+
+            return Response(
+                stream_with_context(export_ndjson(entity, since=since)),
+                mimetype="application/x-ndjson"
+            )
+
+    return api_ns
@@ -1,8 +1,10 @@
 from flask import request
 from flask_restx import Resource, Api, fields, Namespace
-from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.orm import Session
 from app.db.models import db, User
+from app.passwords import hash_password, needs_rehash, verify_password
+from app.ratelimit import check_login_attempt
+from app.tokens import bearer_token, decode_token, issue_token, revoke_token
 
 
 def create_auth_routes(api: Api) -> Namespace:
@@ -25,7 +27,10 @@ def create_auth_routes(api: Api) -> Namespace:
     login_response_model = api_ns.model('LoginResponse', {
         'message': fields.String(description='Mensaje de respuesta'),
         'user_id': fields.String(description='ID del usuario'),
-        'user_name': fields.String(description='Nombre del usuario')
+        'user_name': fields.String(description='Nombre del usuario'),
+        'access_token': fields.String(description='Token de acceso (Authorization: Bearer)'),
+        'token_type': fields.String(description='Tipo de token'),
+        'expires_in': fields.Integer(description='Segundos de validez del token')
     })
 
     message_model = api_ns.model('Message', {
@@ -57,7 +62,8 @@ def create_auth_routes(api: Api) -> Namespace:
                     return {"message": "Este correo ya está registrado"}, 409
 
                 user = User(name=name, email=email)
-                user.password_hash = generate_password_hash(password)
+                # El hash se calcula en el pool de procesos (ver app.passwords)
+                user.password_hash = hash_password(password)
 
                 session_db.add(user)
                 session_db.commit()
@@ -79,24 +85,35 @@ def create_auth_routes(api: Api) -> Namespace:
             Returns:
                 Response: Mensaje de éxito o error con información del usuario.
             """
+            email = request.form.get("email")
+            password = request.form.get("password")
+
+            # Los intentos excedidos se rechazan sin consultar la base de datos ni calcular el hash
+            retry_after = check_login_attempt(email, request.remote_addr)
+            if retry_after:
+                return {"message": "Demasiados intentos, intenta más tarde"}, 429, {"Retry-After": str(retry_after)}
+
             session_db = Session(db.engine)
             try:
-                email = request.form.get("email")
-                password = request.form.get("password")
-
                 # Email y password son requeridos
                 if not email or not password:
                     return {"message": "Credenciales inválidas"}, 401
 
                 user = session_db.query(User).filter(User.email == email).first()
 
-                if not user or not check_password_hash(user.password_hash, password):
+                if not user or not verify_password(user.password_hash, password):
                     return {"message": "Credenciales inválidas"}, 401
 
+                # Migra el hash si se cambió el algoritmo o su costo
+                if needs_rehash(user.password_hash):
+                    user.password_hash = hash_password(password)
+                    session_db.commit()
+
                 return {
                     "message": "Logged in",
                     "user_id": user.id,
-                    "user_name": user.name
+                    "user_name": user.name,
+                    **issue_token(user.id, user.name)
                 }, 200
 
             finally:
@@ -110,9 +127,15 @@ def create_auth_routes(api: Api) -> Namespace:
             """
             Finaliza la sesión del usuario.
 
+            Si la petición incluye un token de acceso, este queda revocado
+            hasta su expiración.
+
             Returns:
                 Response: Mensaje de éxito.
             """
+            claims = decode_token(bearer_token())
+            if claims:
+                revoke_token(claims)
             return {"message": "Logged out"}, 200
     
     return api_ns
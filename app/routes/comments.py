@@ -1,10 +1,24 @@
-from flask import request
+from flask import g, request
 from flask_restx import Resource, Api, fields, Namespace
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.db.models import db, Place, Comment
+from app.tokens import token_required
 from app.utils import update_place_rating
 
 
+def comment_to_dict(c: Comment) -> dict:
+    """Datos de un comentario con el nombre de su autor"""
+    return {
+        "id": c.id,
+        "place_id": c.place_id,
+        "user_id": c.user_id,
+        "user_name": c.user.name,
+        "text": c.text,
+        "rating": c.rating
+    }
+
+
 def create_comments_routes(api: Api) -> Namespace:
     """Crea las rutas de comentarios"""
     
@@ -47,26 +61,20 @@ def create_comments_routes(api: Api) -> Namespace:
                 if not place:
                     return {"error": "Place not found"}, 404
 
-                return [
-                    {
-                        "id": c.id,
-                        "place_id": c.place_id,
-                        "user_id": c.user_id,
-                        "user_name": c.user.name,
-                        "text": c.text,
-                        "rating": c.rating
-                    }
-                    for c in place.comments
-                ]
+                return [comment_to_dict(c) for c in place.comments]
             finally:
                 session_db.close()
 
         @api_ns.expect(comment_model, validate=False)
         @api_ns.marshal_with(id_model, code=201)
+        @token_required
         def post(self, place_id):
             """
             Agrega un comentario a un lugar específico.
 
+            El autor es el usuario del token de acceso; no se consulta la
+            tabla de usuarios.
+
             Args:
                 place_id (str): ID del lugar.
 
@@ -87,13 +95,18 @@ def create_comments_routes(api: Api) -> Namespace:
 
                 new_comment = Comment(
                     place_id=place_id,
-                    user_id=request.form.get("user_id"),
+                    user_id=g.user["sub"],
                     text=text,
                     rating=int(request.form.get("rating", 0))
                 )
 
                 session_db.add(new_comment)
-                session_db.commit()
+                try:
+                    session_db.commit()
+                except IntegrityError:
+                    # El usuario del token ya no existe
+                    session_db.rollback()
+                    return {"error": "Usuario no encontrado"}, 401
 
                 update_place_rating(session_db, place)
                 session_db.commit()
@@ -108,6 +121,7 @@ def create_comments_routes(api: Api) -> Namespace:
     class CommentResource(Resource):
         @api_ns.expect(comment_model, validate=False)
         @api_ns.marshal_with(message_model)
+        @token_required
         def put(self, comment_id):
             """
             Actualiza un comentario existente.
@@ -123,6 +137,8 @@ def create_comments_routes(api: Api) -> Namespace:
                 c = session_db.get(Comment, comment_id)
                 if not c:
                     return {"error": "Comentario no encontrado"}, 404
+                if c.user_id != g.user["sub"]:
+                    return {"message": "Solo el autor puede editar el comentario"}, 403
 
                 data = request.json
                 c.text = data.get("text", c.text)
@@ -137,6 +153,7 @@ def create_comments_routes(api: Api) -> Namespace:
                 session_db.close()
 
         @api_ns.marshal_with(message_model)
+        @token_required
         def delete(self, comment_id):
             """
             Elimina un comentario del sistema.
@@ -152,6 +169,8 @@ def create_comments_routes(api: Api) -> Namespace:
                 c = session_db.get(Comment, comment_id)
                 if not c:
                     return {"error": "Comment not found"}, 404
+                if c.user_id != g.user["sub"]:
+                    return {"message": "Solo el autor puede eliminar el comentario"}, 403
 
                 place = c.place
 
@@ -1,11 +1,67 @@
 import json
 from flask import request
 from flask_restx import Resource, Api, fields, Namespace
-from sqlalchemy.orm import Session
-from app.db.models import db, Place, MenuItem
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+from app.db.models import db, Place, MenuItem, Comment
+from app.images import image_variants
 from app.routes.uploads import save_upload_file
 
 
+def place_detail(p: Place) -> dict:
+    """
+    Datos de un lugar con su menú, como los retorna GET /api/places/<id>.
+
+    Args:
+        p (Place): Lugar con sus platillos cargados o cargables.
+
+    Returns:
+        dict: Datos del lugar sin serializar.
+    """
+    return {
+        "id": p.id,
+        "name": p.name,
+        "schedule": p.schedule,
+        "category": p.category,
+        "image_url": p.image_url,
+        "thumbnails": image_variants(p.image_url),
+        "menu": [{"category": m.category, "dish_name": m.dish_name, "price": m.price} for m in p.menu_items],
+        "rating": p.rating,
+        "num_ratings": p.num_ratings
+    }
+
+
+def place_summary(p: Place, latest_comment: str = "") -> dict:
+    """Datos de un lugar en el listado: el detalle más su último comentario"""
+    summary = place_detail(p)
+    summary["latest_comment"] = latest_comment
+    return summary
+
+
+def latest_comments_query(category: str = None):
+    """
+    Consulta del comentario más reciente de cada lugar.
+
+    Un row_number() por lugar, ordenado por created_at, deja una sola fila
+    por lugar en lugar de cargar todos sus comentarios.
+
+    Args:
+        category (str, opcional): Limita la consulta a los lugares de esa categoría.
+
+    Returns:
+        Select: Consulta de filas (place_id, text).
+    """
+    rank = func.row_number().over(
+        partition_by=Comment.place_id,
+        order_by=(Comment.created_at.desc(), Comment.id.desc())
+    )
+    ranked = select(Comment.place_id, Comment.text, rank.label("rank"))
+    if category:
+        ranked = ranked.join(Place, Place.id == Comment.place_id).where(Place.category == category)
+    ranked = ranked.subquery()
+    return select(ranked.c.place_id, ranked.c.text).where(ranked.c.rank == 1)
+
+
 def create_places_routes(api: Api) -> Namespace:
     """Crea las rutas de lugares"""
     
@@ -24,6 +80,7 @@ def create_places_routes(api: Api) -> Namespace:
         'schedule': fields.Raw(required=False, description='Horario (objeto JSON)'),
         'category': fields.String(required=False, description='Categoría'),
         'image_url': fields.String(required=False, description='URL de la imagen'),
+        'thumbnails': fields.Raw(readOnly=True, description='URLs de las miniaturas por tamaño (sm, md, lg, placeholder)'),
         'menu': fields.List(fields.Nested(menu_item_model), description='Lista de elementos del menú'),
         'rating': fields.Float(description='Calificación promedio'),
         'num_ratings': fields.Integer(description='Número de calificaciones'),
@@ -58,28 +115,18 @@ def create_places_routes(api: Api) -> Namespace:
             session_db = Session(db.engine)
             try:
                 category = request.args.get("category")
+                if category and category.lower() == "all":
+                    category = None
 
-                query = session_db.query(Place)
-                if category and category.lower() != "all":
+                # Menús y últimos comentarios en una consulta cada uno, no una por lugar
+                query = session_db.query(Place).options(selectinload(Place.menu_items))
+                if category:
                     query = query.filter(Place.category == category)
 
                 places = query.all()
+                latest = dict(session_db.execute(latest_comments_query(category)).all())
 
-                result = []
-                for p in places:
-                    result.append({
-                        "id": p.id,
-                        "name": p.name,
-                        "schedule": p.schedule,
-                        "category": p.category,
-                        "image_url": p.image_url,
-                        "menu": [{"category": m.category, "dish_name": m.dish_name, "price": m.price} for m in p.menu_items],
-                        "rating": p.rating,
-                        "num_ratings": p.num_ratings,
-                        "latest_comment": p.comments[-1].text if p.comments else ""
-                    })
-
-                return result
+                return [place_summary(p, latest.get(p.id, "")) for p in places]
             finally:
                 session_db.close()
 
@@ -153,16 +200,7 @@ def create_places_routes(api: Api) -> Namespace:
                 if not p:
                     return {"error": "Place not found"}, 404
 
-                return {
-                    "id": p.id,
-                    "name": p.name,
-                    "schedule": p.schedule,
-                    "category": p.category,
-                    "image_url": p.image_url,
-                    "menu": [{"category": m.category, "dish_name": m.dish_name, "price": m.price} for m in p.menu_items],
-                    "rating": p.rating,
-                    "num_ratings": p.num_ratings
-                }
+                return place_detail(p)
             finally:
                 session_db.close()
 
@@ -1,8 +1,25 @@
+import hashlib
+import mimetypes
 import os
-from flask import send_from_directory
-from flask_restx import Resource, Api
-from werkzeug.utils import secure_filename
+import tempfile
+from flask import Response, redirect, request, send_file
+from PIL import Image
+from flask_restx import Resource, Api, abort
+from werkzeug.exceptions import NotFound, RequestEntityTooLarge
 from app.config import Config
+from app.images import parse_variant, schedule_processing, strip_metadata
+from app.metrics import UPLOAD_BYTES, UPLOAD_SIZE
+from app.storage import CONTENT_ADDRESSED, cache_control_for, get_storage
+from app.tracing import span
+from app import resizer
+
+# Firmas (magic bytes) de los formatos aceptados y su extensión canónica
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
 
 
 def create_upload_routes(api: Api):
@@ -14,13 +31,159 @@ def create_upload_routes(api: Api):
             """
             Sirve un archivo subido desde el directorio de uploads.
 
+            Con los parámetros w, h y/o fmt sirve una copia redimensionada
+            que se genera en la primera petición y se guarda en caché.
+
             Args:
                 filename (str): Nombre del archivo a servir.
 
             Returns:
                 Response: Archivo solicitado.
             """
-            return send_from_directory(Config.UPLOAD_FOLDER, filename)
+            if any(name in request.args for name in ("w", "h", "fmt")):
+                return _send_resized(filename)
+
+            storage = get_storage()
+            variant = parse_variant(filename)
+            if variant and not storage.exists(filename):
+                # La variante aún no se genera: servir el original mientras tanto
+                original = _find_original(storage, variant[0])
+                if original:
+                    return send_upload(original, cache_control="no-cache")
+
+            return send_upload(filename, cache_control=cache_control_for(filename))
+
+
+def _send_resized(filename: str):
+    """Sirve una variante redimensionada de un upload"""
+    try:
+        width, height, ext = resizer.parse_resize_args(request.args)
+    except ValueError as e:
+        abort(400, str(e))
+
+    if not get_storage().exists(filename):
+        raise NotFound()
+
+    # La variante puede desalojarse entre get_resized y la apertura del
+    # archivo; en ese caso se genera de nuevo una sola vez
+    for attempt in range(2):
+        try:
+            path = resizer.get_resized(filename, width, height, ext)
+        except Image.DecompressionBombError:
+            abort(413, "La imagen tiene demasiados píxeles para redimensionarla")
+        except OSError:
+            abort(415, "El archivo no es una imagen válida")
+        try:
+            # Una variante de un archivo inmutable también es inmutable
+            return send_local_file(
+                path,
+                cache_control=cache_control_for(filename),
+                accel_prefix=Config.RESIZE_ACCEL_PREFIX
+            )
+        except (NotFound, FileNotFoundError):
+            if attempt:
+                raise NotFound()
+
+
+def send_upload(filename: str, cache_control: str = None):
+    """
+    Construye la respuesta para un archivo subido.
+
+    Con almacenamiento local el archivo se envía con send_local_file. Con un
+    backend remoto se redirige a una URL firmada o, si
+    Config.STORAGE_READ_MODE es "proxy", se retransmite por bloques.
+
+    Args:
+        filename (str): Nombre del archivo en el almacenamiento.
+        cache_control (str, opcional): Valor del encabezado Cache-Control.
+
+    Returns:
+        Response: Respuesta con el archivo.
+
+    Raises:
+        NotFound: Si el archivo no existe.
+    """
+    storage = get_storage()
+    path = storage.local_path(filename)
+    if path is not None:
+        return send_local_file(path, cache_control=cache_control, accel_prefix=Config.UPLOAD_ACCEL_PREFIX)
+
+    if Config.STORAGE_READ_MODE == "presigned":
+        url = storage.read_url(filename, Config.S3_PRESIGNED_EXPIRES)
+        response = redirect(url)
+        # La redirección puede cachearse mientras la firma siga vigente
+        response.headers["Cache-Control"] = f"private, max-age={Config.S3_PRESIGNED_EXPIRES // 2}"
+        return response
+
+    stored = storage.stat(filename)
+    if stored is None:
+        raise NotFound()
+
+    response = Response(
+        storage.iter_chunks(filename),
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        direct_passthrough=True
+    )
+    response.content_length = stored.size
+    response.last_modified = stored.modified
+    if CONTENT_ADDRESSED.match(filename):
+        response.set_etag(filename.split(".", 1)[0])
+    else:
+        response.set_etag(f"{stored.size}-{int(stored.modified)}")
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    # Con 304 el cuerpo no se consume y el objeto remoto nunca se descarga
+    return response.make_conditional(request)
+
+
+def send_local_file(path: str, cache_control: str = None, accel_prefix: str = None):
+    """
+    Construye la respuesta para un archivo del disco local.
+
+    Según Config.UPLOAD_OFFLOAD la transferencia se delega al proxy
+    (X-Accel-Redirect para nginx, X-Sendfile para Apache/lighttpd) o la
+    realiza Flask con soporte de peticiones condicionales y Range.
+
+    Args:
+        path (str): Ruta absoluta del archivo.
+        cache_control (str, opcional): Valor del encabezado Cache-Control.
+        accel_prefix (str, opcional): Location interna de nginx para el directorio del archivo.
+
+    Returns:
+        Response: Respuesta con el archivo o con el encabezado para el proxy.
+
+    Raises:
+        NotFound: Si el archivo no existe.
+    """
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    filename = os.path.basename(path)
+    offload = Config.UPLOAD_OFFLOAD
+    if offload in ("x-accel-redirect", "x-sendfile"):
+        # El proxy envía los bytes y resuelve If-None-Match/Range por su cuenta
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        if offload == "x-accel-redirect":
+            response.headers["X-Accel-Redirect"] = (accel_prefix or Config.UPLOAD_ACCEL_PREFIX) + filename
+        else:
+            response.headers["X-Sendfile"] = path
+    else:
+        # El hash del contenido es un ETag fuerte que no requiere leer el archivo
+        etag = filename.split(".", 1)[0] if CONTENT_ADDRESSED.match(filename) else True
+        response = send_file(path, etag=etag, conditional=True)
+
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def _find_original(storage, stem: str):
+    """Busca el archivo original de una variante por su nombre base"""
+    for ext in sorted(Config.ALLOWED_EXTENSIONS):
+        candidate = f"{stem}.{ext}"
+        if storage.exists(candidate):
+            return candidate
+    return None
 
 
 def allowed_file(filename: str) -> bool:
@@ -28,20 +191,130 @@ def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
 
+def sniff_image_type(head: bytes):
+    """
+    Identifica el tipo de imagen por sus primeros bytes.
+
+    Args:
+        head (bytes): Inicio del archivo.
+
+    Returns:
+        str | None: Extensión canónica o None si no es un formato aceptado.
+    """
+    for signature, ext in SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+def file_sha256(path: str) -> str:
+    """Hash sha256 de un archivo, leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(Config.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ingest_upload(stream, max_size: int = None, temp_dir: str = None):
+    """
+    Copia un upload a un archivo temporal por bloques.
+
+    Cada bloque se suma al hash y se escribe al temporal en cuanto se lee,
+    así que la memoria usada es la de un bloque sin importar el tamaño.
+
+    Args:
+        stream: Stream binario del archivo subido.
+        max_size (int, opcional): Tamaño máximo en bytes.
+        temp_dir (str, opcional): Directorio del archivo temporal.
+
+    Returns:
+        tuple | None: (ruta temporal, sha256, extensión) o None si el
+        contenido no es una imagen aceptada.
+
+    Raises:
+        RequestEntityTooLarge: Si el archivo excede el tamaño máximo.
+    """
+    max_size = max_size or Config.MAX_UPLOAD_SIZE
+    chunk_size = Config.UPLOAD_CHUNK_SIZE
+
+    head = stream.read(chunk_size)
+    ext = sniff_image_type(head)
+    if ext is None or ext not in Config.ALLOWED_EXTENSIONS:
+        return None
+
+    fd, tmp_path = tempfile.mkstemp(dir=temp_dir or Config.UPLOAD_FOLDER, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise RequestEntityTooLarge(f"El archivo excede {max_size} bytes")
+                digest.update(chunk)
+                f.write(chunk)
+                chunk = stream.read(chunk_size)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    UPLOAD_BYTES.inc(size)
+    UPLOAD_SIZE.observe(size)
+    return tmp_path, digest.hexdigest(), ext
+
+
 def save_upload_file(file) -> str:
     """
-    Guarda un archivo subido y retorna su URL.
+    Guarda un archivo subido bajo el hash de su contenido y retorna su URL.
+
+    El archivo se escribe por bloques a un temporal y se pasa al backend de
+    almacenamiento (en disco local, con un rename atómico). El tipo se determina por el contenido, no
+    por la extensión declarada. Los archivos con el mismo contenido comparten
+    URL y se guardan una sola vez. Antes de calcular el nombre se quita el
+    EXIF (ver strip_metadata), así que el hash es el de los bytes guardados.
     
     Args:
         file: Objeto de archivo de Flask
         
     Returns:
         str: URL del archivo guardado o string vacío si falla
+
+    Raises:
+        RequestEntityTooLarge: Si el archivo excede Config.MAX_UPLOAD_SIZE o
+            la imagen tiene más píxeles de los que Pillow acepta decodificar.
     """
     if not file or not allowed_file(file.filename):
         return ""
-    
-    filename = secure_filename(file.filename)
-    image_path = os.path.join(Config.UPLOAD_FOLDER, filename)
-    file.save(image_path)
+
+    storage = get_storage()
+    with span("upload.ingest"):
+        ingested = ingest_upload(file.stream, temp_dir=storage.temp_dir)
+    if ingested is None:
+        return ""
+
+    tmp_path, digest, ext = ingested
+    # El original se sirve públicamente: sin EXIF (ubicación GPS, cámara, autor).
+    # Si se re-codifica, el nombre debe ser el hash de los bytes que se guardan
+    try:
+        with span("upload.strip"):
+            if strip_metadata(tmp_path):
+                digest = file_sha256(tmp_path)
+    except Image.DecompressionBombError:
+        os.remove(tmp_path)
+        raise RequestEntityTooLarge("La imagen tiene demasiados píxeles")
+
+    filename = f"{digest}.{ext}"
+    if storage.exists(filename):
+        os.remove(tmp_path)
+        # El archivo pudo ser un huérfano: renovarlo evita que el barrido lo retire
+        storage.touch(filename)
+        return f"/uploads/{filename}"
+
+    with span("upload.save", filename=filename, backend=type(storage).__name__):
+        storage.save(filename, tmp_path)
+
+    # Las miniaturas se generan fuera del hilo de la petición
+    schedule_processing(filename)
     return f"/uploads/{filename}"
@@ -0,0 +1,277 @@
+# sampler.py
+"""
+Muestreo continuo de las pilas de los hilos que atienden peticiones.
+
+Un hilo en segundo plano toma cada SAMPLER_INTERVAL_MS la pila de los
+hilos que están dentro de una petición (sys._current_frames) y la suma a
+un contador de pilas plegadas. El contador tiene a lo sumo
+SAMPLER_MAX_STACKS pilas distintas: las muestras de pilas nuevas cuando
+está lleno solo se cuentan como descartadas. El sampler mide su propio
+tiempo de CPU para reportar el costo que agrega.
+
+Los hilos no sobreviven al fork de gunicorn, así que cada worker arranca su
+sampler con su primera petición. Con SAMPLER_DIR cada worker escribe sus
+pilas en un archivo cada SAMPLER_FLUSH_SECONDS y el endpoint de
+administración combina las de todos. Solo se combinan los archivos de
+procesos vivos: el servidor borra el de cada worker que termina y vacía el
+directorio al arrancar.
+"""
+import glob
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import suppress
+from flask import Flask
+from app.config import Config
+from app.profiling import frame_stack
+
+FRAME_PATTERN = re.compile(r"^(.*) \((.*):(\d+)\)$")
+STACKS_FILE = re.compile(r"^stacks-(\d+)\.folded$")
+
+
+def fold_frame(frame) -> str:
+    """Nombre de un frame en las pilas plegadas: función (archivo:línea)"""
+    function, filename, line = frame
+    return f"{function} ({filename}:{line})"
+
+
+def unfold_frame(text: str) -> tuple:
+    """Inverso de fold_frame"""
+    match = FRAME_PATTERN.match(text)
+    if not match:
+        return text, "", 0
+    return match.group(1), match.group(2), int(match.group(3))
+
+
+def collapsed(stacks) -> str:
+    """
+    Pilas en formato plegado (flamegraph.pl, speedscope, inferno).
+
+    Args:
+        stacks: Pares (pila de frames raíz→hoja, número de muestras).
+    """
+    return "".join(f"{';'.join(map(fold_frame, stack))} {count}\n" for stack, count in stacks)
+
+
+def parse_collapsed(text: str) -> Counter:
+    """Lee pilas en formato plegado"""
+    stacks = Counter()
+    for line in text.splitlines():
+        folded, _, count = line.rpartition(" ")
+        if folded and count.isdigit():
+            stacks[tuple(unfold_frame(f) for f in folded.split(";"))] += int(count)
+    return stacks
+
+
+class StackSampler:
+    """
+    Sampler de pilas de los hilos registrados.
+
+    Args:
+        interval (float): Segundos entre muestras.
+        max_stacks (int): Pilas distintas que se conservan.
+        max_depth (int): Frames por pila (se conservan los más cercanos a la hoja).
+    """
+
+    def __init__(self, interval: float, max_stacks: int, max_depth: int):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.pid = os.getpid()
+        self.threads = set()
+        self.stacks = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.started = time.monotonic()
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_flush = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def sample(self):
+        """Toma una muestra de cada hilo registrado"""
+        started = time.thread_time()
+        frames = sys._current_frames()
+        with self._lock:
+            for ident in tuple(self.threads):
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = frame_stack(frame, self.max_depth)
+                self.samples += 1
+                if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] += 1
+                else:
+                    self.dropped += 1
+        del frames
+        self.busy += time.thread_time() - started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if Config.SAMPLER_DIR and time.monotonic() - self._last_flush >= Config.SAMPLER_FLUSH_SECONDS:
+                self.flush(Config.SAMPLER_DIR)
+
+    def snapshot(self) -> Counter:
+        """Copia de las pilas acumuladas"""
+        with self._lock:
+            return Counter(self.stacks)
+
+    def reset(self):
+        """Descarta las pilas acumuladas"""
+        with self._lock:
+            self.stacks.clear()
+            self.samples = self.dropped = 0
+            self.busy = 0.0
+            self.started = time.monotonic()
+
+    def flush(self, folder: str):
+        """Escribe las pilas del proceso en folder/stacks-<pid>.folded"""
+        self._last_flush = time.monotonic()
+        os.makedirs(folder, exist_ok=True)
+        path = stacks_path(folder, self.pid)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(collapsed(self.snapshot().items()))
+        os.replace(tmp_path, path)
+
+    def status(self) -> dict:
+        """Estado del sampler y su costo en CPU"""
+        elapsed = time.monotonic() - self.started
+        return {
+            "pid": self.pid,
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "dropped": self.dropped,
+            "elapsed_seconds": elapsed,
+            "sampler_cpu_seconds": self.busy,
+            # Fracción de un núcleo que consume el sampler
+            "overhead_percent": 100 * self.busy / elapsed if elapsed else 0.0,
+        }
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def _forget_sampler():
+    # El hilo del sampler no existe en el proceso hijo
+    global _sampler, _sampler_lock
+    _sampler = None
+    _sampler_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_sampler)
+
+
+def get_sampler() -> StackSampler:
+    """Sampler del proceso; se crea y arranca en el primer uso de cada proceso"""
+    global _sampler
+    sampler = _sampler
+    if sampler is not None:
+        return sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StackSampler(Config.SAMPLER_INTERVAL_MS / 1000, Config.SAMPLER_MAX_STACKS,
+                                    Config.SAMPLER_MAX_DEPTH)
+            _sampler.start()
+        return _sampler
+
+
+def stop_sampler():
+    """Detiene el sampler del proceso, si existe"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is not None:
+            _sampler.stop()
+        _sampler = None
+
+
+def stacks_path(folder: str, pid: int) -> str:
+    """Archivo con las pilas de un proceso"""
+    return os.path.join(folder, f"stacks-{pid}.folded")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, aunque sea de otro usuario
+        return True
+    return True
+
+
+def remove_stacks(pid: int):
+    """Borra el archivo de pilas de un proceso que terminó"""
+    if Config.SAMPLER_DIR:
+        with suppress(FileNotFoundError):
+            os.remove(stacks_path(Config.SAMPLER_DIR, pid))
+
+
+def clear_stacks():
+    """Borra los archivos de pilas de ejecuciones anteriores"""
+    if not Config.SAMPLER_DIR:
+        return
+    for path in glob.glob(os.path.join(Config.SAMPLER_DIR, "stacks-*.folded*")):
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def combined_stacks() -> Counter:
+    """
+    Pilas de todos los workers vivos (SAMPLER_DIR) o solo las del proceso.
+
+    Los archivos de procesos que ya no existen se borran en lugar de sumarse.
+    """
+    sampler = get_sampler()
+    if not Config.SAMPLER_DIR:
+        return sampler.snapshot()
+    sampler.flush(Config.SAMPLER_DIR)
+    stacks = Counter()
+    for path in glob.glob(os.path.join(Config.SAMPLER_DIR, "stacks-*.folded")):
+        match = STACKS_FILE.match(os.path.basename(path))
+        if match is None:
+            continue
+        if not _pid_alive(int(match.group(1))):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                stacks.update(parse_collapsed(f.read()))
+        except FileNotFoundError:
+            continue
+    return stacks
+
+
+def init_sampler(app: Flask):
+    """
+    Registra los hilos de las peticiones en el sampler.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+    """
+    @app.before_request
+    def _register_thread():
+        if Config.SAMPLER_ENABLED:
+            get_sampler().threads.add(threading.get_ident())
+
+    @app.teardown_request
+    def _unregister_thread(exc=None):
+        sampler = _sampler
+        if sampler is not None:
+            sampler.threads.discard(threading.get_ident())
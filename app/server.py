@@ -0,0 +1,169 @@
+# server.py
+"""
+Servidor de producción con la aplicación precargada.
+
+La aplicación se carga una vez en el proceso maestro de gunicorn y los
+workers se crean con fork, de modo que comparten el código importado, los
+mappers configurados y las tablas en memoria compartida (revocaciones y
+límites de login). Antes del fork se cierran las conexiones del engine para
+que ningún worker herede un socket ajeno, y gc.freeze() saca los objetos
+precargados del recolector para que recorrerlos no rompa el copy-on-write.
+
+Cada worker se calienta al arrancar: abre una conexión del pool y pide las
+rutas de Config.WARMUP_PATHS, de modo que la primera petición real no paga
+el arranque en frío. El pool de hashes solo se arranca por adelantado si
+PASSWORD_HASH_WORKERS está configurado explícitamente; en automático cada
+worker tiene núcleos // workers procesos de hash, creados bajo demanda.
+"""
+import gc
+import logging
+import os
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from app.config import Config
+from app.db.models import db
+from app.metrics import mark_process_dead
+from app.passwords import set_auto_pool_size, warm_up as warm_up_passwords
+from app.ratelimit import get_login_limiters
+from app.resizer import get_cache
+from app.sampler import clear_stacks, remove_stacks
+from app.tokens import get_revocation_list
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # pragma: no cover - gunicorn es opcional
+    BaseApplication = None
+
+logger = logging.getLogger(__name__)
+
+
+def default_workers() -> int:
+    """Workers del servidor: Config.WEB_WORKERS o 2 por núcleo + 1"""
+    return Config.WEB_WORKERS or 2 * (os.cpu_count() or 1) + 1
+
+
+def password_pool_size(workers: int) -> int:
+    """Procesos de hash por worker en modo automático: los núcleos repartidos entre los workers"""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def preload(app):
+    """
+    Prepara la aplicación en el proceso maestro, antes del fork.
+
+    Args:
+        app (Flask): Aplicación a servir.
+    """
+    configure_mappers()
+    # Los mmaps anónimos solo se comparten si existen antes del fork
+    get_revocation_list()
+    get_login_limiters()
+    get_cache()
+    # Las pilas de workers de una ejecución anterior ya no aplican
+    clear_stacks()
+    with app.app_context():
+        db.engine.dispose()
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(app):
+    """
+    Descarta en el worker las conexiones heredadas del maestro.
+
+    close=False evita cerrar sockets que el maestro podría seguir usando.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def warm_worker(app):
+    """
+    Calienta un worker recién creado.
+
+    Args:
+        app (Flask): Aplicación a servir.
+    """
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    # En automático los procesos de hash se crean con el primer login
+    if Config.PASSWORD_HASH_WORKERS > 0:
+        warm_up_passwords()
+
+    client = app.test_client()
+    for path in filter(None, (p.strip() for p in Config.WARMUP_PATHS.split(","))):
+        response = client.get(path)
+        if response.status_code >= 500:
+            logger.warning("Calentamiento de %s respondió %s", path, response.status_code)
+
+
+def worker_exited(pid: int):
+    """Limpia lo que deja un worker al terminar: métricas y pilas muestreadas"""
+    mark_process_dead(pid)
+    remove_stacks(pid)
+
+
+def server_options(bind=None, workers=None, threads=None, asgi=False) -> dict:
+    """
+    Configuración de gunicorn.
+
+    Args:
+        bind (str, opcional): Dirección de escucha (por defecto Config.WEB_BIND).
+        workers (int, opcional): Procesos (por defecto default_workers()).
+        threads (int, opcional): Hilos por worker WSGI (por defecto Config.WEB_THREADS).
+        asgi (bool): Servir app.asgi con workers de uvicorn.
+
+    Returns:
+        dict: Opciones de gunicorn.
+    """
+    options = {
+        "bind": bind or Config.WEB_BIND,
+        "workers": workers or default_workers(),
+        "timeout": Config.WEB_TIMEOUT,
+        "preload_app": True,
+    }
+    if Config.TRUSTED_PROXIES > 0:
+        # Acepta X-Forwarded-Proto (y en ASGI X-Forwarded-For) de los proxies
+        options["forwarded_allow_ips"] = Config.FORWARDED_ALLOW_IPS
+    if asgi:
+        options["worker_class"] = "uvicorn.workers.UvicornWorker"
+    else:
+        options["worker_class"] = "gthread"
+        options["threads"] = threads or Config.WEB_THREADS
+    return options
+
+
+def serve(app, bind=None, workers=None, threads=None, asgi=False):
+    """
+    Sirve la aplicación con gunicorn hasta que el proceso termine.
+
+    Raises:
+        RuntimeError: Si gunicorn no está instalado.
+    """
+    if BaseApplication is None:
+        raise RuntimeError("El servidor de producción requiere instalar gunicorn")
+
+    options = server_options(bind, workers, threads, asgi)
+    # Se fija en el maestro, antes del fork, para que lo hereden los workers
+    set_auto_pool_size(password_pool_size(options["workers"]))
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+            self.cfg.set("post_fork", lambda server, worker: post_fork(app))
+            self.cfg.set("post_worker_init", lambda worker: warm_worker(app))
+            self.cfg.set("child_exit", lambda server, worker: worker_exited(worker.pid))
+
+        def load(self):
+            if asgi:
+                from app.asgi import create_asgi_app
+
+                application = create_asgi_app(app)
+            else:
+                application = app
+            preload(app)
+            return application
+
+    ProductionServer().run()
@@ -0,0 +1,86 @@
+# shm.py
+"""
+Tablas hash de tamaño fijo en memoria compartida entre procesos.
+
+La tabla vive en un mmap: sin archivo es anónimo y la comparten los
+procesos creados por fork después de instanciarla (workers con preload);
+con un archivo en /dev/shm la comparten todos los procesos del servidor.
+Usa direccionamiento abierto con un número acotado de sondeos, de modo que
+buscar o escribir una llave cuesta a lo sumo MAX_PROBES lecturas.
+"""
+import hashlib
+import mmap
+import multiprocessing
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+MAX_PROBES = 32
+
+
+class SharedTable:
+    """
+    Base de las tablas compartidas.
+
+    Cada entrada comienza con una llave de 8 bytes (0 = vacía) seguida de
+    los campos de slot_struct; las subclases deciden qué entradas pueden
+    reutilizarse.
+    """
+
+    def __init__(self, slots: int, slot_struct, path: str = None):
+        self.slots = slots
+        self.slot = slot_struct
+        self.path = path or None
+        size = slots * slot_struct.size
+        if self.path:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                self._map = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            self._lock_file = open(self.path, "rb")
+        else:
+            self._map = mmap.mmap(-1, size)
+            self._lock_file = None
+        # Protege las escrituras entre hilos y, con mapa anónimo, entre procesos hermanos;
+        # con archivo, flock las protege además entre procesos no relacionados
+        self._lock = multiprocessing.Lock()
+
+    @staticmethod
+    def key(text: str) -> int:
+        """Llave de 64 bits de un texto (nunca 0)"""
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little") or 1
+
+    @contextmanager
+    def locked(self):
+        """Sección crítica para leer y modificar entradas"""
+        with self._lock:
+            if self._lock_file is not None and fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if self._lock_file is not None and fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def probe(self, key: int):
+        """
+        Recorre las entradas candidatas de una llave.
+
+        Yields:
+            tuple: (índice, campos de la entrada).
+        """
+        start = key % self.slots
+        for i in range(min(MAX_PROBES, self.slots)):
+            index = (start + i) % self.slots
+            yield index, self.slot.unpack_from(self._map, index * self.slot.size)
+
+    def write(self, index: int, *values):
+        """Escribe una entrada completa"""
+        self.slot.pack_into(self._map, index * self.slot.size, *values)
@@ -0,0 +1,243 @@
+# slowqueries.py
+"""
+Registro de consultas lentas y estadísticas por huella de consulta.
+
+Cada sentencia se reduce a una huella: el SQL sin literales, con los
+espacios normalizados y las listas IN colapsadas, de modo que todas las
+ejecuciones de una misma consulta comparten estadísticas (conteo, tiempo
+total, máximo), al estilo de pg_stat_statements pero dentro de la
+aplicación y por proceso.
+
+Las sentencias que tardan más de Config.SLOW_QUERY_MS se registran con su
+huella, los parámetros redactados, la duración y la ruta que las originó.
+En PostgreSQL, además, se captura su plan con EXPLAIN (ANALYZE, BUFFERS)
+en un hilo aparte y dentro de una transacción que se revierte; solo para
+SELECT y a lo sumo una vez por huella cada SLOW_QUERY_EXPLAIN_INTERVAL
+segundos. Las consultas del engine asíncrono (modo ASGI) no capturan plan:
+su engine no puede usarse desde el hilo del EXPLAIN.
+"""
+import functools
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Prefijo de EXPLAIN por dialecto; los demás no capturan plan
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN (ANALYZE, BUFFERS) "}
+# Estadísticas de las huellas que ya no caben
+OTHER_FINGERPRINT = "otras"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+# Marcadores de parámetros de los distintos paramstyle
+_PARAMETER = re.compile(r"%\(\w+\)s|(?<!:):\w+|\$\d+|%s")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SELECT = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> tuple:
+    """
+    Huella de una sentencia SQL.
+
+    Returns:
+        tuple: (id corto de la huella, SQL normalizado).
+    """
+    normalized = _STRING.sub("?", statement)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("(...)", normalized)
+    normalized = _SPACES.sub(" ", normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized
+
+
+def _redact(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters):
+    """
+    Parámetros de una sentencia sin datos sensibles.
+
+    Números, fechas y nulos se conservan; los textos y binarios se
+    reemplazan por su tipo y longitud.
+    """
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+
+class FingerprintStats:
+    """Estadísticas acumuladas por huella, acotadas a max_fingerprints"""
+
+    def __init__(self, max_fingerprints: int):
+        self.max_fingerprints = max_fingerprints
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, query: str, seconds: float, slow: bool):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    key, query = OTHER_FINGERPRINT, ""
+                    entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = {
+                        "fingerprint": key, "query": query, "count": 0, "slow": 0,
+                        "total_seconds": 0.0, "max_seconds": 0.0, "plan": None,
+                    }
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            if seconds > entry["max_seconds"]:
+                entry["max_seconds"] = seconds
+            if slow:
+                entry["slow"] += 1
+
+    def set_plan(self, key: str, plan: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["plan"] = plan
+
+    def top(self, limit: int = None, order: str = "total_seconds") -> list:
+        """Huellas ordenadas de mayor a menor (por tiempo total por defecto)"""
+        with self._lock:
+            entries = [dict(entry, mean_seconds=entry["total_seconds"] / entry["count"])
+                       for entry in self._entries.values()]
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+        return entries[:limit] if limit else entries
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_stats = None
+_stats_lock = threading.Lock()
+_explain_executor = None
+_explain_slots = None
+_explained_at = {}
+
+
+def _forget_executor():
+    # Los hilos del pool no existen en el proceso hijo
+    global _explain_executor
+    _explain_executor = None
+
+
+os.register_at_fork(after_in_child=_forget_executor)
+
+
+def get_query_stats() -> FingerprintStats:
+    """Estadísticas por huella del proceso"""
+    global _stats
+    stats = _stats
+    if stats is not None:
+        return stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = FingerprintStats(Config.QUERY_FINGERPRINTS_MAX)
+        return _stats
+
+
+def _current_route() -> str:
+    if not has_request_context():
+        return "-"
+    rule = request.url_rule
+    return f"{request.method} {rule.rule if rule is not None else request.path}"
+
+
+def _explain(engine, prefix, key, statement, parameters):
+    try:
+        with engine.connect() as conn:
+            # La consulta del EXPLAIN no debe volver a registrarse ni analizarse. Se marca
+            # la ejecución y no conn.info, que sobrevive en la conexión del pool
+            conn = conn.execution_options(slow_query_explain=True)
+            try:
+                rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+            finally:
+                conn.rollback()
+        # PostgreSQL retorna una columna; otros dialectos ponen el detalle al final
+        plan = "\n".join(str(row[-1]) for row in rows)
+        get_query_stats().set_plan(key, plan)
+        logger.warning("Plan de la consulta lenta %s:\n%s", key, plan)
+    except Exception:
+        logger.warning("No se pudo obtener el plan de la consulta lenta %s", key, exc_info=True)
+    finally:
+        _explain_slots.release()
+
+
+def schedule_explain(engine, key: str, statement: str, parameters):
+    """
+    Captura en segundo plano el plan de una consulta lenta.
+
+    Returns:
+        Future | None: Futuro del EXPLAIN, o None si no aplica (dialecto sin
+            EXPLAIN o asíncrono, no es SELECT, ya se analizó hace poco o hay
+            demasiados pendientes).
+    """
+    global _explain_executor, _explain_slots
+    prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+    # La fachada síncrona de un engine asíncrono falla fuera del event loop (MissingGreenlet)
+    if prefix is None or engine.dialect.is_async or not _SELECT.match(statement):
+        return None
+    now = time.monotonic()
+    with _stats_lock:
+        if now - _explained_at.get(key, -Config.SLOW_QUERY_EXPLAIN_INTERVAL) < Config.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return None
+        if _explain_executor is None:
+            _explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+            _explain_slots = threading.BoundedSemaphore(8)
+        if not _explain_slots.acquire(blocking=False):
+            return None
+        _explained_at[key] = now
+    return _explain_executor.submit(_explain, engine, prefix, key, statement, parameters)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and Config.QUERY_FINGERPRINTS:
+        context._fingerprint_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_fingerprint_started", None)
+    if started is None or context.execution_options.get("slow_query_explain"):
+        return
+    elapsed = time.perf_counter() - started
+    key, query = fingerprint(statement)
+    slow = 0 < Config.SLOW_QUERY_MS <= elapsed * 1000
+    get_query_stats().record(key, query, elapsed, slow)
+    if not slow:
+        return
+
+    logger.warning(
+        "Consulta lenta %s (%.1f ms) en %s: %s; parámetros: %s",
+        key, elapsed * 1000, _current_route(), query,
+        "(executemany)" if executemany else redact_parameters(parameters)
+    )
+    if not executemany:
+        schedule_explain(conn.engine, key, statement, parameters)
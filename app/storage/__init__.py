@@ -0,0 +1,58 @@
+"""
+Almacenamiento de los archivos subidos.
+
+El backend se elige con Config.STORAGE_BACKEND: "local" (directorio
+Config.UPLOAD_FOLDER) o "s3" (bucket compatible con S3).
+"""
+import re
+import threading
+from app.config import Config
+from app.storage.base import StorageBackend, StoredFile
+from app.storage.local import LocalStorage
+
+# Los archivos direccionados por contenido (hash.ext o hash_tamaño.ext) nunca cambian
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?\.[a-z]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_s3_storage = None
+_s3_lock = threading.Lock()
+
+
+def cache_control_for(name: str):
+    """Cache-Control adecuado para un archivo según su nombre"""
+    return IMMUTABLE_CACHE_CONTROL if CONTENT_ADDRESSED.match(name) else None
+
+
+def get_storage() -> StorageBackend:
+    """
+    Backend de almacenamiento configurado.
+
+    Returns:
+        StorageBackend: Instancia del backend.
+    """
+    if Config.STORAGE_BACKEND == "local":
+        return LocalStorage(Config.UPLOAD_FOLDER)
+    if Config.STORAGE_BACKEND == "s3":
+        return _get_s3_storage()
+    raise ValueError(f"Backend de almacenamiento desconocido: {Config.STORAGE_BACKEND}")
+
+
+def _get_s3_storage():
+    global _s3_storage
+    # El cliente de boto3 es costoso de crear: se reutiliza mientras no cambie la configuración
+    settings = (Config.S3_BUCKET, Config.S3_PREFIX, Config.S3_ENDPOINT_URL, Config.S3_REGION)
+    with _s3_lock:
+        if _s3_storage is None or _s3_storage[0] != settings:
+            from app.storage.s3 import S3Storage
+
+            storage = S3Storage(
+                bucket=Config.S3_BUCKET,
+                prefix=Config.S3_PREFIX,
+                endpoint_url=Config.S3_ENDPOINT_URL,
+                region=Config.S3_REGION,
+                multipart_threshold=Config.S3_MULTIPART_THRESHOLD,
+                max_concurrency=Config.S3_MAX_CONCURRENCY,
+                cache_control=cache_control_for
+            )
+            _s3_storage = (settings, storage)
+        return _s3_storage[1]
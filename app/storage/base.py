@@ -0,0 +1,91 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+# Metadatos de un archivo almacenado (modified es un timestamp UNIX)
+StoredFile = namedtuple("StoredFile", ["name", "size", "modified"])
+
+
+class StorageBackend(ABC):
+    """
+    Interfaz de almacenamiento de los archivos subidos.
+
+    Los nombres son planos (sin directorios), por ejemplo <sha256>.png.
+    """
+
+    # Directorio para los temporales que luego se pasan a save()
+    temp_dir = None
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """Indica si el archivo existe"""
+
+    @abstractmethod
+    def stat(self, name: str):
+        """
+        Obtiene los metadatos de un archivo.
+
+        Returns:
+            StoredFile | None: Metadatos o None si no existe.
+        """
+
+    @abstractmethod
+    def save(self, name: str, path: str):
+        """
+        Guarda un archivo local bajo el nombre indicado.
+
+        El archivo de origen se consume (se mueve o se elimina tras subirlo).
+
+        Args:
+            name (str): Nombre final.
+            path (str): Ruta del archivo local.
+        """
+
+    @abstractmethod
+    def open(self, name: str):
+        """Abre un archivo en modo binario para lectura"""
+
+    def iter_chunks(self, name: str, chunk_size: int = 64 * 1024):
+        """Genera el contenido de un archivo por bloques"""
+        with self.open(name) as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
+
+    @abstractmethod
+    def touch(self, name: str):
+        """
+        Actualiza la fecha de modificación de un archivo (no falla si no existe).
+
+        El barrido de huérfanos conserva los archivos recientes, así que un
+        archivo reutilizado por un upload duplicado debe contar como nuevo.
+        """
+
+    @abstractmethod
+    def delete(self, name: str):
+        """Elimina un archivo (no falla si no existe)"""
+
+    @abstractmethod
+    def quarantine(self, name: str, folder: str):
+        """
+        Aparta un archivo a una subcarpeta que no se sirve ni se lista.
+
+        Args:
+            name (str): Nombre del archivo.
+            folder (str): Nombre de la subcarpeta de cuarentena.
+        """
+
+    @abstractmethod
+    def iter_files(self):
+        """
+        Recorre todos los archivos almacenados.
+
+        Yields:
+            StoredFile: Metadatos de cada archivo.
+        """
+
+    def local_path(self, name: str):
+        """Ruta en el disco local, o None si el backend no es local"""
+        return None
+
+    def read_url(self, name: str, expires: int):
+        """URL firmada de lectura directa, o None si el backend no la soporta"""
+        return None
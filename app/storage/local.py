@@ -0,0 +1,64 @@
+import os
+from werkzeug.security import safe_join
+from app.storage.base import StorageBackend, StoredFile
+
+# Sufijos de archivos temporales que no forman parte del almacenamiento
+TEMP_SUFFIXES = (".part", ".tmp")
+
+
+class LocalStorage(StorageBackend):
+    """Almacenamiento en un directorio del sistema de archivos local"""
+
+    def __init__(self, folder: str):
+        self.folder = os.path.abspath(folder)
+        # Temporales en el mismo sistema de archivos para que save() sea un rename atómico
+        self.temp_dir = self.folder
+        os.makedirs(self.folder, exist_ok=True)
+
+    def local_path(self, name: str):
+        return safe_join(self.folder, name)
+
+    def _path(self, name: str) -> str:
+        path = self.local_path(name)
+        if path is None:
+            raise ValueError(f"Nombre de archivo inválido: {name}")
+        return path
+
+    def exists(self, name: str) -> bool:
+        path = self.local_path(name)
+        return path is not None and os.path.isfile(path)
+
+    def stat(self, name: str):
+        if not self.exists(name):
+            return None
+        st = os.stat(self._path(name))
+        return StoredFile(name, st.st_size, st.st_mtime)
+
+    def save(self, name: str, path: str):
+        os.replace(path, self._path(name))
+
+    def open(self, name: str):
+        return open(self._path(name), "rb")
+
+    def touch(self, name: str):
+        try:
+            os.utime(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def quarantine(self, name: str, folder: str):
+        target = self._path(os.path.join(folder, name))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self._path(name), target)
+
+    def iter_files(self):
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and not entry.name.endswith(TEMP_SUFFIXES):
+                st = entry.stat()
+                yield StoredFile(entry.name, st.st_size, st.st_mtime)
@@ -0,0 +1,120 @@
+import mimetypes
+import os
+import tempfile
+from app.storage.base import StorageBackend, StoredFile
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover - boto3 es opcional
+    boto3 = None
+
+
+class S3Storage(StorageBackend):
+    """
+    Almacenamiento en un bucket compatible con S3 (AWS, MinIO, etc.).
+
+    Las subidas usan el gestor de transferencias de boto3, que divide los
+    archivos grandes en partes (multipart) y las sube en un pool de hilos.
+    """
+
+    temp_dir = tempfile.gettempdir()
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = None, region: str = None,
+                 multipart_threshold: int = 8 * 1024 * 1024, max_concurrency: int = 10,
+                 cache_control=None, client=None):
+        if boto3 is None:
+            raise RuntimeError("El backend S3 requiere instalar boto3")
+        if not bucket:
+            raise ValueError("Falta configurar S3_BUCKET")
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_control = cache_control
+        self.client = client or boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region or None)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_threshold,
+            max_concurrency=max_concurrency,
+            use_threads=True
+        )
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def stat(self, name: str):
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return StoredFile(name, head["ContentLength"], head["LastModified"].timestamp())
+
+    def exists(self, name: str) -> bool:
+        return self.stat(name) is not None
+
+    def save(self, name: str, path: str):
+        extra_args = {"ContentType": mimetypes.guess_type(name)[0] or "application/octet-stream"}
+        cache_control = self.cache_control(name) if self.cache_control else None
+        if cache_control:
+            extra_args["CacheControl"] = cache_control
+        try:
+            self.client.upload_file(path, self.bucket, self._key(name), ExtraArgs=extra_args, Config=self.transfer_config)
+        finally:
+            os.remove(path)
+
+    def open(self, name: str):
+        # Los archivos pequeños se quedan en memoria; los grandes pasan a disco
+        f = tempfile.SpooledTemporaryFile(max_size=self.transfer_config.multipart_threshold)
+        try:
+            self.client.download_fileobj(self.bucket, self._key(name), f, Config=self.transfer_config)
+        except BaseException:
+            f.close()
+            raise
+        f.seek(0)
+        return f
+
+    def iter_chunks(self, name: str, chunk_size: int = 64 * 1024):
+        body = self.client.get_object(Bucket=self.bucket, Key=self._key(name))["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def touch(self, name: str):
+        # S3 no tiene utime: copiar el objeto sobre sí mismo renueva LastModified. REPLACE
+        # descarta los metadatos, así que se vuelven a enviar
+        head = self.client.head_object(Bucket=self.bucket, Key=self._key(name))
+        extra_args = {"ContentType": head.get("ContentType", "application/octet-stream")}
+        if head.get("CacheControl"):
+            extra_args["CacheControl"] = head["CacheControl"]
+        self.client.copy_object(
+            Bucket=self.bucket, Key=self._key(name), CopySource={"Bucket": self.bucket, "Key": self._key(name)},
+            MetadataDirective="REPLACE", **extra_args
+        )
+
+    def delete(self, name: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+    def quarantine(self, name: str, folder: str):
+        # Copia del lado del servidor: el objeto no pasa por la aplicación
+        source = {"Bucket": self.bucket, "Key": self._key(name)}
+        self.client.copy(source, self.bucket, self._key(f"{folder}/{name}"), Config=self.transfer_config)
+        self.delete(name)
+
+    def iter_files(self):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                name = obj["Key"][len(self.prefix):]
+                if name and "/" not in name:
+                    yield StoredFile(name, obj["Size"], obj["LastModified"].timestamp())
+
+    def read_url(self, name: str, expires: int):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(name)},
+            ExpiresIn=expires
+        )
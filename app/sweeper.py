@@ -0,0 +1,127 @@
+# sweeper.py
+"""
+Recolección de archivos subidos que ya no están referenciados.
+
+Al eliminar un lugar o cambiar su imagen, el archivo anterior se queda en el
+almacenamiento. El barrido recorre el almacenamiento por lotes y, por cada
+lote, consulta en una sola query cuáles de sus URLs siguen en
+places.image_url; así ni los archivos ni las filas se cargan completos en
+memoria. Las variantes (foto_sm.webp) se conservan mientras su original
+esté referenciado.
+
+Antes de retirar un huérfano se vuelve a revisar: si mientras tanto un
+upload duplicado lo reutilizó (y renovó su fecha) o un lugar empezó a
+referenciarlo, se conserva.
+"""
+import itertools
+import logging
+import time
+from sqlalchemy import select
+from app.config import Config
+from app.db.models import db, Place
+from app.images import parse_variant
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("quarantine", "delete")
+
+
+def _candidate_urls(name: str) -> set:
+    """URLs cuya referencia en la base de datos mantiene vivo un archivo"""
+    urls = {f"/uploads/{name}"}
+    variant = parse_variant(name)
+    if variant:
+        stem = variant[0]
+        urls.update(f"/uploads/{stem}.{ext}" for ext in Config.ALLOWED_EXTENSIONS)
+    return urls
+
+
+def _referenced_urls(urls: set) -> set:
+    """Subconjunto de urls presente en places.image_url"""
+    query = select(Place.image_url).where(Place.image_url.in_(sorted(urls))).distinct()
+    with db.engine.connect() as conn:
+        return set(conn.execute(query).scalars())
+
+
+def _reused(storage, name: str, urls: set, cutoff: float) -> bool:
+    """Indica si un huérfano se reutilizó después de revisar su lote"""
+    current = storage.stat(name)
+    return current is None or current.modified > cutoff or bool(_referenced_urls(urls))
+
+
+def _batches(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def sweep_uploads(dry_run: bool = True, action: str = None, grace_seconds: int = None, batch_size: int = None) -> dict:
+    """
+    Busca y retira los archivos subidos sin referencias.
+
+    Los archivos modificados dentro del periodo de gracia se conservan: un
+    upload se guarda antes de que el lugar que lo usa se confirme en la base
+    de datos.
+
+    Args:
+        dry_run (bool): Solo reporta, sin modificar el almacenamiento.
+        action (str, opcional): "quarantine" (mover a Config.UPLOAD_QUARANTINE_DIR)
+            o "delete" (por defecto Config.UPLOAD_GC_ACTION).
+        grace_seconds (int, opcional): Antigüedad mínima para retirar un archivo.
+        batch_size (int, opcional): Archivos revisados por consulta.
+
+    Returns:
+        dict: Reporte con los archivos revisados, los huérfanos y los bytes liberados.
+
+    Raises:
+        ValueError: Si la acción es desconocida.
+    """
+    action = action or Config.UPLOAD_GC_ACTION
+    if action not in ACTIONS:
+        raise ValueError(f"Acción desconocida: {action}")
+    grace_seconds = Config.UPLOAD_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    batch_size = batch_size or Config.UPLOAD_GC_BATCH_SIZE
+
+    storage = get_storage()
+    started = time.perf_counter()
+    cutoff = time.time() - grace_seconds
+    report = {
+        "dry_run": dry_run,
+        "action": action,
+        "scanned": 0,
+        "referenced": 0,
+        "recent": 0,
+        "orphans": [],
+        "orphaned_bytes": 0,
+    }
+
+    for batch in _batches(storage.iter_files(), batch_size):
+        report["scanned"] += len(batch)
+        candidates = {stored.name: _candidate_urls(stored.name) for stored in batch}
+        referenced = _referenced_urls(set().union(*candidates.values()))
+
+        for stored in batch:
+            if candidates[stored.name] & referenced:
+                report["referenced"] += 1
+                continue
+            if stored.modified > cutoff:
+                report["recent"] += 1
+                continue
+
+            if not dry_run and _reused(storage, stored.name, candidates[stored.name], cutoff):
+                report["recent"] += 1
+                continue
+
+            report["orphans"].append(stored.name)
+            report["orphaned_bytes"] += stored.size
+            if dry_run:
+                continue
+            if action == "delete":
+                storage.delete(stored.name)
+            else:
+                storage.quarantine(stored.name, Config.UPLOAD_QUARANTINE_DIR)
+            logger.info("Upload huérfano %s (%d bytes, acción: %s)", stored.name, stored.size, action)
+
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,181 @@
+# tokens.py
+"""
+Tokens de acceso firmados con HMAC.
+
+El token lleva el usuario y su expiración en un payload JSON firmado con
+HMAC-SHA256 (payload.firma, ambos en base64url), de modo que verificarlo no
+requiere consultar la base de datos. Al cerrar sesión el identificador del
+token (jti) se agrega a una lista de revocación en memoria compartida hasta
+que el token expira por sí solo.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import struct
+import threading
+import time
+from functools import wraps
+from flask import g, request
+from flask_restx import abort
+from app.config import Config
+from app.shm import SharedTable
+
+# Cada entrada de la tabla: llave (8 bytes del jti) y expiración UNIX
+SLOT = struct.Struct("<QQ")
+
+
+class RevocationList(SharedTable):
+    """
+    Conjunto de tokens revocados con expiración.
+
+    Las entradas expiradas se reutilizan, así que la tabla no necesita
+    limpiarse (ver app.shm para cómo se comparte entre workers).
+    """
+
+    def __init__(self, slots: int, path: str = None):
+        super().__init__(slots, SLOT, path)
+
+    def add(self, jti: str, expires: float):
+        """
+        Revoca un token hasta su expiración.
+
+        Args:
+            jti (str): Identificador del token.
+            expires (float): Timestamp UNIX en que el token expira.
+        """
+        key = self.key(jti)
+        now = time.time()
+        with self.locked():
+            target, oldest = None, None
+            for index, (slot_key, slot_expires) in self.probe(key):
+                if slot_key == key or slot_key == 0 or slot_expires <= now:
+                    target = index
+                    break
+                if oldest is None or slot_expires < oldest[1]:
+                    oldest = (index, slot_expires)
+            if target is None:
+                # Tabla saturada: se sacrifica la revocación que expira antes
+                target = oldest[0]
+            offset = target * SLOT.size
+            # La expiración se escribe antes que la llave para que un lector
+            # sin lock nunca vea la llave nueva con la expiración anterior
+            struct.pack_into("<Q", self._map, offset + 8, int(expires) + 1)
+            struct.pack_into("<Q", self._map, offset, key)
+
+    def __contains__(self, jti: str) -> bool:
+        key = self.key(jti)
+        now = time.time()
+        for _, (slot_key, slot_expires) in self.probe(key):
+            if slot_key == 0:
+                return False
+            if slot_key == key:
+                return slot_expires > now
+        return False
+
+
+_revoked = None
+_revoked_lock = threading.Lock()
+
+
+def get_revocation_list() -> RevocationList:
+    """Lista de revocación del proceso"""
+    global _revoked
+    settings = (Config.TOKEN_REVOCATION_SLOTS, Config.TOKEN_REVOCATION_FILE)
+    with _revoked_lock:
+        if _revoked is None or (_revoked.slots, _revoked.path or "") != settings:
+            _revoked = RevocationList(Config.TOKEN_REVOCATION_SLOTS, Config.TOKEN_REVOCATION_FILE)
+        return _revoked
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    secret = (Config.TOKEN_SECRET or Config.SECRET_KEY).encode()
+    return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(user_id: str, user_name: str = None) -> dict:
+    """
+    Emite un token de acceso para un usuario.
+
+    Args:
+        user_id (str): ID del usuario.
+        user_name (str, opcional): Nombre del usuario.
+
+    Returns:
+        dict: access_token, token_type y expires_in (segundos).
+    """
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "name": user_name,
+        "iat": now,
+        "exp": now + Config.TOKEN_TTL,
+        "jti": secrets.token_hex(16),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return {
+        "access_token": f"{payload}.{_sign(payload)}",
+        "token_type": "Bearer",
+        "expires_in": Config.TOKEN_TTL,
+    }
+
+
+def decode_token(token: str):
+    """
+    Verifica la firma, la expiración y la revocación de un token.
+
+    Args:
+        token (str): Token de acceso.
+
+    Returns:
+        dict | None: Claims del token o None si no es válido.
+    """
+    payload, sep, signature = (token or "").partition(".")
+    try:
+        if not sep or not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        # Incluye base64 y JSON inválidos, y caracteres que no son ASCII
+        return None
+    if claims["exp"] <= time.time() or claims["jti"] in get_revocation_list():
+        return None
+    return claims
+
+
+def revoke_token(claims: dict):
+    """Revoca un token ya verificado hasta su expiración"""
+    get_revocation_list().add(claims["jti"], claims["exp"])
+
+
+def bearer_token():
+    """Token del encabezado Authorization: Bearer, o None"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" and token else None
+
+
+def token_required(func):
+    """
+    Restringe un endpoint a peticiones con un token de acceso válido.
+
+    Los claims verificados quedan en g.user; g.user["sub"] es el ID del usuario.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        claims = decode_token(bearer_token())
+        if claims is None:
+            abort(401, "Token de acceso inválido o expirado")
+        g.user = claims
+        return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,337 @@
+# tracing.py
+"""
+Trazas de las peticiones con spans anidados.
+
+Cada petición abre un span raíz (continuando la traza del encabezado W3C
+traceparent si viene uno) y dentro de él se abren spans para el manejador,
+cada sentencia SQL, update_place_rating, el guardado de archivos subidos y
+la serialización de la respuesta. La respuesta incluye su propio
+traceparent para correlacionarla con los logs del cliente.
+
+Al terminar la petición sus spans se encolan y un hilo los exporta en
+formato Zipkin v2 (JSON): una línea por span en Config.TRACE_FILE y/o un
+POST a Config.TRACE_COLLECTOR_URL (Zipkin, Jaeger o un collector de
+OpenTelemetry con el receptor de Zipkin). Si la cola se llena los spans se
+descartan: exportar nunca bloquea la petición.
+
+Sin archivo ni collector configurados no se crean spans y el costo por
+petición y por consulta es leer una ContextVar.
+"""
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "cucei-foods"
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current = ContextVar("current_span", default=None)
+
+
+class Span:
+    """Operación con inicio, fin y atributos dentro de una traza"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes")
+
+    def __init__(self, trace, name: str, parent_id: str = None, kind: str = None, attributes: dict = None):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_zipkin(self) -> dict:
+        """Span en el formato JSON v2 de Zipkin"""
+        data = {
+            "traceId": self.trace.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": self.start_ns // 1000,
+            "duration": max(1, (self.end_ns - self.start_ns) // 1000),
+            "localEndpoint": {"serviceName": SERVICE_NAME},
+            "tags": {key: str(value) for key, value in self.attributes.items()},
+        }
+        if self.parent_id:
+            data["parentId"] = self.parent_id
+        if self.kind:
+            data["kind"] = self.kind
+        return data
+
+
+class Trace:
+    """Spans terminados de una traza dentro de este proceso"""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str = None):
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.spans = []
+
+
+def tracing_enabled() -> bool:
+    """Hay un destino configurado para las trazas"""
+    return bool(Config.TRACE_FILE or Config.TRACE_COLLECTOR_URL)
+
+
+def current_span():
+    """Span activo en el contexto actual, o None si no se está trazando"""
+    return _current.get()
+
+
+def traceparent(span: Span) -> str:
+    """Encabezado W3C traceparent que identifica al span"""
+    return f"00-{span.trace.trace_id}-{span.span_id}-01"
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Abre un span hijo del span activo; sin traza activa no hace nada.
+
+    Yields:
+        Span | None: El span creado.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, attributes=attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set("error", type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def traced(name: str):
+    """Decorador que ejecuta la función dentro de un span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(name: str, header: str = None, **attributes):
+    """
+    Abre el span raíz de una petición.
+
+    Un llamador que no muestrea la traza siempre se respeta. La marca de
+    muestreada solo se obedece con Config.TRACE_TRUST_INCOMING; si no,
+    cualquier cliente podría forzar una traza por petición, y se aplica
+    Config.TRACE_SAMPLE_RATE como a las peticiones sin encabezado.
+
+    Args:
+        name (str): Nombre del span.
+        header (str, opcional): traceparent recibido; la traza continúa la del llamador.
+
+    Returns:
+        tuple | None: (span, token) o None si la traza no se muestrea.
+    """
+    match = TRACEPARENT.match(header or "")
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        if not int(flags, 16) & 1:
+            return None
+        sampled = Config.TRACE_TRUST_INCOMING
+    else:
+        trace_id = parent_id = None
+        sampled = False
+    if not sampled and random.random() >= Config.TRACE_SAMPLE_RATE:
+        return None
+    root = Span(Trace(trace_id), name, parent_id, kind="SERVER", attributes=attributes)
+    return root, _current.set(root)
+
+
+def finish_trace(root: Span, token):
+    """Cierra el span raíz y encola la traza para exportarla"""
+    _current.reset(token)
+    root.end()
+    export(root.trace.spans)
+
+
+# Exportación en segundo plano
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def _forget_exporter():
+    # El hilo exportador no existe en el proceso hijo
+    global _queue, _queue_lock
+    _queue = None
+    _queue_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_exporter)
+
+
+def _write(spans: list):
+    payload = [s.to_zipkin() for s in spans]
+    if Config.TRACE_FILE:
+        with open(Config.TRACE_FILE, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(item) + "\n" for item in payload)
+    if Config.TRACE_COLLECTOR_URL:
+        req = urllib.request.Request(
+            Config.TRACE_COLLECTOR_URL, data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(req, timeout=5):
+            pass
+
+
+def _export_loop(spans_queue):
+    while True:
+        spans = spans_queue.get()
+        try:
+            if spans is None:
+                return
+            _write(spans)
+        except Exception:
+            logger.warning("No se pudieron exportar %d spans", len(spans), exc_info=True)
+        finally:
+            spans_queue.task_done()
+
+
+def _get_queue() -> queue.Queue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = queue.Queue(maxsize=Config.TRACE_QUEUE_SIZE)
+            threading.Thread(target=_export_loop, args=(_queue,), name="trace-exporter", daemon=True).start()
+        return _queue
+
+
+def export(spans: list):
+    """Encola spans para exportarlos; si la cola está llena se descartan"""
+    try:
+        _get_queue().put_nowait(spans)
+    except queue.Full:
+        logger.debug("Cola de trazas llena; se descartan %d spans", len(spans))
+
+
+def flush():
+    """Espera a que se exporten los spans encolados"""
+    if _queue is not None:
+        _queue.join()
+
+
+# Integraciones
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current.get()
+    if parent is not None and context is not None:
+        from app.slowqueries import fingerprint
+
+        context._trace_span = Span(parent.trace, "sql", parent.span_id, kind="CLIENT", attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": fingerprint(statement)[1],
+        })
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql_span = getattr(context, "_trace_span", None)
+    if sql_span is not None:
+        context._trace_span = None
+        if cursor.rowcount >= 0:
+            sql_span.set("db.rows", cursor.rowcount)
+        sql_span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Si la sentencia falla no hay after_cursor_execute: el span se cierra aquí
+    context = exception_context.execution_context
+    sql_span = getattr(context, "_trace_span", None)
+    if sql_span is not None:
+        context._trace_span = None
+        sql_span.set("error", type(exception_context.original_exception).__name__)
+        sql_span.end()
+
+
+def init_tracing(app: Flask, api=None):
+    """
+    Registra las trazas por petición en la aplicación.
+
+    Args:
+        app (Flask): Instancia de la aplicación
+        api (Api, opcional): API de flask-restx cuya serialización JSON se traza
+    """
+    @app.before_request
+    def _start_request_trace():
+        if not tracing_enabled():
+            return
+        started = start_trace(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                              request.headers.get("traceparent"),
+                              **{"http.method": request.method, "http.target": request.path})
+        if started is not None:
+            g.trace_root, g.trace_token = started
+
+    @app.after_request
+    def _add_traceparent(response):
+        root = g.get("trace_root")
+        if root is not None:
+            root.set("http.status_code", response.status_code)
+            response.headers["traceparent"] = traceparent(root)
+        return response
+
+    @app.teardown_request
+    def _finish_request_trace(exc=None):
+        root = g.pop("trace_root", None)
+        if root is not None:
+            if exc is not None:
+                root.set("error", type(exc).__name__)
+            finish_trace(root, g.pop("trace_token"))
+
+    dispatch_request = app.dispatch_request
+
+    @functools.wraps(dispatch_request)
+    def traced_dispatch_request(*args, **kwargs):
+        if _current.get() is None:
+            return dispatch_request(*args, **kwargs)
+        with span("handler", endpoint=request.endpoint):
+            return dispatch_request(*args, **kwargs)
+
+    app.dispatch_request = traced_dispatch_request
+
+    if api is not None:
+        output_json = api.representations["application/json"]
+
+        @api.representation("application/json")
+        def traced_output_json(data, code, headers=None):
+            with span("serialize"):
+                return output_json(data, code, headers)
@@ -1,6 +1,8 @@
 # utils.py
 from app.db.models import Comment
+from app.tracing import traced
 
+@traced("update_place_rating")
 def update_place_rating(session, place):
     """
     Actualiza la calificación promedio de un lugar basado en los comentarios existentes.
@@ -0,0 +1,10 @@
+"""
+Cucei Foods Backend - Punto de entrada ASGI
+Sirve las lecturas con consultas asíncronas y el resto con la aplicación Flask
+
+    uvicorn asgi:app --workers 4
+"""
+from app.asgi import create_asgi_app
+from main import app as flask_app
+
+app = create_asgi_app(flask_app)
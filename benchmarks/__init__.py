@@ -0,0 +1,85 @@
+"""
+Benchmarks de rendimiento.
+
+Utilidades comunes: la aplicación completa sobre cualquier base de datos
+(incluida SQLite, que no soporta JSONB) y una base de prueba poblada.
+"""
+import uuid
+from flask import Flask
+from flask_cors import CORS
+from flask_restx import Api
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from app.db.models import db, User, Place, MenuItem, Comment, utcnow
+from app.passwords import hash_password
+from app.metrics import init_metrics
+from app.profiling import init_profiling
+from app.sampler import init_sampler
+from app.accesslog import init_access_log
+from app.tracing import init_tracing
+from app.ratelimit import init_trusted_proxies
+from app.querystats import init_query_stats
+from app.routes import register_routes
+
+CATEGORIES = ("Desayunos y Comidas", "Bebidas y Cafetería", "Snacks")
+PASSWORD = "password123"
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(type_, compiler, **kw):
+    # Permite create_all() sobre SQLite en los benchmarks
+    return "JSON"
+
+
+def create_read_app(database_url: str) -> Flask:
+    """Aplicación completa sobre la base indicada"""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    CORS(app)
+    init_trusted_proxies(app)
+    db.init_app(app)
+    init_query_stats(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_sampler(app)
+    init_access_log(app)
+    api = Api(app)
+    register_routes(api)
+    app.extensions["api"] = api
+    init_tracing(app, api)
+    return app
+
+
+def bench_email(i: int) -> str:
+    """Correo del usuario i de la base de prueba (contraseña PASSWORD)"""
+    return f"bench{i}@alumnos.udg.mx"
+
+
+def seed(app: Flask, places: int, comments: int, users: int = 1):
+    """Crea las tablas y las llena con usuarios, lugares, platillos y comentarios"""
+    with app.app_context():
+        db.create_all()
+        now = utcnow()
+        # Todos los usuarios comparten contraseña: un solo hash
+        password_hash = hash_password(PASSWORD)
+        user_rows = [{"id": str(uuid.uuid4()), "name": f"Bench {i}", "email": bench_email(i),
+                      "password_hash": password_hash, "created_at": now, "updated_at": now}
+                     for i in range(users)]
+        db.session.execute(insert(User), user_rows)
+        place_rows = [{"id": str(uuid.uuid4()), "name": f"Lugar {i}", "schedule": {"lunes": "08:00-20:00"},
+                       "category": CATEGORIES[i % 3], "image_url": "", "rating": 0.0, "num_ratings": 0,
+                       "created_at": now, "updated_at": now} for i in range(places)]
+        db.session.execute(insert(Place), place_rows)
+        db.session.execute(insert(MenuItem), [
+            {"id": str(uuid.uuid4()), "place_id": p["id"], "category": "Comidas", "dish_name": f"Platillo {j}",
+             "price": 10.0 + j, "created_at": now, "updated_at": now}
+            for p in place_rows for j in range(5)
+        ])
+        if comments:
+            db.session.execute(insert(Comment), [
+                {"id": str(uuid.uuid4()), "place_id": p["id"], "user_id": user_rows[j % users]["id"],
+                 "text": f"Comentario {j}", "rating": j % 5 + 1, "created_at": now, "updated_at": now}
+                for p in place_rows for j in range(comments)
+            ])
+        db.session.commit()
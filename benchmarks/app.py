@@ -0,0 +1,15 @@
+"""
+Aplicación para los benchmarks con un servidor real.
+
+Es la aplicación de main.py; importar el paquete benchmarks permite crear
+las tablas sobre SQLite.
+
+    flask --app benchmarks.app run --with-threads
+    flask --app benchmarks.app serve
+    uvicorn benchmarks.app:asgi
+"""
+import benchmarks  # noqa: F401
+from app.asgi import create_asgi_app
+from main import app
+
+asgi = create_asgi_app(app)
@@ -0,0 +1,121 @@
+"""
+Microbenchmark en proceso de lecturas concurrentes: ASGI frente a WSGI.
+
+Envía peticiones GET a /api/places, /api/places/<id>, /api/places/counts y
+/api/places/<id>/comments desde N clientes concurrentes, sin servidor ni
+sockets de por medio:
+- WSGI: el test_client de Flask con un hilo por cliente.
+- ASGI: app.asgi llamada directamente, con una corrutina por cliente en un
+  solo event loop.
+
+Mide el costo de la aplicación y del acceso a la base en cada modelo de
+concurrencia, no el de un despliegue: no hay parseo HTTP, workers ni red.
+Para comparar los servidores reales se usa benchmarks.loadtest con
+--server gunicorn y --server uvicorn.
+
+Sin --database-url se usa una base SQLite temporal poblada con datos de
+prueba; con una base PostgreSQL existente (solo se leen sus lugares) se
+mide el caso en que la espera por la base domina.
+
+Uso:
+    python -m benchmarks.asgi_inprocess --clients 32 --requests 2000
+    python -m benchmarks.asgi_inprocess --database-url postgresql://... --clients 64
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask
+from sqlalchemy import select
+from app.asgi import create_asgi_app
+from app.db.models import db, Place
+from benchmarks import create_read_app, seed
+
+
+def read_paths(app: Flask) -> list:
+    """Rutas de lectura a recorrer, con los lugares existentes"""
+    with app.app_context():
+        ids = db.session.execute(select(Place.id).limit(20)).scalars().all()
+    paths = ["/api/places", "/api/places/counts"]
+    for place_id in ids:
+        paths += [f"/api/places/{place_id}", f"/api/places/{place_id}/comments"]
+    return paths
+
+
+def run_wsgi(app: Flask, paths: list, clients: int, requests: int) -> float:
+    """Peticiones por segundo con un hilo por cliente"""
+    def get(path):
+        with app.test_client() as client:
+            assert client.get(path).status_code == 200
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(get, paths))
+        started = time.perf_counter()
+        list(executor.map(get, itertools.islice(itertools.cycle(paths), requests)))
+        return requests / (time.perf_counter() - started)
+
+
+async def _asgi_get(asgi_app, path: str) -> int:
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0),
+             "server": ("bench", 80)}
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await asgi_app(scope, receive, send)
+    return status[0]
+
+
+def run_asgi(app: Flask, paths: list, clients: int, requests: int) -> float:
+    """Peticiones por segundo con una corrutina por cliente"""
+    async def main():
+        asgi_app = create_asgi_app(app)
+        pending = iter(itertools.islice(itertools.cycle(paths), requests))
+
+        async def client():
+            for path in pending:
+                assert await _asgi_get(asgi_app, path) == 200
+
+        for path in paths:
+            await _asgi_get(asgi_app, path)
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        await asgi_app.engine.dispose()
+        return requests / elapsed
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="Clientes concurrentes.")
+    parser.add_argument("--requests", type=int, default=2000, help="Peticiones medidas por escenario.")
+    parser.add_argument("--database-url", help="Base ya poblada (por defecto SQLite temporal).")
+    parser.add_argument("--places", type=int, default=50, help="Lugares a crear en la base temporal.")
+    parser.add_argument("--comments", type=int, default=20, help="Comentarios por lugar en la base temporal.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_read_app(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        if not args.database_url:
+            seed(app, args.places, args.comments)
+        paths = read_paths(app)
+
+        print(f"clientes={args.clients} peticiones={args.requests} núcleos={os.cpu_count() or 1}")
+        for label, run in (("WSGI en proceso (hilos)", run_wsgi), ("ASGI en proceso (asyncio)", run_asgi)):
+            print(f"{label:>26}: {run(app, paths, args.clients, args.requests):8.1f} peticiones/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Fixtures de los microbenchmarks (pytest-benchmark).
+
+Cada benchmark que usa `dataset` se ejecuta con un lugar que tiene 10, 1k
+y 100k comentarios (--comment-sizes). Al final se imprime cómo crece el
+tiempo medio con el tamaño y el exponente estimado (tiempo ~ n^k), de modo
+que una regresión algorítmica aparece como un cambio en la curva.
+
+    python -m pytest benchmarks -o addopts="" --benchmark-group-by=group
+"""
+import math
+import pytest
+from collections import defaultdict
+from sqlalchemy import select
+from app.config import Config
+from app.db.models import db, Place
+from benchmarks import create_read_app, seed
+
+_scaling = defaultdict(dict)
+
+
+class Dataset:
+    """Aplicación sobre una base con un lugar de `comments` comentarios"""
+
+    def __init__(self, app, place_id, comments):
+        self.app = app
+        self.place_id = place_id
+        self.comments = comments
+
+
+def size_label(n: int) -> str:
+    return f"{n // 1000}k" if n >= 1000 and n % 1000 == 0 else str(n)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--comment-sizes", default="10,1000,100000",
+                     help="Comentarios por lugar de cada conjunto de datos, separados por comas.")
+
+
+def pytest_generate_tests(metafunc):
+    if "dataset" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("comment_sizes").split(",")]
+        metafunc.parametrize("dataset", sizes, indirect=True, scope="session", ids=[size_label(n) for n in sizes])
+
+
+@pytest.fixture(scope="session")
+def dataset(request, tmp_path_factory):
+    """Base SQLite con un lugar y request.param comentarios"""
+    path = tmp_path_factory.mktemp("bench") / f"comments-{request.param}.db"
+    app = create_read_app(f"sqlite:///{path}")
+    seed(app, places=1, comments=request.param, users=10)
+    with app.app_context():
+        place_id = db.session.execute(select(Place.id)).scalar_one()
+        db.session.remove()
+    return Dataset(app, place_id, request.param)
+
+
+@pytest.fixture
+def upload_folder(tmp_path, monkeypatch):
+    """Uploads en un directorio temporal, sin miniaturas"""
+    monkeypatch.setattr(Config, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(Config, "STORAGE_BACKEND", "local")
+    monkeypatch.setattr(Config, "IMAGE_PROCESSING", False)
+    return tmp_path
+
+
+@pytest.fixture
+def scaling(benchmark):
+    """Registra el tiempo medio del benchmark para la curva de escalamiento"""
+    def record(size: int):
+        benchmark.extra_info["size"] = size
+        if benchmark.stats is not None:
+            _scaling[benchmark.group or benchmark.name][size] = benchmark.stats.stats.mean
+    return record
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _scaling:
+        return
+    terminalreporter.section("Escalamiento (tiempo medio por tamaño)")
+    for group, by_size in sorted(_scaling.items()):
+        sizes = sorted(by_size)
+        base_n, base_t = sizes[0], by_size[sizes[0]]
+        points = [f"{size_label(base_n)}: {base_t * 1000:.3f} ms"]
+        for n in sizes[1:]:
+            t = by_size[n]
+            exponent = math.log(t / base_t) / math.log(n / base_n) if base_t and t and n != base_n else 0.0
+            points.append(f"{size_label(n)}: {t * 1000:.3f} ms (x{t / base_t:.1f}, ~n^{exponent:.2f})")
+        terminalreporter.write_line(f"{group}: " + ", ".join(points))
@@ -0,0 +1,309 @@
+"""
+Prueba de carga HTTP de extremo a extremo.
+
+Levanta la aplicación en un servidor real sobre una base poblada y la
+recorre con clientes concurrentes que mezclan listados, detalles,
+comentarios, publicación de comentarios e inicios de sesión. Reporta el
+throughput y los percentiles de latencia por endpoint y guarda el
+resultado en JSON para compararlo entre commits.
+
+Servidores:
+- werkzeug: servidor de desarrollo con hilos (flask run).
+- gunicorn: flask serve (requiere gunicorn).
+- uvicorn: modo ASGI (requiere uvicorn).
+
+Mezclas: un nombre de MIXES o pesos explícitos, p. ej.
+"list=5,detail=3,comments=2".
+
+Uso:
+    python -m benchmarks.loadtest --server werkzeug --concurrency 16 --duration 30
+    python -m benchmarks.loadtest --server gunicorn --workers 4 -o despues.json --baseline antes.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from sqlalchemy import select
+from app.db.models import db, Place
+from app.datagen import DEFAULT_PASSWORD, generate_dataset, user_email
+from benchmarks import create_read_app
+
+MIXES = {
+    "default": {"list": 30, "counts": 5, "detail": 25, "comments": 20, "post_comment": 15, "login": 5},
+    "read": {"list": 40, "counts": 10, "detail": 30, "comments": 20},
+    "write": {"detail": 20, "comments": 20, "post_comment": 50, "login": 10},
+}
+# Estado esperado de cada escenario
+EXPECTED = {"list": 200, "counts": 200, "detail": 200, "comments": 200, "post_comment": 201, "login": 200}
+FORM = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def parse_mix(value: str) -> dict:
+    """Mezcla por nombre o como "escenario=peso,..." """
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in EXPECTED:
+            raise argparse.ArgumentTypeError(f"Escenario desconocido: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def build_request(name: str, rng: random.Random, place_ids: list, email: str, token: str):
+    """Método, ruta, cuerpo y encabezados de una petición del escenario"""
+    place_id = rng.choice(place_ids)
+    if name == "list":
+        return "GET", "/api/places", None, {}
+    if name == "counts":
+        return "GET", "/api/places/counts", None, {}
+    if name == "detail":
+        return "GET", f"/api/places/{place_id}", None, {}
+    if name == "comments":
+        return "GET", f"/api/places/{place_id}/comments", None, {}
+    if name == "post_comment":
+        body = urlencode({"text": f"Comentario de carga {rng.random():.6f}", "rating": rng.randint(1, 5)})
+        return "POST", f"/api/places/{place_id}/comments", body, {**FORM, "Authorization": f"Bearer {token}"}
+    if name == "login":
+        return "POST", "/api/login", urlencode({"email": email, "password": DEFAULT_PASSWORD}), FORM
+    raise ValueError(name)
+
+
+def login(host: str, port: int, email: str) -> str:
+    """Token de acceso de un usuario generado"""
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    try:
+        conn.request("POST", "/api/login", urlencode({"email": email, "password": DEFAULT_PASSWORD}), FORM)
+        response = conn.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"Login fallido ({response.status}): {data}")
+        return data["access_token"]
+    finally:
+        conn.close()
+
+
+def client(host, port, mix, place_ids, email, seed_value, record_from, stop_at, results):
+    """Envía peticiones hasta stop_at y registra (escenario, segundos, estado)"""
+    rng = random.Random(seed_value)
+    names, weights = list(mix), list(mix.values())
+    token = login(host, port, email) if "post_comment" in mix else ""
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+
+    while True:
+        started = time.perf_counter()
+        if started >= stop_at:
+            break
+        name = rng.choices(names, weights)[0]
+        method, path, body, headers = build_request(name, rng, place_ids, email, token)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = 0
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+        elapsed = time.perf_counter() - started
+        if started >= record_from:
+            results.append((name, elapsed, status))
+    conn.close()
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results: list, seconds: float) -> dict:
+    """Throughput, errores y latencias (ms) por escenario y en total"""
+    groups = defaultdict(list)
+    errors = defaultdict(int)
+    for name, elapsed, status in results:
+        groups[name].append(elapsed)
+        groups["total"].append(elapsed)
+        if status != EXPECTED[name]:
+            errors[name] += 1
+            errors["total"] += 1
+
+    summary = {}
+    for name, values in sorted(groups.items()):
+        values.sort()
+        summary[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "throughput": round(len(values) / seconds, 2),
+            "latency_ms": {
+                "mean": round(sum(values) / len(values) * 1000, 3),
+                "p50": round(percentile(values, 50) * 1000, 3),
+                "p95": round(percentile(values, 95) * 1000, 3),
+                "p99": round(percentile(values, 99) * 1000, 3),
+                "max": round(values[-1] * 1000, 3),
+            },
+        }
+    return summary
+
+
+def server_command(server: str, port: int, workers: int) -> list:
+    """Comando para levantar la aplicación en el servidor elegido"""
+    flask = [sys.executable, "-m", "flask", "--app", "benchmarks.app"]
+    if server == "werkzeug":
+        return flask + ["run", "--port", str(port), "--with-threads", "--no-reload", "--no-debugger"]
+    if server == "gunicorn":
+        return flask + ["serve", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)]
+    if server == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "benchmarks.app:asgi", "--port", str(port),
+                "--workers", str(workers), "--no-access-log"]
+    raise ValueError(server)
+
+
+def wait_ready(process, port: int, timeout: float = 120):
+    """Espera a que el servidor responda"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El servidor terminó al arrancar")
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            conn.request("GET", "/api/places/counts")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.2)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(result: dict, baseline: dict):
+    """Imprime el cambio de throughput y p95 respecto a otro resultado"""
+    print(f"\nComparación con {baseline['meta'].get('commit') or 'la referencia'}:")
+    for name, current in result["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if not before:
+            continue
+        rps = (current["throughput"] / before["throughput"] - 1) * 100 if before["throughput"] else 0
+        p95 = (current["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1) * 100 if before["latency_ms"]["p95"] else 0
+        print(f"{name:>14}: throughput {rps:+7.1f}%   p95 {p95:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["werkzeug", "gunicorn", "uvicorn"], default="werkzeug")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del servidor.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clientes concurrentes.")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos medidos.")
+    parser.add_argument("--warmup", type=float, default=5, help="Segundos iniciales sin medir.")
+    parser.add_argument("--mix", type=parse_mix, default="default", help=f"Mezcla: {', '.join(MIXES)} o pesos.")
+    parser.add_argument("--database-url", help="Base a usar (por defecto SQLite temporal).")
+    parser.add_argument("--no-seed", action="store_true", help="No poblar la base (ya poblada con la misma semilla).")
+    parser.add_argument("--places", type=int, default=100, help="Lugares a crear.")
+    parser.add_argument("--comments", type=int, default=20000, help="Comentarios en total (distribución de Zipf).")
+    parser.add_argument("--users", type=int, default=500, help="Usuarios a crear.")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de los datos y de los clientes.")
+    parser.add_argument("--output", "-o", default="loadtest.json", help="Archivo JSON de resultados.")
+    parser.add_argument("--baseline", help="Resultado anterior para comparar.")
+    args = parser.parse_args()
+    mix = args.mix
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'loadtest.db')}"
+        app = create_read_app(database_url)
+        with app.app_context():
+            if not args.no_seed:
+                db.create_all()
+                generate_dataset(args.users, args.places, args.comments, seed=args.seed)
+            place_ids = db.session.execute(select(Place.id)).scalars().all()
+
+        port = free_port()
+        env = {**os.environ, "DATABASE_URL": database_url, "LOGIN_THROTTLE": "0",
+               "SECRET_KEY": os.environ.get("SECRET_KEY", "loadtest"), "WARMUP_PATHS": "/api/places/counts"}
+        log = open(os.path.join(tmp, "server.log"), "w+")
+        process = subprocess.Popen(server_command(args.server, port, args.workers), env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_ready(process, port)
+            results = []
+            now = time.perf_counter()
+            record_from, stop_at = now + args.warmup, now + args.warmup + args.duration
+            threads = [threading.Thread(target=client, args=(
+                "127.0.0.1", port, mix, place_ids, user_email(args.seed, i % args.users), args.seed + i,
+                record_from, stop_at, results
+            )) for i in range(args.concurrency)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        except RuntimeError:
+            log.seek(0)
+            print(log.read()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "server": args.server,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": mix,
+            "dataset": {"places": len(place_ids), "comments": args.comments, "users": args.users, "seed": args.seed},
+            "cpus": os.cpu_count() or 1,
+        },
+        "endpoints": summarize(results, args.duration),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(f"{'endpoint':>14} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for name, s in result["endpoints"].items():
+        lat = s["latency_ms"]
+        print(f"{name:>14} {s['requests']:>7} {s['errors']:>5} {s['throughput']:>8.1f} "
+              f"{lat['p50']:>8.2f} {lat['p95']:>8.2f} {lat['p99']:>8.2f}")
+    print(f"\nResultados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
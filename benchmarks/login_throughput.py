@@ -0,0 +1,79 @@
+"""
+Benchmark de inicios de sesión por segundo.
+
+Compara el hash en el hilo de la petición (PASSWORD_HASH_WORKERS=0) con el
+pool de procesos, enviando logins concurrentes a POST /api/login con el
+cliente de pruebas de Flask y una base SQLite temporal.
+
+Uso:
+    python -m benchmarks.login_throughput --threads 8 --requests 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask
+from flask_restx import Api
+from app.config import Config
+from app.db.models import db, User
+from app.passwords import hash_password
+from app.routes import register_routes
+
+EMAIL = "bench@alumnos.udg.mx"
+PASSWORD = "password123"
+
+
+def create_bench_app(db_path: str) -> Flask:
+    """Aplicación mínima con solo la tabla de usuarios"""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    db.init_app(app)
+    register_routes(Api(app))
+    with app.app_context():
+        User.__table__.create(db.engine)
+        db.session.add(User(name="Bench", email=EMAIL, password_hash=hash_password(PASSWORD)))
+        db.session.commit()
+    return app
+
+
+def run(app: Flask, threads: int, requests: int) -> float:
+    """Envía los logins y retorna los logins por segundo"""
+    def login(_):
+        with app.test_client() as client:
+            response = client.post("/api/login", data={"email": EMAIL, "password": PASSWORD})
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        # Calentamiento: crea los procesos del pool y las conexiones
+        list(executor.map(login, range(threads)))
+        started = time.perf_counter()
+        list(executor.map(login, range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="Peticiones concurrentes.")
+    parser.add_argument("--requests", type=int, default=200, help="Logins medidos por escenario.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del pool.")
+    parser.add_argument("--method", default=Config.PASSWORD_HASH_METHOD, help="Método de hash de Werkzeug.")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    Config.PASSWORD_HASH_METHOD = args.method
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.PASSWORD_HASH_WORKERS = 0
+        app = create_bench_app(os.path.join(tmp, "bench.db"))
+
+        print(f"método={args.method} hilos={args.threads} núcleos={cores}")
+        for label, workers in (("en el hilo", 0), (f"pool de {args.workers} procesos", args.workers)):
+            Config.PASSWORD_HASH_WORKERS = workers
+            rate = run(app, args.threads, args.requests)
+            used = min(cores, max(workers, 1))
+            print(f"{label:>24}: {rate:8.1f} logins/s ({rate / used:.1f} por núcleo usado)")
+
+
+if __name__ == "__main__":
+    main()
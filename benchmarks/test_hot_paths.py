@@ -0,0 +1,120 @@
+"""
+Microbenchmarks de las rutas críticas dentro del proceso.
+
+- update_place_rating
+- Construcción del listado de GET /api/places (place_summary)
+- Serialización con los modelos Place y Comment
+- allowed_file y save_upload_file
+- Hash de contraseñas
+"""
+import io
+import os
+import pytest
+from flask_restx import marshal
+from sqlalchemy.orm import Session
+from werkzeug.datastructures import FileStorage
+from app.config import Config
+from app.db.models import db, Place
+from app.passwords import hash_password
+from app.routes.comments import comment_to_dict
+from app.routes.places import latest_comments_query, place_summary
+from app.routes.uploads import allowed_file, save_upload_file
+from app.utils import update_place_rating
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.mark.benchmark(group="update_place_rating")
+def test_update_place_rating(benchmark, dataset, scaling):
+    """Recalcular la calificación de un lugar"""
+    with dataset.app.app_context():
+        session = Session(db.engine)
+        try:
+            place = session.get(Place, dataset.place_id)
+            benchmark(update_place_rating, session, place)
+            assert place.num_ratings == dataset.comments
+        finally:
+            session.close()
+    scaling(dataset.comments)
+
+
+@pytest.mark.benchmark(group="places_listing")
+def test_places_listing(benchmark, dataset, scaling):
+    """Consulta y diccionarios del listado, como en Places.get"""
+    def listing():
+        session = Session(db.engine)
+        try:
+            latest = dict(session.execute(latest_comments_query()).all())
+            return [place_summary(p, latest.get(p.id, "")) for p in session.query(Place).all()]
+        finally:
+            session.close()
+
+    with dataset.app.app_context():
+        places = benchmark(listing)
+    assert len(places) == 1
+    scaling(dataset.comments)
+
+
+@pytest.mark.benchmark(group="marshal_place")
+def test_marshal_place(benchmark, dataset, scaling):
+    """Serializar el listado con el modelo Place"""
+    api = dataset.app.extensions["api"]
+    with dataset.app.app_context():
+        session = Session(db.engine)
+        try:
+            latest = dict(session.execute(latest_comments_query()).all())
+            places = [place_summary(p, latest.get(p.id, "")) for p in session.query(Place).all()]
+        finally:
+            session.close()
+
+    data = benchmark(marshal, places, api.models["Place"])
+    assert data[0]["name"] == "Lugar 0"
+    scaling(dataset.comments)
+
+
+@pytest.mark.benchmark(group="marshal_comments")
+def test_marshal_comments(benchmark, dataset, scaling):
+    """Serializar los comentarios de un lugar con el modelo Comment"""
+    api = dataset.app.extensions["api"]
+    with dataset.app.app_context():
+        session = Session(db.engine)
+        try:
+            comments = [comment_to_dict(c) for c in session.get(Place, dataset.place_id).comments]
+        finally:
+            session.close()
+
+    data = benchmark(marshal, comments, api.models["Comment"])
+    assert len(data) == dataset.comments
+    scaling(dataset.comments)
+
+
+@pytest.mark.benchmark(group="allowed_file")
+@pytest.mark.parametrize("filename", ["foto.png", "FOTO.JPEG", "archivo.tar.gz", "sin_extension"])
+def test_allowed_file(benchmark, filename):
+    """Validar la extensión de un archivo"""
+    benchmark(allowed_file, filename)
+
+
+@pytest.mark.benchmark(group="save_upload_file")
+@pytest.mark.parametrize("size", [10 * 1024, 1024 * 1024, 8 * 1024 * 1024], ids=["10KB", "1MB", "8MB"])
+def test_save_upload_file(benchmark, upload_folder, scaling, size):
+    """Guardar un upload nuevo (hash, escritura y rename)"""
+    def new_file():
+        # Contenido distinto en cada ronda para no medir la deduplicación
+        content = PNG_SIGNATURE + os.urandom(size)
+        return (FileStorage(io.BytesIO(content), filename="foto.png"),), {}
+
+    url = benchmark.pedantic(save_upload_file, setup=new_file, rounds=10)
+    assert url.startswith("/uploads/")
+    scaling(size)
+
+
+@pytest.mark.benchmark(group="hash_password")
+@pytest.mark.parametrize("method", ["pbkdf2:sha256:600000", "scrypt:32768:8:1"])
+def test_hash_password(benchmark, monkeypatch, method):
+    """Hash de una contraseña en el hilo actual"""
+    monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_METHOD", method)
+
+    password_hash = benchmark.pedantic(hash_password, args=("password123",), rounds=5)
+    assert password_hash.startswith(method.split(":")[0])
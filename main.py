@@ -8,6 +8,14 @@ from flask_restx import Api
 from app.config import Config
 from app.db.models import db
 from app.routes import register_routes
+from app.cli import register_commands
+from app.querystats import init_query_stats
+from app.metrics import init_metrics
+from app.profiling import init_profiling
+from app.sampler import init_sampler
+from app.accesslog import init_access_log
+from app.tracing import init_tracing
+from app.ratelimit import init_trusted_proxies
 
 
 def create_app():
@@ -19,13 +27,20 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = Config.SQLALCHEMY_TRACK_MODIFICATIONS
     app.config['UPLOAD_FOLDER'] = Config.UPLOAD_FOLDER
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
     app.secret_key = Config.SECRET_KEY
     
     # CORS
     CORS(app)
+    init_trusted_proxies(app)
     
     # Base de datos
     db.init_app(app)
+    init_query_stats(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_sampler(app)
+    init_access_log(app)
     
     # API REST
     api = Api(
@@ -38,6 +53,11 @@ def create_app():
     
     # Registrar todas las rutas
     register_routes(api)
+    app.extensions["api"] = api
+    init_tracing(app, api)
+
+    # Comandos de línea de comandos
+    register_commands(app)
     
     # Crear tablas de base de datos
     with app.app_context():
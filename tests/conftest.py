@@ -3,16 +3,37 @@ Configuración de fixtures para tests con pytest
 Usa PostgreSQL en memoria si está disponible, sino SQLite
 """
 import pytest
+from contextlib import contextmanager
 import os
 from flask import Flask
 from flask_cors import CORS
 from flask_restx import Api
 from app.db.models import db, User
 from app.routes import register_routes
+from app.cli import register_commands
+from app.querystats import init_query_stats, track_queries
+from app.metrics import init_metrics
+from app.profiling import init_profiling
+from app.sampler import init_sampler
+from app.accesslog import init_access_log
+from app.tracing import init_tracing
+from app.ratelimit import init_trusted_proxies
+
+
+@pytest.fixture(autouse=True)
+def login_throttle(monkeypatch):
+    """Cada test empieza sin intentos de login registrados"""
+    monkeypatch.setattr("app.ratelimit._limiters", None)
+
+
+@pytest.fixture
+def database_uri():
+    """URI de SQLite usada por la aplicación de pruebas"""
+    return 'sqlite:///:memory:'
 
 
 @pytest.fixture(scope="function")
-def app():
+def app(database_uri):
     """Crea una instancia de aplicación Flask para testing"""
     
     app = Flask(__name__)
@@ -30,7 +51,7 @@ def app():
             impl = JSON
             cache_ok = True
         
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
     else:
         app.config['SQLALCHEMY_DATABASE_URI'] = db_url
     
@@ -40,11 +61,20 @@ def app():
     
     # Inicializar extensiones
     CORS(app)
+    init_trusted_proxies(app)
     db.init_app(app)
+    init_query_stats(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_sampler(app)
+    init_access_log(app)
     
     # Crear API
     api = Api(app, doc='/docs')
     register_routes(api)
+    app.extensions["api"] = api
+    init_tracing(app, api)
+    register_commands(app)
     
     # Crear tablas usando SQL directo para evitar problemas con JSONB
     with app.app_context():
@@ -58,7 +88,9 @@ def app():
                         id VARCHAR(36) PRIMARY KEY,
                         name VARCHAR(150) NOT NULL,
                         email VARCHAR(150) NOT NULL UNIQUE,
-                        password_hash VARCHAR(200) NOT NULL
+                        password_hash VARCHAR(200) NOT NULL,
+                        created_at DATETIME,
+                        updated_at DATETIME
                     )
                 """)
                 conn.exec_driver_sql("""
@@ -69,7 +101,9 @@ def app():
                         category VARCHAR(100) NOT NULL,
                         image_url VARCHAR(300),
                         rating REAL DEFAULT 0.0,
-                        num_ratings INTEGER DEFAULT 0
+                        num_ratings INTEGER DEFAULT 0,
+                        created_at DATETIME,
+                        updated_at DATETIME
                     )
                 """)
                 conn.exec_driver_sql("""
@@ -79,6 +113,8 @@ def app():
                         category VARCHAR(100) NOT NULL,
                         dish_name VARCHAR(200) NOT NULL,
                         price REAL NOT NULL,
+                        created_at DATETIME,
+                        updated_at DATETIME,
                         FOREIGN KEY (place_id) REFERENCES places (id)
                     )
                 """)
@@ -89,6 +125,8 @@ def app():
                         user_id VARCHAR(36) NOT NULL,
                         text TEXT NOT NULL,
                         rating INTEGER DEFAULT 0,
+                        created_at DATETIME,
+                        updated_at DATETIME,
                         FOREIGN KEY (place_id) REFERENCES places (id),
                         FOREIGN KEY (user_id) REFERENCES users (id)
                     )
@@ -153,6 +191,42 @@ def test_user(app):
     return TestUserInfo(user_id, user_name)
 
 
+@pytest.fixture
+def admin_token(monkeypatch):
+    """Configura un token de administración"""
+    from app.config import Config
+
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "admin-secret")
+    return "admin-secret"
+
+
+@pytest.fixture
+def auth_headers(test_user):
+    """Encabezado Authorization con un token de acceso de test_user"""
+    from app.tokens import issue_token
+
+    token = issue_token(test_user.id, test_user.name)["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Verifica el presupuesto de consultas de un bloque:
+
+        with assert_max_queries(2):
+            client.get("/api/places")
+    """
+    @contextmanager
+    def check(n):
+        with track_queries(record_statements=True) as stats:
+            yield stats
+        assert stats.count <= n, (
+            f"Se ejecutaron {stats.count} consultas (máximo {n}):\n" + "\n".join(stats.statements)
+        )
+    return check
+
+
 @pytest.fixture(scope="function")
 def test_place(app, test_user):
     """Crea un lugar de prueba en la base de datos"""
@@ -313,9 +387,12 @@ def upload_folder(tmp_path, monkeypatch):
     # Monkeypatch la config de uploads
     from app.config import Config
     original_upload_folder = Config.UPLOAD_FOLDER
+    original_resize_folder = Config.RESIZE_CACHE_FOLDER
     Config.UPLOAD_FOLDER = str(upload_dir)
+    Config.RESIZE_CACHE_FOLDER = str(tmp_path / "resized")
     
     yield upload_dir
     
     # Restaurar config original
     Config.UPLOAD_FOLDER = original_upload_folder
+    Config.RESIZE_CACHE_FOLDER = original_resize_folder
@@ -0,0 +1,167 @@
+"""
+Tests unitarios para app.accesslog
+
+Prueba el log de accesos:
+- sample_rate y AccessLogFormatter
+- Entradas de las peticiones de Flask y del modo ASGI
+- Descarte de registros con la cola llena
+"""
+import json
+import logging
+import queue
+import pytest
+from prometheus_client import REGISTRY
+from app import accesslog
+from app.accesslog import AccessLogFormatter, DroppingQueueHandler, sample_rate, stop_access_log
+from app.asgi import create_asgi_app
+from app.config import Config
+from tests.test_asgi import call
+
+
+@pytest.fixture
+def access_log(tmp_path, monkeypatch):
+    """Log de accesos en un archivo temporal, sin muestreo"""
+    path = tmp_path / "access.jsonl"
+    monkeypatch.setattr(Config, "ACCESS_LOG", str(path))
+    monkeypatch.setattr(Config, "ACCESS_LOG_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(Config, "ACCESS_LOG_SLOW_MS", 1000)
+    yield path
+    stop_access_log()
+
+
+def entries(path) -> list:
+    """Escribe los registros pendientes y retorna las entradas del archivo"""
+    stop_access_log()
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestSampleRate:
+    """Tests para sample_rate"""
+
+    def test_successful_gets_are_sampled(self, monkeypatch):
+        """Los GET y HEAD exitosos usan ACCESS_LOG_SAMPLE_RATE"""
+        monkeypatch.setattr(Config, "ACCESS_LOG_SAMPLE_RATE", 0.25)
+
+        assert sample_rate("GET", 200, 0.01) == 0.25
+        assert sample_rate("HEAD", 304, 0.01) == 0.25
+
+    def test_always_logged(self, monkeypatch):
+        """Errores, peticiones lentas y escrituras se registran siempre"""
+        monkeypatch.setattr(Config, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr(Config, "ACCESS_LOG_SLOW_MS", 500)
+
+        assert sample_rate("GET", 404, 0.01) == 1.0
+        assert sample_rate("GET", 500, 0.01) == 1.0
+        assert sample_rate("GET", 200, 0.6) == 1.0
+        assert sample_rate("POST", 201, 0.01) == 1.0
+
+
+class TestFormatter:
+    """Tests para AccessLogFormatter"""
+
+    def test_json_line(self):
+        """La entrada se escribe como una línea JSON con la hora en UTC"""
+        record = logging.LogRecord("app.access", logging.INFO, __file__, 1, "GET / 200", None, None)
+        record.access = {"route": "/", "status": 200}
+
+        line = AccessLogFormatter().format(record)
+
+        data = json.loads(line)
+        assert "\n" not in line
+        assert data["route"] == "/" and data["status"] == 200
+        assert data["time"].endswith("+00:00")
+
+
+class TestRequestLogging:
+    """Tests para las entradas de las peticiones"""
+
+    def test_disabled_by_default(self, client, monkeypatch):
+        """Sin ACCESS_LOG no se arranca el listener"""
+        monkeypatch.setattr(Config, "ACCESS_LOG", "")
+
+        client.get("/api/places")
+
+        assert accesslog._handler is None
+
+    def test_entry_fields(self, client, test_place, access_log):
+        """La entrada tiene ruta, estado, duración, base de datos y bytes"""
+        response = client.get(f"/api/places/{test_place.id}")
+
+        [entry] = entries(access_log)
+        assert entry["method"] == "GET"
+        assert entry["route"] == "/api/places/<string:place_id>"
+        assert entry["path"] == f"/api/places/{test_place.id}"
+        assert entry["status"] == 200
+        assert entry["duration_ms"] >= entry["db_ms"] > 0
+        assert entry["db_queries"] >= 1
+        assert entry["bytes"] == len(response.data)
+        assert entry["user_id"] is None
+        assert entry["sample_rate"] == 1.0
+
+    def test_user_id(self, client, test_place, test_user, auth_headers, access_log):
+        """Las peticiones autenticadas registran el usuario"""
+        response = client.post(f"/api/places/{test_place.id}/comments",
+                               data={"text": "Rico", "rating": "5"}, headers=auth_headers)
+
+        assert response.status_code == 201
+        [entry] = entries(access_log)
+        assert entry["user_id"] == test_user.id
+
+    def test_sampling(self, client, test_place, access_log, monkeypatch):
+        """Con tasa 0 los GET exitosos se omiten pero los errores no"""
+        monkeypatch.setattr(Config, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+
+        client.get(f"/api/places/{test_place.id}")
+        client.get("/api/places/no-existe")
+        client.get("/no/hay/ruta")
+
+        logged = entries(access_log)
+        assert [(e["route"], e["status"]) for e in logged] == [
+            ("/api/places/<string:place_id>", 404), ("<sin ruta>", 404)
+        ]
+
+    def test_slow_requests_bypass_sampling(self, client, access_log, monkeypatch):
+        """Las peticiones lentas se registran aunque toque omitirlas"""
+        monkeypatch.setattr(Config, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr(Config, "ACCESS_LOG_SLOW_MS", 1e-9)
+
+        client.get("/api/places")
+
+        assert len(entries(access_log)) == 1
+
+
+class TestAsgiLogging:
+    """Tests para las entradas del modo ASGI"""
+
+    @pytest.fixture
+    def database_uri(self, tmp_path):
+        """Archivo SQLite compartido por el engine síncrono y el asíncrono"""
+        return f"sqlite:///{tmp_path / 'asgi.db'}"
+
+    def test_asgi_reads(self, app, test_place, access_log):
+        """Las lecturas asíncronas también se registran"""
+        status, headers, _ = call(create_asgi_app(app), "GET", f"/api/places/{test_place.id}")
+
+        [entry] = entries(access_log)
+        assert status == 200
+        assert entry["route"] == "/api/places/<string:place_id>"
+        assert entry["bytes"] == int(headers["content-length"])
+        assert entry["db_queries"] >= 1
+
+
+class TestDroppingQueueHandler:
+    """Tests para DroppingQueueHandler"""
+
+    def test_drops_when_full(self):
+        """Con la cola llena el registro se descarta sin bloquear"""
+        handler = DroppingQueueHandler(queue.Queue(1))
+        record = logging.LogRecord("app.access", logging.INFO, __file__, 1, "x", None, None)
+        before = REGISTRY.get_sample_value("access_log_dropped_total")
+
+        handler.emit(record)
+        handler.emit(record)
+
+        assert handler.queue.qsize() == 1
+        assert REGISTRY.get_sample_value("access_log_dropped_total") == before + 1
@@ -0,0 +1,266 @@
+"""
+Tests unitarios para app.asgi
+
+Prueba el modo ASGI:
+- async_database_uri
+- Lecturas asíncronas con el mismo JSON que la aplicación Flask
+- Delegación del resto de rutas a Flask
+- Servicio con uvicorn sobre un socket real
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+import urllib.request
+import pytest
+from app.asgi import ThreadedWsgiToAsgi, async_database_uri, create_asgi_app
+from app.config import Config
+
+
+def call(asgi_app, method, path, query="", body=b"", headers=()):
+    """Ejecuta una petición HTTP contra la aplicación ASGI"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver")] + [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await asgi_app(scope, receive, send)
+        await asgi_app.engine.dispose()
+
+    asyncio.run(run())
+    start = sent[0]
+    response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], response_headers, json.loads(body) if body else None
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    """Archivo SQLite compartido por el engine síncrono y el asíncrono"""
+    return f"sqlite:///{tmp_path / 'asgi.db'}"
+
+
+@pytest.fixture
+def asgi_app(app):
+    """Aplicación ASGI sobre la aplicación Flask de pruebas"""
+    return create_asgi_app(app)
+
+
+class TestAsyncDatabaseUri:
+    """Tests para async_database_uri"""
+
+    def test_postgresql_uses_asyncpg(self):
+        """PostgreSQL usa asyncpg conservando credenciales"""
+        uri = async_database_uri("postgresql://user:secreto@db:5432/cuceifoods")
+
+        assert uri == "postgresql+asyncpg://user:secreto@db:5432/cuceifoods"
+
+    def test_sqlite_uses_aiosqlite(self):
+        """SQLite usa aiosqlite"""
+        assert async_database_uri("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+
+    def test_override(self, monkeypatch):
+        """ASYNC_DATABASE_URI tiene prioridad"""
+        monkeypatch.setattr(Config, "ASYNC_DATABASE_URI", "postgresql+asyncpg://otra/db")
+
+        assert async_database_uri("sqlite:///app.db") == "postgresql+asyncpg://otra/db"
+
+    def test_unknown_backend(self):
+        """Un backend sin driver asíncrono produce un error"""
+        with pytest.raises(ValueError):
+            async_database_uri("mysql://localhost/db")
+
+
+class TestAsyncReads:
+    """Las lecturas asíncronas retornan lo mismo que Flask"""
+
+    def test_list_places(self, client, asgi_app, test_comment, test_place_with_menu):
+        """GET /api/places"""
+        status, headers, data = call(asgi_app, "GET", "/api/places")
+
+        assert status == 200
+        assert headers["content-type"] == "application/json"
+        assert data == client.get("/api/places").get_json()
+        assert len(data) == 2
+        assert "Excelente comida" in [p["latest_comment"] for p in data]
+
+    def test_list_places_by_category(self, client, asgi_app, test_multiple_places):
+        """GET /api/places?category=..."""
+        status, _, data = call(asgi_app, "GET", "/api/places", query="category=Snacks")
+
+        assert status == 200
+        assert data == client.get("/api/places?category=Snacks").get_json()
+        assert [p["name"] for p in data] == ["Snack Bar"]
+
+    def test_counts(self, client, asgi_app, test_multiple_places, test_place):
+        """GET /api/places/counts"""
+        status, _, data = call(asgi_app, "GET", "/api/places/counts")
+
+        assert status == 200
+        assert data == client.get("/api/places/counts").get_json()
+        assert data["all"] == 4
+
+    def test_place_detail(self, client, asgi_app, test_place_with_menu):
+        """GET /api/places/<id>"""
+        path = f"/api/places/{test_place_with_menu.id}"
+        status, _, data = call(asgi_app, "GET", path)
+
+        assert status == 200
+        assert data == client.get(path).get_json()
+        assert len(data["menu"]) == 3
+
+    def test_place_not_found(self, client, asgi_app):
+        """Un lugar inexistente retorna 404 como en Flask"""
+        status, _, data = call(asgi_app, "GET", "/api/places/no-existe")
+        response = client.get("/api/places/no-existe")
+
+        assert status == response.status_code == 404
+        assert data == response.get_json()
+
+    def test_comments(self, client, asgi_app, test_comment):
+        """GET /api/places/<id>/comments"""
+        path = f"/api/places/{test_comment.place_id}/comments"
+        status, _, data = call(asgi_app, "GET", path)
+
+        assert status == 200
+        assert data == client.get(path).get_json()
+        assert data[0]["user_name"] == "Test User"
+
+    def test_cors_headers(self, asgi_app, test_place):
+        """Los encabezados CORS coinciden con flask-cors"""
+        _, headers, _ = call(asgi_app, "GET", "/api/places")
+        assert headers["access-control-allow-origin"] == "*"
+
+        _, headers, _ = call(asgi_app, "GET", "/api/places", headers=[("Origin", "http://localhost:3000")])
+        assert headers["access-control-allow-origin"] == "http://localhost:3000"
+        assert headers["vary"] == "Origin"
+
+
+class TestFallback:
+    """Las demás rutas las atiende la aplicación Flask"""
+
+    def test_post_goes_to_flask(self, asgi_app, test_place, auth_headers):
+        """POST /api/places/<id>/comments se atiende con Flask"""
+        body = b"text=Muy+rico&rating=4"
+        headers = [("Content-Type", "application/x-www-form-urlencoded"), ("Content-Length", str(len(body)))]
+        headers += list(auth_headers.items())
+
+        status, _, data = call(asgi_app, "POST", f"/api/places/{test_place.id}/comments", body=body, headers=headers)
+
+        assert status == 201
+        assert "id" in data
+
+        _, _, comments = call(asgi_app, "GET", f"/api/places/{test_place.id}/comments")
+        assert [c["text"] for c in comments] == ["Muy rico"]
+
+    def test_other_get_goes_to_flask(self, asgi_app):
+        """Un GET fuera de las rutas asíncronas se atiende con Flask"""
+        status, _, data = call(asgi_app, "GET", "/swagger.json")
+
+        assert status == 200
+        assert "/api/places" in data["paths"]
+
+    def test_flask_requests_run_in_parallel(self):
+        """Cada petición delegada a Flask corre en su propio hilo"""
+        threads = set()
+
+        def slow_wsgi(environ, start_response):
+            threads.add(threading.get_ident())
+            time.sleep(0.2)
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"ok"]
+
+        adapter = ThreadedWsgiToAsgi(slow_wsgi)
+
+        async def run():
+            async def request():
+                sent = []
+                messages = [{"type": "http.request", "body": b""}]
+
+                async def receive():
+                    return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+                async def send(message):
+                    sent.append(message)
+
+                scope = {"type": "http", "method": "GET", "path": "/", "root_path": "", "query_string": b"",
+                         "headers": [], "http_version": "1.1", "scheme": "http", "server": ("testserver", 80)}
+                await adapter(scope, receive, send)
+                return sent[0]["status"]
+
+            return await asyncio.gather(*(request() for _ in range(4)))
+
+        started = time.perf_counter()
+        statuses = asyncio.run(run())
+
+        assert statuses == [200] * 4
+        assert len(threads) == 4
+        assert time.perf_counter() - started < 0.6
+
+    def test_lifespan_disposes_engine(self, asgi_app):
+        """El apagado del servidor cierra el engine asíncrono"""
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(asgi_app({"type": "lifespan"}, receive, send))
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+class TestUvicorn:
+    """El modo ASGI servido por uvicorn"""
+
+    def test_serves_over_http(self, app, test_place):
+        """Las lecturas asíncronas y las rutas de Flask responden por HTTP"""
+        uvicorn = pytest.importorskip("uvicorn")
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(create_asgi_app(app), lifespan="on", log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]})
+        thread.start()
+        try:
+            deadline = time.monotonic() + 10
+            while not server.started and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            def get(path):
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+                    return response.status, json.loads(response.read())
+
+            places_status, places = get("/api/places")
+            docs_status, docs = get("/swagger.json")
+        finally:
+            server.should_exit = True
+            thread.join(10)
+            sock.close()
+
+        assert places_status == 200
+        assert [p["id"] for p in places] == [test_place.id]
+        assert docs_status == 200 and "/api/places" in docs["paths"]
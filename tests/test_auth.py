@@ -365,3 +365,20 @@ class TestAuthEdgeCases:
         # Depende si se hace trim en el backend
         # Actualmente probablemente fallará
         assert response.status_code in [200, 401]
+
+
+class TestAuthQueryBudget:
+    """Presupuesto de consultas SQL de autenticación"""
+
+    def test_login(self, client, test_user, assert_max_queries):
+        """Iniciar sesión busca al usuario una sola vez"""
+        with assert_max_queries(1):
+            response = client.post("/api/login", data={"email": "testuser@alumnos.udg.mx", "password": "password123"})
+        assert response.status_code == 200
+
+    def test_register(self, client, assert_max_queries):
+        """Registrar verifica el correo e inserta el usuario"""
+        with assert_max_queries(2):
+            response = client.post("/api/register", data={"name": "Nuevo", "email": "nuevo@alumnos.udg.mx",
+                                                          "password": "password123"})
+        assert response.status_code == 201
@@ -112,7 +112,7 @@ class TestGetComments:
 class TestPostComment:
     """Tests para POST /api/places/<place_id>/comments"""
 
-    def test_post_comment_success(self, client, test_place, test_user):
+    def test_post_comment_success(self, client, test_place, test_user, auth_headers):
         """Crea exitosamente un comentario"""
         data = {
             'place_id': test_place.id,
@@ -123,7 +123,8 @@ class TestPostComment:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
@@ -136,7 +137,7 @@ class TestPostComment:
             assert comment.text == 'Excelente servicio'
             assert comment.rating == 5
 
-    def test_post_comment_place_not_found(self, client, test_user):
+    def test_post_comment_place_not_found(self, client, test_user, auth_headers):
         """Retorna 404 si el lugar no existe"""
         data = {
             'place_id': 'nonexistent',
@@ -147,12 +148,13 @@ class TestPostComment:
         
         response = client.post(
             "/api/places/nonexistent/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 404
 
-    def test_post_comment_missing_text(self, client, test_place, test_user):
+    def test_post_comment_missing_text(self, client, test_place, test_user, auth_headers):
         """Valida que crear comentario sin texto falla"""
         data = {
             'place_id': test_place.id,
@@ -162,13 +164,14 @@ class TestPostComment:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         # No debe ser creado exitosamente
         assert response.status_code != 201
 
-    def test_post_comment_with_default_rating(self, client, test_place, test_user):
+    def test_post_comment_with_default_rating(self, client, test_place, test_user, auth_headers):
         """Usa rating 0 por defecto si no se proporciona"""
         data = {
             'place_id': test_place.id,
@@ -178,7 +181,8 @@ class TestPostComment:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
@@ -187,7 +191,7 @@ class TestPostComment:
             comment = db.session.get(Comment, response.json['id'])
             assert comment.rating == 0
 
-    def test_post_comment_updates_place_rating(self, client, test_place, test_user):
+    def test_post_comment_updates_place_rating(self, client, test_place, test_user, auth_headers):
         """Verifica que agregar comentario actualiza el rating del lugar"""
         # Agregar comentario con rating 5
         data = {
@@ -199,7 +203,8 @@ class TestPostComment:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
@@ -209,7 +214,7 @@ class TestPostComment:
             place = db.session.get(Place, test_place.id)
             assert place.num_ratings == 1
 
-    def test_post_comment_with_special_characters(self, client, test_place, test_user):
+    def test_post_comment_with_special_characters(self, client, test_place, test_user, auth_headers):
         """Maneja caracteres especiales en el texto del comentario"""
         data = {
             'place_id': test_place.id,
@@ -220,12 +225,13 @@ class TestPostComment:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
 
-    def test_post_comment_returns_id(self, client, test_place, test_user):
+    def test_post_comment_returns_id(self, client, test_place, test_user, auth_headers):
         """Verifica que retorna un ID válido"""
         data = {
             'place_id': test_place.id,
@@ -236,7 +242,8 @@ class TestPostComment:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
@@ -248,7 +255,7 @@ class TestPostComment:
 class TestPutComment:
     """Tests para PUT /api/comments/<comment_id>"""
 
-    def test_put_comment_success(self, client, test_comment):
+    def test_put_comment_success(self, client, test_comment, auth_headers):
         """Actualiza exitosamente un comentario"""
         update_data = {
             'text': 'Texto actualizado',
@@ -257,7 +264,8 @@ class TestPutComment:
         
         response = client.put(
             f"/api/comments/{test_comment.id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         
         assert response.status_code == 200
@@ -269,7 +277,7 @@ class TestPutComment:
             assert comment.text == 'Texto actualizado'
             assert comment.rating == 4
 
-    def test_put_comment_not_found(self, client):
+    def test_put_comment_not_found(self, client, auth_headers):
         """Retorna 404 si el comentario no existe"""
         update_data = {
             'text': 'Texto',
@@ -278,12 +286,13 @@ class TestPutComment:
         
         response = client.put(
             "/api/comments/nonexistent",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         
         assert response.status_code == 404
 
-    def test_put_comment_partial_update(self, client, test_comment):
+    def test_put_comment_partial_update(self, client, test_comment, auth_headers):
         """Actualiza solo el texto sin modificar el rating"""
         original_rating = 5
         with client.application.app_context():
@@ -297,7 +306,8 @@ class TestPutComment:
         
         response = client.put(
             f"/api/comments/{test_comment.id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         
         assert response.status_code == 200
@@ -307,7 +317,7 @@ class TestPutComment:
             assert comment.text == 'Solo texto nuevo'
             assert comment.rating == original_rating
 
-    def test_put_comment_only_rating(self, client, test_comment):
+    def test_put_comment_only_rating(self, client, test_comment, auth_headers):
         """Actualiza solo el rating sin modificar el texto"""
         original_text = "Texto original"
         with client.application.app_context():
@@ -321,7 +331,8 @@ class TestPutComment:
         
         response = client.put(
             f"/api/comments/{test_comment.id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         
         assert response.status_code == 200
@@ -331,16 +342,17 @@ class TestPutComment:
             assert comment.text == original_text
             assert comment.rating == 2
 
-    def test_put_comment_updates_place_rating(self, client, test_comment):
+    def test_put_comment_updates_place_rating(self, client, test_comment, auth_headers):
         """Verificar que actualizar comentario recalcula el rating del lugar"""
         response = client.put(
             f"/api/comments/{test_comment.id}",
-            json={'rating': 3}
+            json={'rating': 3},
+            headers=auth_headers
         )
         
         assert response.status_code == 200
 
-    def test_put_comment_with_special_characters(self, client, test_comment):
+    def test_put_comment_with_special_characters(self, client, test_comment, auth_headers):
         """Maneja caracteres especiales al actualizar"""
         update_data = {
             'text': 'Actualizado con ñ, acentos: á é í ó ú',
@@ -349,18 +361,20 @@ class TestPutComment:
         
         response = client.put(
             f"/api/comments/{test_comment.id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         
         assert response.status_code == 200
 
-    def test_put_comment_empty_update(self, client, test_comment):
+    def test_put_comment_empty_update(self, client, test_comment, auth_headers):
         """Maneja actualización vacía correctamente"""
         update_data = {}
         
         response = client.put(
             f"/api/comments/{test_comment.id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         
         # Debe ser exitosa o retornar error específico
@@ -370,9 +384,9 @@ class TestPutComment:
 class TestDeleteComment:
     """Tests para DELETE /api/comments/<comment_id>"""
 
-    def test_delete_comment_success(self, client, test_comment):
+    def test_delete_comment_success(self, client, test_comment, auth_headers):
         """Elimina exitosamente un comentario"""
-        response = client.delete(f"/api/comments/{test_comment.id}")
+        response = client.delete(f"/api/comments/{test_comment.id}", headers=auth_headers)
         
         assert response.status_code == 200
         assert 'message' in response.json
@@ -382,17 +396,17 @@ class TestDeleteComment:
             comment = db.session.get(Comment, test_comment.id)
             assert comment is None
 
-    def test_delete_comment_not_found(self, client):
+    def test_delete_comment_not_found(self, client, auth_headers):
         """Retorna 404 si el comentario no existe"""
-        response = client.delete("/api/comments/nonexistent")
+        response = client.delete("/api/comments/nonexistent", headers=auth_headers)
         
         assert response.status_code == 404
 
-    def test_delete_comment_updates_place_rating(self, client, test_comment, test_place):
+    def test_delete_comment_updates_place_rating(self, client, test_comment, test_place, auth_headers):
         """Verificar que eliminar comentario recalcula el rating del lugar"""
         place_id = test_comment.place_id
         
-        response = client.delete(f"/api/comments/{test_comment.id}")
+        response = client.delete(f"/api/comments/{test_comment.id}", headers=auth_headers)
         
         assert response.status_code == 200
         
@@ -401,7 +415,7 @@ class TestDeleteComment:
             place = db.session.get(Place, place_id)
             assert place is not None
 
-    def test_delete_multiple_comments(self, client, test_place, test_user):
+    def test_delete_multiple_comments(self, client, test_place, test_user, auth_headers):
         """Elimina múltiples comentarios correctamente"""
         # Crear 3 comentarios
         comment_ids = []
@@ -419,7 +433,7 @@ class TestDeleteComment:
 
         # Eliminar los primeros 2
         for cid in comment_ids[:2]:
-            response = client.delete(f"/api/comments/{cid}")
+            response = client.delete(f"/api/comments/{cid}", headers=auth_headers)
             assert response.status_code == 200
 
         # Verificar que el tercero sigue existiendo
@@ -427,9 +441,9 @@ class TestDeleteComment:
             comment = db.session.get(Comment, comment_ids[2])
             assert comment is not None
 
-    def test_delete_comment_response_message(self, client, test_comment):
+    def test_delete_comment_response_message(self, client, test_comment, auth_headers):
         """Verifica que el mensaje de respuesta es correcto"""
-        response = client.delete(f"/api/comments/{test_comment.id}")
+        response = client.delete(f"/api/comments/{test_comment.id}", headers=auth_headers)
         
         assert response.status_code == 200
         assert 'message' in response.json
@@ -439,7 +453,7 @@ class TestDeleteComment:
 class TestCommentsIntegration:
     """Tests de integración para flujos completos"""
 
-    def test_full_comment_lifecycle(self, client, test_place, test_user):
+    def test_full_comment_lifecycle(self, client, test_place, test_user, auth_headers):
         """Prueba el ciclo completo: crear → leer → actualizar → eliminar"""
         # 1. Crear comentario
         create_data = {
@@ -450,7 +464,8 @@ class TestCommentsIntegration:
         }
         create_response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=create_data
+            data=create_data,
+            headers=auth_headers
         )
         assert create_response.status_code == 201
         comment_id = create_response.json['id']
@@ -468,7 +483,8 @@ class TestCommentsIntegration:
         }
         put_response = client.put(
             f"/api/comments/{comment_id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         assert put_response.status_code == 200
 
@@ -478,14 +494,14 @@ class TestCommentsIntegration:
         assert get_response2.json[0]['rating'] == 5
 
         # 5. Eliminar comentario
-        delete_response = client.delete(f"/api/comments/{comment_id}")
+        delete_response = client.delete(f"/api/comments/{comment_id}", headers=auth_headers)
         assert delete_response.status_code == 200
 
         # 6. Verificar eliminación
         get_response3 = client.get(f"/api/places/{test_place.id}/comments")
         assert len(get_response3.json) == 0
 
-    def test_multiple_comments_handling(self, client, test_place, test_user):
+    def test_multiple_comments_handling(self, client, test_place, test_user, auth_headers):
         """Prueba manejo de múltiples comentarios del mismo lugar"""
         # Crear 3 comentarios
         comment_ids = []
@@ -498,7 +514,8 @@ class TestCommentsIntegration:
             }
             response = client.post(
                 f"/api/places/{test_place.id}/comments",
-                data=data
+                data=data,
+                headers=auth_headers
             )
             assert response.status_code == 201
             comment_ids.append(response.json['id'])
@@ -508,14 +525,14 @@ class TestCommentsIntegration:
         assert len(get_response.json) == 3
 
         # Eliminar el del medio
-        delete_response = client.delete(f"/api/comments/{comment_ids[1]}")
+        delete_response = client.delete(f"/api/comments/{comment_ids[1]}", headers=auth_headers)
         assert delete_response.status_code == 200
 
         # Verificar que quedan 2
         get_response2 = client.get(f"/api/places/{test_place.id}/comments")
         assert len(get_response2.json) == 2
 
-    def test_comments_isolated_by_place(self, client, test_user):
+    def test_comments_isolated_by_place(self, client, test_user, auth_headers):
         """Verifica que comentarios están aislados por lugar"""
         # Crear 2 lugares
         with client.application.app_context():
@@ -544,7 +561,7 @@ class TestCommentsIntegration:
                 'text': f'Comentario lugar 1 - {i}',
                 'rating': str(i+1)
             }
-            client.post(f"/api/places/{place1_id}/comments", data=data)
+            client.post(f"/api/places/{place1_id}/comments", data=data, headers=auth_headers)
 
         # Agregar comentario a lugar 2
         data = {
@@ -553,7 +570,7 @@ class TestCommentsIntegration:
             'text': 'Comentario lugar 2',
             'rating': '5'
         }
-        client.post(f"/api/places/{place2_id}/comments", data=data)
+        client.post(f"/api/places/{place2_id}/comments", data=data, headers=auth_headers)
 
         # Verificar que cada lugar tiene sus comentarios
         response1 = client.get(f"/api/places/{place1_id}/comments")
@@ -562,18 +579,19 @@ class TestCommentsIntegration:
         assert len(response1.json) == 2
         assert len(response2.json) == 1
 
-    def test_comment_update_then_delete(self, client, test_comment):
+    def test_comment_update_then_delete(self, client, test_comment, auth_headers):
         """Actualiza un comentario y luego lo elimina"""
         # Actualizar
         update_data = {'text': 'Actualizado', 'rating': 4}
         put_response = client.put(
             f"/api/comments/{test_comment.id}",
-            json=update_data
+            json=update_data,
+            headers=auth_headers
         )
         assert put_response.status_code == 200
 
         # Eliminar
-        delete_response = client.delete(f"/api/comments/{test_comment.id}")
+        delete_response = client.delete(f"/api/comments/{test_comment.id}", headers=auth_headers)
         assert delete_response.status_code == 200
 
         # Verificar eliminación
@@ -585,7 +603,7 @@ class TestCommentsIntegration:
 class TestCommentsEdgeCases:
     """Tests de casos límite y validaciones"""
 
-    def test_comment_with_very_long_text(self, client, test_place, test_user):
+    def test_comment_with_very_long_text(self, client, test_place, test_user, auth_headers):
         """Maneja comentarios con texto muy largo"""
         long_text = "a" * 5000
         data = {
@@ -597,12 +615,13 @@ class TestCommentsEdgeCases:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
 
-    def test_comment_with_zero_rating(self, client, test_place, test_user):
+    def test_comment_with_zero_rating(self, client, test_place, test_user, auth_headers):
         """Permite rating de 0"""
         data = {
             'place_id': test_place.id,
@@ -613,7 +632,8 @@ class TestCommentsEdgeCases:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
@@ -621,7 +641,7 @@ class TestCommentsEdgeCases:
             comment = db.session.get(Comment, response.json['id'])
             assert comment.rating == 0
 
-    def test_comment_with_high_rating(self, client, test_place, test_user):
+    def test_comment_with_high_rating(self, client, test_place, test_user, auth_headers):
         """Permite ratings altos"""
         data = {
             'place_id': test_place.id,
@@ -632,7 +652,8 @@ class TestCommentsEdgeCases:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
@@ -640,7 +661,7 @@ class TestCommentsEdgeCases:
             comment = db.session.get(Comment, response.json['id'])
             assert comment.rating == 10
 
-    def test_comment_with_unicode_characters(self, client, test_place, test_user):
+    def test_comment_with_unicode_characters(self, client, test_place, test_user, auth_headers):
         """Maneja caracteres Unicode correctamente"""
         unicode_text = "Emoji: 🍕 🍔 Caracteres: 中文 العربية עברית"
         data = {
@@ -652,12 +673,13 @@ class TestCommentsEdgeCases:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
 
-    def test_comment_id_uniqueness(self, client, test_place, test_user):
+    def test_comment_id_uniqueness(self, client, test_place, test_user, auth_headers):
         """Verifica que cada comentario tiene ID único"""
         ids = set()
         for i in range(3):
@@ -669,14 +691,15 @@ class TestCommentsEdgeCases:
             }
             response = client.post(
                 f"/api/places/{test_place.id}/comments",
-                data=data
+                data=data,
+                headers=auth_headers
             )
             assert response.status_code == 201
             ids.add(response.json['id'])
 
         assert len(ids) == 3  # Todos los IDs son diferentes
 
-    def test_comment_whitespace_handling(self, client, test_place, test_user):
+    def test_comment_whitespace_handling(self, client, test_place, test_user, auth_headers):
         """Maneja espacios en blanco en el texto"""
         data = {
             'place_id': test_place.id,
@@ -687,7 +710,31 @@ class TestCommentsEdgeCases:
         
         response = client.post(
             f"/api/places/{test_place.id}/comments",
-            data=data
+            data=data,
+            headers=auth_headers
         )
         
         assert response.status_code == 201
+
+
+class TestCommentsQueryBudget:
+    """Presupuesto de consultas SQL por endpoint de comentarios"""
+
+    def test_list(self, client, test_comment, assert_max_queries):
+        """Los comentarios y sus autores no dependen del número de comentarios"""
+        with assert_max_queries(3):
+            response = client.get(f"/api/places/{test_comment.place_id}/comments")
+        assert response.status_code == 200
+
+    def test_create(self, client, test_place, auth_headers, assert_max_queries):
+        """Crear un comentario actualiza la calificación del lugar"""
+        with assert_max_queries(6):
+            response = client.post(f"/api/places/{test_place.id}/comments",
+                                   data={"text": "Muy bueno", "rating": 4}, headers=auth_headers)
+        assert response.status_code == 201
+
+    def test_delete(self, client, test_comment, auth_headers, assert_max_queries):
+        """Eliminar un comentario actualiza la calificación del lugar"""
+        with assert_max_queries(6):
+            response = client.delete(f"/api/comments/{test_comment.id}", headers=auth_headers)
+        assert response.status_code == 200
@@ -0,0 +1,132 @@
+"""
+Tests unitarios para app.datagen
+
+Prueba el generador de datos sintéticos:
+- generate_dataset(users, places, comments, seed, zipf, batch_size)
+- zipf_cum_weights
+- flask generate-data
+"""
+import pytest
+from sqlalchemy import delete, func, select
+from app.config import Config
+from app.datagen import DEFAULT_PASSWORD, generate_dataset, user_email, zipf_cum_weights
+from app.db.models import db, User, Place, MenuItem, Comment
+
+
+@pytest.fixture(autouse=True)
+def inline_hashing(monkeypatch):
+    """El hash de la contraseña común se calcula en el hilo del test"""
+    monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+
+def snapshot():
+    """Filas generadas, ordenadas, para comparar dos ejecuciones"""
+    return (
+        db.session.execute(select(User.id, User.email).order_by(User.id)).all(),
+        db.session.execute(select(Place.id, Place.name, Place.schedule, Place.rating).order_by(Place.id)).all(),
+        db.session.execute(select(Comment.id, Comment.place_id, Comment.user_id, Comment.rating).order_by(Comment.id)).all(),
+    )
+
+
+class TestGenerateDataset:
+    """Tests para generate_dataset"""
+
+    def test_creates_requested_rows(self, app):
+        """Crea los usuarios, lugares y comentarios pedidos"""
+        report = generate_dataset(users=10, places=5, comments=300, seed=1, batch_size=64)
+
+        assert report["users"] == db.session.scalar(select(func.count()).select_from(User)) == 10
+        assert report["places"] == db.session.scalar(select(func.count()).select_from(Place)) == 5
+        assert report["comments"] == db.session.scalar(select(func.count()).select_from(Comment)) == 300
+        assert report["menu_items"] == db.session.scalar(select(func.count()).select_from(MenuItem))
+        assert report["comments_per_second"] > 0
+
+    def test_place_ratings_match_comments(self, app):
+        """La calificación de cada lugar es el promedio de sus comentarios"""
+        generate_dataset(users=5, places=4, comments=200, seed=2)
+
+        averages = dict(db.session.execute(
+            select(Comment.place_id, func.avg(Comment.rating)).group_by(Comment.place_id)
+        ).all())
+        for place in db.session.scalars(select(Place)):
+            assert place.num_ratings == db.session.scalar(
+                select(func.count()).where(Comment.place_id == place.id)
+            )
+            assert place.rating == pytest.approx(averages.get(place.id, 0.0))
+
+    def test_comments_follow_zipf(self, app):
+        """Unos pocos lugares concentran la mayoría de los comentarios"""
+        generate_dataset(users=5, places=20, comments=2000, seed=3)
+
+        counts = sorted(db.session.scalars(select(Place.num_ratings)), reverse=True)
+
+        assert counts[0] > 2000 * 0.2
+        assert sum(counts[:4]) > sum(counts[4:])
+
+    def test_deterministic(self, app):
+        """La misma semilla genera exactamente los mismos datos"""
+        generate_dataset(users=5, places=3, comments=50, seed=7)
+        first = snapshot()
+        for model in (Comment, MenuItem, Place, User):
+            db.session.execute(delete(model))
+        db.session.commit()
+
+        generate_dataset(users=5, places=3, comments=50, seed=7)
+
+        assert snapshot() == first
+
+    def test_realistic_places(self, app):
+        """Los lugares tienen horario semanal y menú de su categoría"""
+        generate_dataset(users=1, places=6, comments=0, seed=4)
+
+        for place in db.session.scalars(select(Place)):
+            assert len(place.schedule) == 7
+            assert place.menu_items
+            assert all(item.price > 0 for item in place.menu_items)
+
+    def test_generated_users_can_log_in(self, app, client):
+        """Los usuarios generados inician sesión con la contraseña común"""
+        generate_dataset(users=2, places=1, comments=0, seed=5)
+
+        response = client.post("/api/login", data={"email": user_email(5, 1), "password": DEFAULT_PASSWORD})
+
+        assert response.status_code == 200
+
+    def test_reused_seed(self, app):
+        """Una semilla ya usada en la base produce un error"""
+        generate_dataset(users=1, places=1, comments=0, seed=6)
+
+        with pytest.raises(ValueError):
+            generate_dataset(users=1, places=1, comments=0, seed=6)
+
+    def test_comments_need_users_and_places(self, app):
+        """Sin usuarios o lugares no puede haber comentarios"""
+        with pytest.raises(ValueError):
+            generate_dataset(users=0, places=1, comments=10)
+
+
+class TestZipfCumWeights:
+    """Tests para zipf_cum_weights"""
+
+    def test_weights(self):
+        """El elemento k pesa 1 / k^s"""
+        assert zipf_cum_weights(3, 1) == pytest.approx([1, 1.5, 1.5 + 1 / 3])
+
+
+class TestGenerateDataCommand:
+    """Tests para flask generate-data"""
+
+    def test_command(self, runner):
+        """Genera los datos y reporta el resumen"""
+        result = runner.invoke(args=["generate-data", "--users", "3", "--places", "2", "--comments", "20", "--seed", "9"])
+
+        assert result.exit_code == 0, result.output
+        assert "20 comentarios" in result.output
+
+    def test_command_error(self, runner):
+        """Los parámetros inválidos se reportan sin traza"""
+        result = runner.invoke(args=["generate-data", "--users", "0", "--comments", "5"])
+
+        assert result.exit_code != 0
+        assert "Error" in result.output
@@ -0,0 +1,151 @@
+"""
+Tests unitarios para app.exporter
+
+Prueba la exportación NDJSON:
+- export_rows(entity, since)
+- GET /api/admin/export/<entity>
+- flask export
+"""
+import pytest
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.db.models import db, Place, utcnow
+from app.exporter import export_ndjson, export_rows, parse_since
+
+
+def parse_ndjson(text):
+    """Helper para leer una respuesta NDJSON"""
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+class TestParseSince:
+    """Tests para parse_since"""
+
+    def test_parse_since_empty(self):
+        """Retorna None si no se especifica"""
+        assert parse_since(None) is None
+        assert parse_since("") is None
+
+    def test_parse_since_normalizes_to_utc(self):
+        """Convierte fechas con zona horaria a UTC"""
+        assert parse_since("2024-01-01T06:00:00-06:00") == datetime(2024, 1, 1, 12, 0)
+        assert parse_since("2024-01-01T12:00:00Z") == datetime(2024, 1, 1, 12, 0)
+
+    def test_parse_since_invalid(self):
+        """Rechaza fechas inválidas"""
+        with pytest.raises(ValueError):
+            parse_since("ayer")
+
+
+class TestExportRows:
+    """Tests para export_rows y export_ndjson"""
+
+    def test_export_places(self, app, test_place_with_menu):
+        """Exporta los lugares con sus marcas de tiempo"""
+        rows = list(export_rows("places"))
+
+        assert len(rows) == 1
+        assert rows[0]["id"] == test_place_with_menu.id
+        assert rows[0]["schedule"] == {"lunes": "08:00-22:00"}
+        assert rows[0]["updated_at"] is not None
+
+    def test_export_users_excludes_password(self, app, test_user):
+        """Nunca exporta el hash de la contraseña"""
+        rows = list(export_rows("users"))
+
+        assert rows[0]["email"] == "testuser@alumnos.udg.mx"
+        assert "password_hash" not in rows[0]
+
+    def test_export_since_filter(self, app, test_multiple_places):
+        """Filtra por fecha de modificación"""
+        old = db.session.get(Place, test_multiple_places.ids[0])
+        old.updated_at = datetime(2020, 1, 1)
+        db.session.commit()
+
+        rows = list(export_rows("places", since=datetime(2021, 1, 1)))
+
+        assert len(rows) == 2
+        assert test_multiple_places.ids[0] not in [r["id"] for r in rows]
+
+    def test_export_since_includes_rows_without_date(self, app, test_multiple_places):
+        """Las filas sin updated_at (anteriores a la columna) se incluyen siempre"""
+        db.session.execute(update(Place).where(Place.id == test_multiple_places.ids[0]).values(updated_at=None))
+        db.session.commit()
+
+        rows = list(export_rows("places", since=utcnow() + timedelta(days=1)))
+
+        assert [r["id"] for r in rows] == [test_multiple_places.ids[0]]
+
+    def test_export_ndjson_batches(self, app, test_multiple_places):
+        """Agrupa las líneas en bloques del tamaño del lote"""
+        chunks = list(export_ndjson("places", batch_size=2))
+
+        assert len(chunks) == 2
+        assert len(parse_ndjson("".join(chunks))) == 3
+
+    def test_export_unknown_entity(self, app):
+        """Rechaza entidades desconocidas"""
+        with pytest.raises(ValueError):
+            list(export_rows("passwords"))
+
+
+class TestExportEndpoint:
+    """Tests para GET /api/admin/export/<entity>"""
+
+    def test_export_requires_admin_token(self, client, admin_token):
+        """Rechaza peticiones sin token de administración"""
+        response = client.get("/api/admin/export/places")
+
+        assert response.status_code == 403
+
+    def test_export_comments(self, client, admin_token, test_comment):
+        """Exporta los comentarios como NDJSON"""
+        response = client.get("/api/admin/export/comments", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        rows = parse_ndjson(response.get_data(as_text=True))
+        assert rows[0]["id"] == test_comment.id
+        assert rows[0]["text"] == "Excelente comida"
+
+    def test_export_since_in_future(self, client, admin_token, test_place):
+        """Una exportación incremental sin cambios está vacía"""
+        since = (utcnow() + timedelta(days=1)).isoformat()
+        response = client.get(f"/api/admin/export/places?since={since}", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == ""
+
+    def test_export_invalid_since(self, client, admin_token):
+        """Retorna 400 con una fecha inválida"""
+        response = client.get("/api/admin/export/places?since=ayer", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 400
+
+    def test_export_unknown_entity(self, client, admin_token):
+        """Retorna 404 con una entidad desconocida"""
+        response = client.get("/api/admin/export/passwords", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 404
+
+
+class TestExportCommand:
+    """Tests para flask export"""
+
+    def test_export_command_to_file(self, app, runner, tmp_path, test_place_with_menu):
+        """Exporta los platillos a un archivo"""
+        path = tmp_path / "menu.ndjson"
+
+        result = runner.invoke(args=["export", "menu_items", "--output", str(path)])
+
+        assert result.exit_code == 0
+        rows = parse_ndjson(path.read_text(encoding="utf-8"))
+        assert len(rows) == 3
+        assert {r["dish_name"] for r in rows} == {"Pancakes", "Tacos", "Jugo"}
+
+    def test_export_command_invalid_since(self, app, runner):
+        """Rechaza fechas inválidas"""
+        result = runner.invoke(args=["export", "places", "--since", "ayer"])
+
+        assert result.exit_code != 0
@@ -0,0 +1,263 @@
+"""
+Tests unitarios para app.images
+
+Prueba el procesamiento de imágenes subidas:
+- variant_filename / parse_variant / image_variants
+- process_image(filename)
+- schedule_processing(filename)
+- strip_metadata(path) y el original servido
+- GET /uploads/<variante> antes de que exista
+"""
+import hashlib
+import pytest
+import os
+from io import BytesIO
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+from app.config import Config
+from app.images import image_variants, parse_variant, process_image, schedule_processing, strip_metadata, variant_filename
+from app.routes.uploads import save_upload_file
+
+
+def make_jpeg(path, size=(1200, 800)):
+    """Helper para crear un JPEG con metadatos EXIF; retorna su nombre"""
+    image = Image.new("RGB", size, (200, 80, 40))
+    exif = Image.Exif()
+    exif[0x010F] = "Camara de prueba"  # Make
+    image.save(path, format="JPEG", exif=exif)
+    return os.path.basename(path)
+
+
+class TestVariantNames:
+    """Tests para los nombres y URLs de variantes"""
+
+    def test_variant_filename(self):
+        """Reemplaza la extensión por la del formato de las variantes"""
+        assert variant_filename("foto.jpg", "sm") == "foto_sm.webp"
+        assert variant_filename("foto.backup.png", "placeholder") == "foto.backup_placeholder.webp"
+
+    def test_variant_filename_jpeg_format(self, monkeypatch):
+        """Usa la extensión jpg cuando el formato es JPEG"""
+        monkeypatch.setattr(Config, "IMAGE_VARIANT_FORMAT", "jpeg")
+
+        assert variant_filename("foto.png", "md") == "foto_md.jpg"
+
+    def test_parse_variant(self):
+        """Reconoce solo los tamaños configurados"""
+        assert parse_variant("foto_sm.webp") == ("foto", "sm")
+        assert parse_variant("mi_foto_placeholder.webp") == ("mi_foto", "placeholder")
+        assert parse_variant("mi_foto.png") is None
+        assert parse_variant("foto_xl.webp") is None
+
+    def test_image_variants_local_upload(self):
+        """Calcula las URLs de todas las variantes de un upload local"""
+        variants = image_variants("/uploads/foto.jpg")
+
+        assert variants["sm"] == "/uploads/foto_sm.webp"
+        assert set(variants) == {"sm", "md", "lg", "placeholder"}
+
+    def test_image_variants_external_url(self):
+        """No genera variantes para URLs externas o vacías"""
+        assert image_variants("https://example.com/foto.jpg") == {}
+        assert image_variants("") == {}
+        assert image_variants(None) == {}
+
+
+class TestProcessImage:
+    """Tests para process_image"""
+
+    def test_process_image_generates_variants(self, upload_folder):
+        """Genera miniaturas acotadas y el placeholder"""
+        name = make_jpeg(str(upload_folder / "foto.jpg"))
+
+        generated = process_image(name)
+
+        assert len(generated) == len(Config.IMAGE_THUMBNAIL_SIZES) + 1
+        for size, max_side in Config.IMAGE_THUMBNAIL_SIZES.items():
+            with Image.open(upload_folder / f"foto_{size}.webp") as thumb:
+                assert max(thumb.size) == max_side
+        with Image.open(upload_folder / "foto_placeholder.webp") as placeholder:
+            assert max(placeholder.size) <= 16
+
+    def test_process_image_strips_exif(self, upload_folder):
+        """Las variantes no conservan los metadatos EXIF"""
+        name = make_jpeg(str(upload_folder / "foto.jpg"))
+
+        process_image(name)
+
+        with Image.open(upload_folder / "foto_md.webp") as thumb:
+            assert len(thumb.getexif()) == 0
+
+    def test_process_image_keeps_small_images(self, upload_folder):
+        """No agranda imágenes más pequeñas que la miniatura"""
+        name = make_jpeg(str(upload_folder / "mini.jpg"), size=(100, 50))
+
+        process_image(name)
+
+        with Image.open(upload_folder / "mini_lg.webp") as thumb:
+            assert thumb.size == (100, 50)
+
+    def test_schedule_processing_invalid_image(self, upload_folder):
+        """Un archivo que no es imagen no genera variantes ni falla"""
+        path = upload_folder / "roto.png"
+        path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+
+        future = schedule_processing("roto.png")
+
+        assert future.result(timeout=10) == []
+
+    def test_schedule_processing_disabled(self, upload_folder, monkeypatch):
+        """No encola nada si el procesamiento está deshabilitado"""
+        monkeypatch.setattr(Config, "IMAGE_PROCESSING", False)
+
+        assert schedule_processing(make_jpeg(str(upload_folder / "foto.jpg"))) is None
+
+
+class TestStripMetadata:
+    """Tests para strip_metadata y el original que se sirve"""
+
+    def test_strips_jpeg_exif(self, tmp_path):
+        """Quita el EXIF (incluida la ubicación GPS) de un JPEG"""
+        path = tmp_path / "foto.jpg"
+        image = Image.new("RGB", (64, 48), (10, 120, 200))
+        exif = Image.Exif()
+        exif[0x010F] = "Camara de prueba"
+        exif.get_ifd(0x8825)[2] = (20.0, 39.0, 25.0)  # GPSLatitude
+        image.save(path, format="JPEG", exif=exif)
+
+        assert strip_metadata(str(path)) is True
+        with Image.open(path) as cleaned:
+            assert "exif" not in cleaned.info
+            assert len(cleaned.getexif()) == 0
+            assert cleaned.size == (64, 48)
+
+    def test_applies_orientation(self, tmp_path):
+        """La orientación EXIF se aplica a los píxeles antes de quitarla"""
+        path = tmp_path / "girada.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotar 90°
+        Image.new("RGB", (64, 48)).save(path, format="JPEG", exif=exif)
+
+        strip_metadata(str(path))
+
+        with Image.open(path) as cleaned:
+            assert cleaned.size == (48, 64)
+            assert len(cleaned.getexif()) == 0
+
+    def test_untouched_without_metadata(self, tmp_path):
+        """Las imágenes sin metadatos y los archivos inválidos no se modifican"""
+        clean = tmp_path / "limpia.png"
+        Image.new("RGB", (8, 8)).save(clean, format="PNG")
+        broken = tmp_path / "rota.png"
+        broken.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+        before = clean.read_bytes()
+
+        assert strip_metadata(str(clean)) is False
+        assert strip_metadata(str(broken)) is False
+        assert clean.read_bytes() == before
+
+    def test_served_original_has_no_exif(self, client, upload_folder):
+        """El original subido se sirve sin EXIF"""
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "Camara de prueba"
+        Image.new("RGB", (64, 48)).save(buffer, format="JPEG", exif=exif)
+        file = FileStorage(stream=BytesIO(buffer.getvalue()), filename="foto.jpg")
+
+        url = save_upload_file(file)
+        response = client.get(url)
+
+        assert response.status_code == 200
+        with Image.open(BytesIO(response.data)) as served:
+            assert len(served.getexif()) == 0
+
+    def test_url_hash_matches_stored_bytes(self, client, upload_folder):
+        """El nombre del original es el hash de los bytes sin EXIF que se sirven"""
+        buffer = BytesIO()
+        exif = Image.Exif()
+        exif[0x010F] = "Camara de prueba"
+        Image.new("RGB", (64, 48)).save(buffer, format="JPEG", exif=exif)
+        file = FileStorage(stream=BytesIO(buffer.getvalue()), filename="foto.jpg")
+
+        url = save_upload_file(file)
+        served = client.get(url).data
+
+        assert url == f"/uploads/{hashlib.sha256(served).hexdigest()}.jpg"
+        assert hashlib.sha256(buffer.getvalue()).hexdigest() not in url
+
+    def test_rejects_decompression_bomb(self, upload_folder, monkeypatch):
+        """Una imagen con demasiados píxeles se rechaza sin dejar temporales"""
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48)).save(buffer, format="PNG")
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+        file = FileStorage(stream=BytesIO(buffer.getvalue()), filename="bomba.png")
+
+        with pytest.raises(RequestEntityTooLarge):
+            save_upload_file(file)
+        assert os.listdir(upload_folder) == []
+
+
+class TestVariantEndpoint:
+    """Tests para GET /uploads/<variante>"""
+
+    def test_get_variant_falls_back_to_original(self, client, upload_folder, monkeypatch):
+        """Sirve el original mientras la variante no existe"""
+        monkeypatch.setattr(Config, "IMAGE_PROCESSING", False)
+        make_jpeg(str(upload_folder / "foto.jpg"))
+
+        response = client.get("/uploads/foto_sm.webp")
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/jpeg"
+        assert response.headers["Cache-Control"] == "no-cache"
+
+    def test_get_variant_after_processing(self, client, upload_folder):
+        """Sirve la variante una vez generada"""
+        process_image(make_jpeg(str(upload_folder / "foto.jpg")))
+
+        response = client.get("/uploads/foto_sm.webp")
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/webp"
+
+    def test_get_variant_without_original(self, client, upload_folder):
+        """Retorna 404 si no existe ni la variante ni el original"""
+        response = client.get("/uploads/nada_sm.webp")
+
+        assert response.status_code == 404
+
+    def test_upload_returns_before_processing(self, client, upload_folder):
+        """Las variantes se generan en segundo plano tras guardar el original"""
+        buffer = BytesIO()
+        Image.new("RGB", (640, 480)).save(buffer, format="PNG")
+        file = FileStorage(stream=BytesIO(buffer.getvalue()), filename="local.png")
+
+        url = save_upload_file(file)
+
+        assert url.endswith(".png")
+        assert client.get(image_variants(url)["md"]).status_code == 200
+
+
+class TestPlaceThumbnails:
+    """Tests para las miniaturas en las respuestas de lugares"""
+
+    def test_place_detail_includes_thumbnails(self, client, app):
+        """El detalle del lugar incluye las URLs de las miniaturas"""
+        from app.db.models import db, Place
+
+        with app.app_context():
+            place = Place(name="Con foto", schedule={}, category="Snacks", image_url="/uploads/foto.png")
+            db.session.add(place)
+            db.session.commit()
+            place_id = place.id
+
+        response = client.get(f"/api/places/{place_id}")
+
+        assert response.json["thumbnails"]["sm"] == "/uploads/foto_sm.webp"
+
+    def test_place_list_external_image(self, client, test_place):
+        """Los lugares con imagen externa no tienen miniaturas"""
+        response = client.get("/api/places")
+
+        assert response.json[0]["thumbnails"] == {}
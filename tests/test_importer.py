@@ -0,0 +1,234 @@
+"""
+Tests unitarios para app.importer
+
+Prueba la importación masiva del catálogo:
+- import_catalog(stream, fmt)
+- POST /api/admin/import
+- flask import-catalog
+"""
+import pytest
+import io
+import json
+from app.db.models import db, Place, MenuItem
+from app import importer
+from app.importer import detect_format, import_catalog, validate_record, validate_records
+
+
+CSV_CATALOG = (
+    "name,category,schedule,image_url,menu_category,dish_name,price\n"
+    'Tacos Don Pepe,Desayunos y Comidas,"{""lunes"": ""08:00-16:00""}",,Comidas,Taco,15\n'
+    "Tacos Don Pepe,Desayunos y Comidas,,,Bebidas,Agua,12.5\n"
+    "Café Central,Bebidas y Cafetería,,,Bebidas,Americano,25\n"
+    "Café Central,Bebidas y Cafetería,,,Bebidas,Latte,caro\n"
+    ",Snacks,,,,,\n"
+)
+
+
+def jsonl(*records):
+    """Helper para construir un archivo JSONL"""
+    return io.StringIO("\n".join(json.dumps(r) for r in records) + "\n")
+
+
+class TestValidateRecord:
+    """Tests para validate_record"""
+
+    def test_validate_record_success(self):
+        """Normaliza un lugar válido"""
+        place, menu, errors = validate_record(1, {
+            "name": " Snack Bar ",
+            "category": "Snacks",
+            "schedule": '{"lunes": "09:00-21:00"}',
+            "menu": [{"category": "Snacks", "dish_name": "Papas", "price": "20"}]
+        })
+
+        assert errors == []
+        assert place["name"] == "Snack Bar"
+        assert place["schedule"] == {"lunes": "09:00-21:00"}
+        assert menu == [{"category": "Snacks", "dish_name": "Papas", "price": 20.0}]
+
+    def test_validate_record_missing_name(self):
+        """Rechaza lugares sin nombre"""
+        place, menu, errors = validate_record(3, {"category": "Snacks"})
+
+        assert place is None
+        assert errors[0]["row"] == 3
+        assert "name" in errors[0]["error"]
+
+    def test_validate_record_invalid_schedule(self):
+        """Rechaza horarios que no son JSON"""
+        place, _, errors = validate_record(1, {"name": "X", "category": "Snacks", "schedule": "{no"})
+
+        assert place is None
+        assert "schedule" in errors[0]["error"]
+
+    def test_validate_record_skips_invalid_menu_items(self):
+        """Descarta solo los platillos inválidos"""
+        place, menu, errors = validate_record(1, {
+            "name": "X",
+            "category": "Snacks",
+            "menu": [
+                {"category": "A", "dish_name": "Ok", "price": 1},
+                {"category": "A", "dish_name": "Negativo", "price": -1},
+                {"category": "A", "price": 1}
+            ]
+        })
+
+        assert place is not None
+        assert len(menu) == 1
+        assert len(errors) == 2
+
+    def test_validate_record_rejects_non_finite_prices(self):
+        """NaN e infinito no son precios válidos"""
+        _, menu, errors = validate_record(1, {
+            "name": "X",
+            "category": "Snacks",
+            "menu": [
+                {"category": "A", "dish_name": "Nan", "price": "nan"},
+                {"category": "A", "dish_name": "Inf", "price": float("inf")},
+                {"category": "A", "dish_name": "Ok", "price": "12.5"}
+            ]
+        })
+
+        assert [item["dish_name"] for item in menu] == ["Ok"]
+        assert all("finito" in e["error"] for e in errors) and len(errors) == 2
+
+    def test_validate_records_process_pool(self, monkeypatch):
+        """Valida en un pool de procesos creados con spawn conservando el orden"""
+        contexts = []
+        pool = importer.ProcessPoolExecutor
+
+        def spy(*args, **kwargs):
+            contexts.append(kwargs["mp_context"].get_start_method())
+            return pool(*args, **kwargs)
+
+        monkeypatch.setattr(importer, "ProcessPoolExecutor", spy)
+        records = [(i, {"name": f"Lugar {i}", "category": "Snacks"}) for i in range(1, 51)]
+
+        results = validate_records(records, workers=2, chunk_size=10)
+
+        assert [place["name"] for place, _, _ in results] == [f"Lugar {i}" for i in range(1, 51)]
+        assert contexts == ["spawn"]
+
+
+class TestImportCatalog:
+    """Tests para import_catalog"""
+
+    def test_detect_format(self):
+        """Deduce el formato por extensión"""
+        assert detect_format("catalogo.csv") == "csv"
+        assert detect_format("catalogo.jsonl") == "jsonl"
+        with pytest.raises(ValueError):
+            detect_format("catalogo.xlsx")
+
+    def test_import_jsonl(self, app):
+        """Importa lugares y menús desde JSONL"""
+        stream = jsonl(
+            {"name": "Lugar A", "category": "Snacks", "menu": [
+                {"category": "Snacks", "dish_name": "Papas", "price": 20},
+                {"category": "Bebidas", "dish_name": "Refresco", "price": 18}
+            ]},
+            {"name": "Lugar B", "category": "Bebidas y Cafetería", "schedule": {"lunes": "07:00-14:00"}}
+        )
+
+        report = import_catalog(stream, "jsonl", workers=1)
+
+        assert report["places"] == 2
+        assert report["menu_items"] == 2
+        assert report["errors"] == []
+        assert db.session.query(Place).count() == 2
+        assert db.session.query(MenuItem).count() == 2
+
+    def test_import_jsonl_reports_invalid_lines(self, app):
+        """Reporta líneas con JSON inválido sin abortar la importación"""
+        stream = io.StringIO('{"name": "Ok", "category": "Snacks"}\n{roto\n[1, 2]\n')
+
+        report = import_catalog(stream, "jsonl", workers=1)
+
+        assert report["rows"] == 3
+        assert report["places"] == 1
+        assert [e["row"] for e in report["errors"]] == [2, 3]
+
+    def test_import_csv_groups_menu_rows(self, app):
+        """Agrupa las filas de CSV por lugar y reporta filas inválidas"""
+        report = import_catalog(io.StringIO(CSV_CATALOG), "csv", workers=1)
+
+        assert report["rows"] == 5
+        assert report["places"] == 2
+        assert report["menu_items"] == 3
+        assert [e["row"] for e in report["errors"]] == [5, 6]
+
+        place = db.session.query(Place).filter(Place.name == "Tacos Don Pepe").one()
+        assert place.schedule == {"lunes": "08:00-16:00"}
+        assert len(place.menu_items) == 2
+
+    def test_import_small_batches(self, app):
+        """Inserta correctamente usando varios lotes"""
+        stream = jsonl(*[
+            {"name": f"Lugar {i}", "category": "Snacks", "menu": [{"category": "S", "dish_name": "P", "price": 1}]}
+            for i in range(25)
+        ])
+
+        report = import_catalog(stream, "jsonl", workers=1, batch_size=7)
+
+        assert report["places"] == 25
+        assert db.session.query(MenuItem).count() == 25
+        assert report["rows_per_second"] > 0
+
+
+class TestImportEndpoint:
+    """Tests para POST /api/admin/import"""
+
+    def test_import_requires_admin_token(self, client, admin_token):
+        """Rechaza peticiones sin token de administración"""
+        response = client.post("/api/admin/import", data={
+            "file": (io.BytesIO(b""), "catalogo.jsonl")
+        }, content_type="multipart/form-data")
+
+        assert response.status_code == 403
+
+    def test_import_disabled_without_config(self, client):
+        """Los endpoints de administración están deshabilitados sin ADMIN_TOKEN"""
+        response = client.post("/api/admin/import", headers={"X-Admin-Token": ""})
+
+        assert response.status_code == 403
+
+    def test_import_csv_file(self, client, admin_token):
+        """Importa un archivo CSV"""
+        response = client.post("/api/admin/import", data={
+            "file": (io.BytesIO(CSV_CATALOG.encode("utf-8")), "catalogo.csv")
+        }, headers={"X-Admin-Token": admin_token}, content_type="multipart/form-data")
+
+        assert response.status_code == 200
+        assert response.json["places"] == 2
+        assert response.json["menu_items"] == 3
+        assert len(response.json["errors"]) == 2
+
+    def test_import_missing_file(self, client, admin_token):
+        """Retorna 400 si no se envía archivo"""
+        response = client.post("/api/admin/import", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 400
+
+    def test_import_unknown_format(self, client, admin_token):
+        """Retorna 400 con un formato no soportado"""
+        response = client.post("/api/admin/import", data={
+            "file": (io.BytesIO(b"x"), "catalogo.xlsx")
+        }, headers={"X-Admin-Token": admin_token}, content_type="multipart/form-data")
+
+        assert response.status_code == 400
+
+
+class TestImportCommand:
+    """Tests para flask import-catalog"""
+
+    def test_import_command(self, app, runner, tmp_path):
+        """Importa un catálogo desde la línea de comandos"""
+        path = tmp_path / "catalogo.csv"
+        path.write_text(CSV_CATALOG, encoding="utf-8")
+
+        result = runner.invoke(args=["import-catalog", str(path), "--workers", "1"])
+
+        assert result.exit_code == 0
+        assert "2 lugares y 3 platillos importados" in result.output
+        assert "Fila 5" in result.output
+        assert db.session.query(Place).count() == 2
@@ -0,0 +1,173 @@
+"""
+Tests unitarios para app.metrics
+
+Prueba las métricas de Prometheus:
+- GET /metrics
+- Latencia por ruta y estado, peticiones en curso y pool de conexiones
+- Caché de miniaturas, bytes subidos y duración del hash de contraseñas
+- Agregación entre procesos con PROMETHEUS_MULTIPROC_DIR
+"""
+import os
+import subprocess
+import sys
+import textwrap
+from io import BytesIO
+from flask import Flask
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from werkzeug.datastructures import FileStorage
+from app import metrics
+from app.config import Config
+from app.db.models import db
+from app.routes.uploads import save_upload_file
+from tests.test_resizer import make_png
+
+
+def sample(name, **labels):
+    """Valor actual de una métrica del registro del proceso (0 si no existe)"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetricsEndpoint:
+    """Tests para GET /metrics"""
+
+    def test_exposition_format(self, client):
+        """Responde en el formato de texto de Prometheus"""
+        client.get("/api/places")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        assert b'http_request_duration_seconds_count{method="GET",route="/api/places",status="200"}' in response.data
+
+    def test_disabled(self, monkeypatch):
+        """METRICS_ENABLED=0 no registra el endpoint"""
+        monkeypatch.setattr(Config, "METRICS_ENABLED", False)
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(app)
+
+        metrics.init_metrics(app)
+
+        assert app.test_client().get("/metrics").status_code == 404
+
+
+class TestRequestMetrics:
+    """Tests para las métricas por petición"""
+
+    def test_latency_by_route_and_status(self, client, test_place):
+        """La ruta se reporta con su plantilla, no con el ID"""
+        labels = {"route": "/api/places/<string:place_id>", "method": "GET"}
+        ok = sample("http_request_duration_seconds_count", status="200", **labels)
+        missing = sample("http_request_duration_seconds_count", status="404", **labels)
+
+        client.get(f"/api/places/{test_place.id}")
+        client.get("/api/places/no-existe")
+
+        assert sample("http_request_duration_seconds_count", status="200", **labels) == ok + 1
+        assert sample("http_request_duration_seconds_count", status="404", **labels) == missing + 1
+
+    def test_unmatched_route(self, client):
+        """Las URLs sin ruta comparten una sola etiqueta"""
+        before = sample("http_request_duration_seconds_count", route=metrics.UNMATCHED_ROUTE, method="GET", status="404")
+
+        client.get("/no/existe/1")
+        client.get("/no/existe/2")
+
+        assert sample("http_request_duration_seconds_count", route=metrics.UNMATCHED_ROUTE,
+                      method="GET", status="404") == before + 2
+
+    def test_children_are_reused(self):
+        """Cada combinación de etiquetas se enlaza una sola vez"""
+        first = metrics._latency_child("/api/places", "GET", 200)
+
+        assert metrics._latency_child("/api/places", "GET", 200) is first
+
+    def test_in_flight(self, client):
+        """El gauge vuelve a su valor al terminar la petición"""
+        before = sample("http_requests_in_flight")
+
+        client.get("/api/places")
+
+        assert sample("http_requests_in_flight") == before
+
+    def test_pool_checkouts(self, client):
+        """Cada petición con consultas obtiene una conexión del pool"""
+        checkouts = sample("db_pool_checkouts_total")
+        waits = sample("db_pool_checkout_wait_seconds_count")
+
+        client.get("/api/places")
+
+        assert sample("db_pool_checkouts_total") > checkouts
+        assert sample("db_pool_checkout_wait_seconds_count") > waits
+
+    def test_pool_instrumented_after_dispose(self, app):
+        """El pool que se crea al desechar el engine también se mide"""
+        db.engine.dispose()
+        waits = sample("db_pool_checkout_wait_seconds_count")
+
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert sample("db_pool_checkout_wait_seconds_count") > waits
+
+
+class TestApplicationMetrics:
+    """Tests para las métricas de caché, uploads y contraseñas"""
+
+    def test_resize_cache(self, client, upload_folder):
+        """La primera variante es un fallo de caché y la segunda un acierto"""
+        make_png(str(upload_folder / "foto.png"))
+        hits = sample("cache_requests_total", cache="resize", result="hit")
+        misses = sample("cache_requests_total", cache="resize", result="miss")
+
+        client.get("/uploads/foto.png?w=100")
+        client.get("/uploads/foto.png?w=100")
+
+        assert sample("cache_requests_total", cache="resize", result="miss") == misses + 1
+        assert sample("cache_requests_total", cache="resize", result="hit") == hits + 1
+
+    def test_upload_bytes(self, upload_folder):
+        """Se cuentan los bytes de cada archivo subido"""
+        content = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+        before = sample("upload_bytes_total")
+
+        save_upload_file(FileStorage(stream=BytesIO(content), filename="foto.png"))
+
+        assert sample("upload_bytes_total") == before + len(content)
+
+    def test_password_hash_duration(self, client, test_user):
+        """El login observa la duración de la verificación"""
+        before = sample("password_hash_duration_seconds_count", operation="verify")
+
+        client.post("/api/login", data={"email": "testuser@alumnos.udg.mx", "password": "password123"})
+
+        assert sample("password_hash_duration_seconds_count", operation="verify") == before + 1
+
+
+class TestMultiprocess:
+    """Tests para la agregación entre procesos"""
+
+    def test_aggregates_forked_workers(self, tmp_path):
+        """/metrics suma los contadores de todos los procesos"""
+        script = textwrap.dedent("""
+            import os
+            from app import metrics
+
+            for _ in range(2):
+                pid = os.fork()
+                if pid == 0:
+                    metrics.UPLOAD_BYTES.inc(100)
+                    os._exit(0)
+                os.waitpid(pid, 0)
+            body, _ = metrics.render()
+            print(body.decode())
+        """)
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(__file__)))
+
+        assert result.returncode == 0, result.stderr
+        assert "upload_bytes_total 200.0" in result.stdout
@@ -0,0 +1,159 @@
+"""
+Tests unitarios para app.passwords
+
+Prueba el hash de contraseñas:
+- hash_password / verify_password (en línea, en el pool de procesos y tras la muerte de un proceso)
+- needs_rehash
+- pool_size (tamaño automático del pool)
+- Regeneración del hash en POST /api/login
+"""
+import os
+import signal
+import pytest
+from werkzeug.security import generate_password_hash
+from app.config import Config
+from app.db.models import db, User
+from app import passwords
+from app.passwords import hash_password, needs_rehash, pool_size, set_auto_pool_size, verify_password
+
+FAST_METHOD = "pbkdf2:sha256:1000"
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    """Usa un costo bajo para que los tests sean rápidos"""
+    monkeypatch.setattr(Config, "PASSWORD_HASH_METHOD", FAST_METHOD)
+    monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 0)
+
+
+class TestHashPassword:
+    """Tests para hash_password y verify_password"""
+
+    def test_hash_and_verify_inline(self, fast_hashing):
+        """Verifica la contraseña correcta y rechaza las demás"""
+        password_hash = hash_password("secreto")
+
+        assert password_hash.startswith(FAST_METHOD + "$")
+        assert verify_password(password_hash, "secreto")
+        assert not verify_password(password_hash, "otro")
+
+    def test_hash_and_verify_in_process_pool(self, fast_hashing, monkeypatch):
+        """El pool de procesos produce hashes equivalentes"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 2)
+
+        password_hash = hash_password("secreto")
+
+        assert verify_password(password_hash, "secreto")
+        assert not verify_password(password_hash, "otro")
+
+    def test_recovers_from_killed_pool_process(self, fast_hashing, monkeypatch):
+        """Si un proceso del pool muere, el pool se reemplaza y el hash se calcula"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 1)
+        passwords.warm_up()
+        executor, _ = passwords._get_executor()
+        [process] = executor._processes.values()
+
+        os.kill(process.pid, signal.SIGKILL)
+        process.join(5)
+        password_hash = hash_password("secreto")
+
+        assert verify_password(password_hash, "secreto")
+        assert passwords._get_executor()[0] is not executor
+
+    def test_verify_empty_values(self, fast_hashing):
+        """Rechaza hashes o contraseñas vacías sin calcular nada"""
+        assert not verify_password("", "secreto")
+        assert not verify_password(hash_password("secreto"), "")
+
+    def test_user_model_uses_configured_method(self, fast_hashing):
+        """User.set_password usa los parámetros configurados"""
+        user = User(name="Ana", email="ana@alumnos.udg.mx")
+        user.set_password("secreto")
+
+        assert user.password_hash.startswith(FAST_METHOD)
+        assert user.check_password("secreto")
+
+
+class TestPoolSize:
+    """Tests para pool_size"""
+
+    def test_explicit(self, monkeypatch):
+        """Un valor explícito se usa tal cual"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 3)
+
+        assert pool_size() == 3
+
+    def test_automatic_defaults_to_one(self, monkeypatch):
+        """En automático es un proceso por proceso web"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", -1)
+        monkeypatch.setattr(passwords, "_auto_pool_size", 1)
+
+        assert pool_size() == 1
+
+    def test_automatic_override(self, monkeypatch):
+        """set_auto_pool_size solo afecta el modo automático y nunca baja de 1"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", -1)
+        monkeypatch.setattr(passwords, "_auto_pool_size", 1)
+
+        set_auto_pool_size(0)
+        assert pool_size() == 1
+        set_auto_pool_size(4)
+        assert pool_size() == 4
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 0)
+        assert pool_size() == 0
+
+
+class TestNeedsRehash:
+    """Tests para needs_rehash"""
+
+    def test_current_parameters(self, fast_hashing):
+        """Un hash con los parámetros vigentes no se regenera"""
+        assert not needs_rehash(hash_password("secreto"))
+
+    def test_changed_cost(self, fast_hashing):
+        """Un cambio de costo obliga a regenerar"""
+        assert needs_rehash(generate_password_hash("secreto", "pbkdf2:sha256:2000"))
+
+    def test_changed_algorithm(self, fast_hashing):
+        """Un cambio de algoritmo obliga a regenerar"""
+        assert needs_rehash(generate_password_hash("secreto", "scrypt:16384:8:1"))
+
+    def test_default_parameters_are_normalized(self, monkeypatch):
+        """Los parámetros omitidos se comparan con los valores por defecto de Werkzeug"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_METHOD", "scrypt")
+
+        assert not needs_rehash(generate_password_hash("secreto", "scrypt:32768:8:1"))
+
+    def test_malformed_hash(self, fast_hashing):
+        """Un hash sin el formato esperado se regenera"""
+        assert needs_rehash("texto-plano")
+
+
+class TestRehashOnLogin:
+    """Tests para la regeneración del hash al iniciar sesión"""
+
+    def test_login_rehashes_outdated_hash(self, client, app, test_user, fast_hashing):
+        """Un login exitoso migra el hash a los parámetros vigentes"""
+        response = client.post('/api/login', data={
+            'email': 'testuser@alumnos.udg.mx',
+            'password': 'password123'
+        })
+
+        assert response.status_code == 200
+        user = db.session.get(User, test_user.id)
+        db.session.refresh(user)
+        assert user.password_hash.startswith(FAST_METHOD)
+        assert verify_password(user.password_hash, "password123")
+
+    def test_failed_login_keeps_hash(self, client, app, test_user, fast_hashing):
+        """Un login fallido no modifica el hash"""
+        original = db.session.get(User, test_user.id).password_hash
+
+        client.post('/api/login', data={
+            'email': 'testuser@alumnos.udg.mx',
+            'password': 'incorrecta'
+        })
+
+        user = db.session.get(User, test_user.id)
+        db.session.refresh(user)
+        assert user.password_hash == original
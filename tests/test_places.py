@@ -11,7 +11,8 @@ Prueba los endpoints:
 """
 import pytest
 import json
-from app.db.models import db, Place, MenuItem
+from datetime import datetime, timedelta
+from app.db.models import db, Place, MenuItem, Comment
 
 
 class TestGetPlaces:
@@ -48,6 +49,28 @@ class TestGetPlaces:
         assert 'rating' in place_data
         assert 'num_ratings' in place_data
 
+    def test_get_places_latest_comment(self, app, client, test_place, test_user):
+        """latest_comment es el comentario más reciente por created_at, no el último insertado"""
+        now = datetime(2024, 1, 1)
+        with app.app_context():
+            db.session.add_all([
+                Comment(place_id=test_place.id, user_id=test_user.id, text="Nuevo", created_at=now),
+                Comment(place_id=test_place.id, user_id=test_user.id, text="Viejo", created_at=now - timedelta(days=1)),
+            ])
+            db.session.commit()
+
+        response = client.get("/api/places")
+        filtered = client.get("/api/places?category=Comida Rápida")
+
+        assert response.json[0]['latest_comment'] == "Nuevo"
+        assert filtered.json[0]['latest_comment'] == "Nuevo"
+
+    def test_get_places_without_comments(self, client, test_multiple_places):
+        """Los lugares sin comentarios tienen latest_comment vacío"""
+        response = client.get("/api/places")
+
+        assert all(place['latest_comment'] == "" for place in response.json)
+
     def test_get_places_filter_by_category(self, client, test_multiple_places):
         """Filtra lugares por categoría"""
         response = client.get("/api/places?category=Desayunos y Comidas")
@@ -692,3 +715,37 @@ class TestPlacesEdgeCases:
             }
             response = client.post("/api/places", data=data)
             assert response.status_code == 201
+
+
+class TestPlacesQueryBudget:
+    """Presupuesto de consultas SQL por endpoint de lugares"""
+
+    def test_list(self, client, test_multiple_places, assert_max_queries):
+        """El listado hace tres consultas sin importar cuántos lugares haya"""
+        with assert_max_queries(3):
+            response = client.get("/api/places")
+        assert response.status_code == 200
+
+    def test_detail(self, client, test_place_with_menu, assert_max_queries):
+        """El detalle carga el lugar y su menú"""
+        with assert_max_queries(2):
+            response = client.get(f"/api/places/{test_place_with_menu.id}")
+        assert response.status_code == 200
+
+    def test_counts(self, client, test_multiple_places, assert_max_queries):
+        """Un conteo total y uno por categoría"""
+        with assert_max_queries(4):
+            response = client.get("/api/places/counts")
+        assert response.status_code == 200
+
+    def test_create(self, client, assert_max_queries):
+        """Crear un lugar sin imagen"""
+        with assert_max_queries(2):
+            response = client.post("/api/places", data={"name": "Nuevo", "category": "Snacks"})
+        assert response.status_code == 201
+
+    def test_delete(self, client, test_comment, assert_max_queries):
+        """Eliminar un lugar con sus comentarios y menú"""
+        with assert_max_queries(5):
+            response = client.delete(f"/api/places/{test_comment.place_id}")
+        assert response.status_code == 200
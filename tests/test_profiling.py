@@ -0,0 +1,129 @@
+"""
+Tests unitarios para app.profiling
+
+Prueba el perfilado bajo demanda:
+- X-Profile / _profile con el token configurado
+- Formatos pstats y speedscope
+- frame_stack y speedscope_document
+"""
+import json
+import pstats
+from types import SimpleNamespace
+import pytest
+from app import profiling
+from app.config import Config
+from app.profiling import frame_stack, speedscope_document
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    """Directorio de perfiles temporal con un token configurado"""
+    monkeypatch.setattr(Config, "PROFILE_TOKEN", "perfil-secreto")
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+
+class TestRequestProfiling:
+    """Tests para el perfilado de una petición"""
+
+    def test_pstats(self, client, profile_dir, test_place):
+        """Con el token, la petición se perfila con cProfile"""
+        response = client.get("/api/places", headers={"X-Profile": "perfil-secreto"})
+
+        assert response.status_code == 200
+        filename = response.headers["X-Profile-File"]
+        assert filename.endswith("-GET-api-places.pstats")
+        stats = pstats.Stats(str(profile_dir / filename))
+        assert any(name == "get" and "places.py" in path for path, _, name in stats.stats)
+
+    def test_speedscope(self, client, profile_dir, monkeypatch):
+        """El formato speedscope guarda las pilas muestreadas"""
+        monkeypatch.setattr(Config, "PROFILE_FORMAT", "speedscope")
+        monkeypatch.setattr(Config, "PROFILE_SAMPLE_INTERVAL_MS", 0.1)
+
+        response = client.get("/api/places/counts?_profile=perfil-secreto")
+
+        document = json.loads((profile_dir / response.headers["X-Profile-File"]).read_text())
+        profile = document["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert profile["name"] == "GET /api/places/counts 200"
+
+    def test_format_override(self, client, profile_dir):
+        """El formato se puede elegir por petición"""
+        response = client.get("/api/places", headers={"X-Profile": "perfil-secreto", "X-Profile-Format": "speedscope"})
+
+        assert response.headers["X-Profile-File"].endswith(".speedscope.json")
+
+    def test_wrong_token(self, client, profile_dir):
+        """Un token incorrecto no perfila la petición"""
+        response = client.get("/api/places", headers={"X-Profile": "otro"})
+
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+        assert not profile_dir.exists()
+
+    def test_disabled_without_token(self, client, profile_dir, monkeypatch):
+        """Sin PROFILE_TOKEN el encabezado se ignora"""
+        monkeypatch.setattr(Config, "PROFILE_TOKEN", "")
+
+        response = client.get("/api/places", headers={"X-Profile": ""})
+
+        assert "X-Profile-File" not in response.headers
+
+    def test_one_profile_at_a_time(self, client, profile_dir):
+        """Si otra petición se está perfilando, esta se atiende sin perfilar"""
+        with profiling._active:
+            response = client.get("/api/places", headers={"X-Profile": "perfil-secreto"})
+
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+
+    def test_releases_after_request(self, client, profile_dir):
+        """Perfiles consecutivos funcionan"""
+        for _ in range(2):
+            response = client.get("/api/places", headers={"X-Profile": "perfil-secreto"})
+            assert "X-Profile-File" in response.headers
+        assert not profiling._active.locked()
+
+    def test_save_failure_keeps_response(self, client, profile_dir, test_place, caplog):
+        """Si el perfil no se puede guardar, la respuesta sale igual y sin X-Profile-File"""
+        profile_dir.write_text("no es un directorio")
+
+        response = client.get("/api/places", headers={"X-Profile": "perfil-secreto"})
+
+        assert response.status_code == 200
+        assert len(response.json) == 1
+        assert "X-Profile-File" not in response.headers
+        assert "No se pudo guardar el perfil" in caplog.text
+        assert not profiling._active.locked()
+
+
+class TestFrameStack:
+    """Tests para frame_stack"""
+
+    def test_without_qualname(self):
+        """Antes de Python 3.11 los frames no tienen co_qualname y se usa co_name"""
+        code = SimpleNamespace(co_name="handler", co_filename="app.py", co_firstlineno=10)
+        root = SimpleNamespace(f_code=SimpleNamespace(co_name="main", co_filename="app.py", co_firstlineno=1),
+                               f_back=None)
+
+        assert frame_stack(SimpleNamespace(f_code=code, f_back=root)) == (
+            ("main", "app.py", 1), ("handler", "app.py", 10)
+        )
+
+
+class TestSpeedscopeDocument:
+    """Tests para speedscope_document"""
+
+    def test_shared_frames(self):
+        """Los frames repetidos se comparten entre muestras"""
+        a, b, c = ("main", "app.py", 1), ("handler", "app.py", 10), ("query", "db.py", 5)
+
+        document = speedscope_document("prueba", [((a, b), 3), ((a, b, c), 1)], 0.01)
+
+        assert [f["name"] for f in document["shared"]["frames"]] == ["main", "handler", "query"]
+        profile = document["profiles"][0]
+        assert profile["samples"] == [[0, 1], [0, 1, 2]]
+        assert profile["weights"] == pytest.approx([0.03, 0.01])
+        assert profile["endValue"] == pytest.approx(0.04)
@@ -0,0 +1,116 @@
+"""
+Tests unitarios para app.querystats
+
+Prueba el conteo de consultas por petición:
+- track_queries (colectores anidados)
+- Encabezado Server-Timing en Flask y en el modo ASGI
+- Aviso en el log cuando se excede QUERY_COUNT_WARN
+"""
+import logging
+import re
+import pytest
+from sqlalchemy import text
+from app.asgi import create_asgi_app
+from app.config import Config
+from app.db.models import db
+from app.querystats import server_timing, track_queries, QueryStats
+from tests.test_asgi import call
+
+SERVER_TIMING = re.compile(r'^db;dur=[\d.]+;desc="(\d+) consultas", total;dur=[\d.]+$')
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    """Archivo SQLite compartido con el engine asíncrono"""
+    return f"sqlite:///{tmp_path / 'querystats.db'}"
+
+
+class TestTrackQueries:
+    """Tests para track_queries"""
+
+    def test_counts_queries(self, app):
+        """Cuenta las consultas y el SQL de cada una"""
+        with track_queries(record_statements=True) as stats:
+            db.session.execute(text("SELECT 1"))
+            db.session.execute(text("SELECT 2"))
+
+        assert stats.count == 2
+        assert stats.statements == ["SELECT 1", "SELECT 2"]
+        assert stats.seconds > 0
+
+    def test_nested(self, app):
+        """Un colector anidado solo ve sus consultas; el externo las ve todas"""
+        with track_queries() as outer:
+            db.session.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                db.session.execute(text("SELECT 2"))
+
+        assert inner.count == 1
+        assert outer.count == 2
+
+    def test_outside_block(self, app):
+        """Las consultas fuera del bloque no se cuentan"""
+        with track_queries() as stats:
+            pass
+        db.session.execute(text("SELECT 1"))
+
+        assert stats.count == 0
+        assert stats.statements is None
+
+
+class TestServerTiming:
+    """Tests para el encabezado Server-Timing"""
+
+    def test_format(self):
+        """Reporta el tiempo en la base de datos y el total en milisegundos"""
+        stats = QueryStats()
+        stats.count, stats.seconds = 3, 0.0125
+
+        assert server_timing(stats, 0.05) == 'db;dur=12.500;desc="3 consultas", total;dur=50.000'
+
+    def test_header(self, client, test_place):
+        """Cada respuesta incluye el número de consultas de la petición"""
+        response = client.get(f"/api/places/{test_place.id}")
+
+        match = SERVER_TIMING.match(response.headers["Server-Timing"])
+        assert match
+        assert int(match.group(1)) >= 1
+
+    def test_disabled(self, client, monkeypatch):
+        """SERVER_TIMING=0 omite el encabezado"""
+        monkeypatch.setattr(Config, "SERVER_TIMING", False)
+
+        response = client.get("/api/places")
+
+        assert "Server-Timing" not in response.headers
+
+    def test_asgi(self, app, test_place):
+        """Las lecturas asíncronas también reportan sus consultas"""
+        asgi_app = create_asgi_app(app)
+
+        status, headers, _ = call(asgi_app, "GET", f"/api/places/{test_place.id}")
+
+        assert status == 200
+        match = SERVER_TIMING.match(headers["server-timing"])
+        assert match
+        assert int(match.group(1)) >= 1
+
+
+class TestQueryLog:
+    """Tests para el registro de consultas por petición"""
+
+    def test_warns_above_threshold(self, client, caplog, monkeypatch):
+        """Una petición con demasiadas consultas genera un WARNING"""
+        monkeypatch.setattr(Config, "QUERY_COUNT_WARN", 0)
+
+        with caplog.at_level(logging.WARNING, logger="app.querystats"):
+            client.get("/api/places/counts")
+
+        assert "GET /api/places/counts 200" in caplog.text
+
+    def test_quiet_below_threshold(self, client, caplog):
+        """Por debajo del umbral no hay avisos"""
+        with caplog.at_level(logging.WARNING, logger="app.querystats"):
+            client.get("/api/places/counts")
+
+        assert caplog.text == ""
@@ -0,0 +1,147 @@
+"""
+Tests unitarios para app.ratelimit
+
+Prueba el límite de intentos de login:
+- TokenBucketLimiter
+- check_login_attempt
+- POST /api/login con intentos excedidos
+"""
+import pytest
+import time
+from sqlalchemy import event
+from app.config import Config
+from app.db.models import db
+from app.ratelimit import TokenBucketLimiter, check_login_attempt, init_trusted_proxies
+
+
+class TestTokenBucketLimiter:
+    """Tests para TokenBucketLimiter"""
+
+    def test_allows_burst_then_rejects(self):
+        """Admite hasta la capacidad y luego indica cuánto esperar"""
+        limiter = TokenBucketLimiter(3, 60, 64)
+
+        assert [limiter.hit("a") for _ in range(3)] == [0, 0, 0]
+        wait = limiter.hit("a")
+
+        assert 0 < wait <= 20
+
+    def test_keys_are_independent(self):
+        """Cada llave tiene su propio bucket"""
+        limiter = TokenBucketLimiter(1, 60, 64)
+
+        assert limiter.hit("a") == 0
+        assert limiter.hit("b") == 0
+        assert limiter.hit("a") > 0
+
+    def test_refills_over_time(self, monkeypatch):
+        """Recupera intentos con el paso del tiempo"""
+        limiter = TokenBucketLimiter(2, 10, 64)
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now)
+        limiter.hit("a")
+        limiter.hit("a")
+        assert limiter.hit("a") > 0
+
+        monkeypatch.setattr(time, "time", lambda: now + 5)
+
+        assert limiter.hit("a") == 0
+
+    def test_full_table_reuses_entries(self):
+        """Con la tabla llena sigue admitiendo llaves nuevas"""
+        limiter = TokenBucketLimiter(1, 3600, 4)
+        for i in range(4):
+            limiter.hit(f"k{i}")
+
+        assert limiter.hit("nueva") == 0
+
+    def test_shared_file(self, tmp_path):
+        """Dos instancias sobre el mismo archivo comparten los intentos"""
+        path = str(tmp_path / "login")
+        first, second = TokenBucketLimiter(1, 60, 64, path), TokenBucketLimiter(1, 60, 64, path)
+
+        first.hit("a")
+
+        assert second.hit("a") > 0
+
+
+class TestCheckLoginAttempt:
+    """Tests para check_login_attempt"""
+
+    def test_email_limit_is_case_insensitive(self, monkeypatch):
+        """El límite por correo ignora mayúsculas y espacios"""
+        monkeypatch.setattr(Config, "LOGIN_EMAIL_ATTEMPTS", 2)
+
+        check_login_attempt("Ana@alumnos.udg.mx", "10.0.0.1")
+        check_login_attempt(" ana@alumnos.udg.mx", "10.0.0.2")
+
+        assert check_login_attempt("ana@alumnos.udg.mx", "10.0.0.3") > 0
+
+    def test_ip_limit(self, monkeypatch):
+        """El límite por IP aplica aunque cambie el correo"""
+        monkeypatch.setattr(Config, "LOGIN_IP_ATTEMPTS", 2)
+
+        check_login_attempt("a@alumnos.udg.mx", "10.0.0.1")
+        check_login_attempt("b@alumnos.udg.mx", "10.0.0.1")
+
+        assert check_login_attempt("c@alumnos.udg.mx", "10.0.0.1") > 0
+        assert check_login_attempt("c@alumnos.udg.mx", "10.0.0.2") == 0
+
+    def test_disabled(self, monkeypatch):
+        """No limita si está deshabilitado"""
+        monkeypatch.setattr(Config, "LOGIN_THROTTLE", False)
+        monkeypatch.setattr(Config, "LOGIN_EMAIL_ATTEMPTS", 1)
+
+        assert [check_login_attempt("a@alumnos.udg.mx", "10.0.0.1") for _ in range(3)] == [0, 0, 0]
+
+
+class TestLoginThrottle:
+    """Tests para POST /api/login con intentos excedidos"""
+
+    def test_login_returns_429_without_queries(self, client, app, test_user, monkeypatch):
+        """Tras exceder el límite responde 429 sin consultar la base de datos"""
+        monkeypatch.setattr(Config, "LOGIN_EMAIL_ATTEMPTS", 2)
+        data = {'email': 'testuser@alumnos.udg.mx', 'password': 'incorrecta'}
+        for _ in range(2):
+            assert client.post('/api/login', data=data).status_code == 401
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = client.post('/api/login', data=data)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert statements == []
+
+    def test_correct_password_also_throttled(self, client, test_user, monkeypatch):
+        """Una vez bloqueado, ni la contraseña correcta pasa"""
+        monkeypatch.setattr(Config, "LOGIN_EMAIL_ATTEMPTS", 1)
+        client.post('/api/login', data={'email': 'testuser@alumnos.udg.mx', 'password': 'incorrecta'})
+
+        response = client.post('/api/login', data={'email': 'testuser@alumnos.udg.mx', 'password': 'password123'})
+
+        assert response.status_code == 429
+
+    def test_clients_behind_proxy_have_separate_buckets(self, client, app, test_user, monkeypatch):
+        """Con TRUSTED_PROXIES cada IP de X-Forwarded-For tiene su bucket"""
+        monkeypatch.setattr(Config, "TRUSTED_PROXIES", 1)
+        monkeypatch.setattr(Config, "LOGIN_IP_ATTEMPTS", 1)
+        init_trusted_proxies(app)
+        data = {'email': 'testuser@alumnos.udg.mx', 'password': 'incorrecta'}
+        proxy = {'REMOTE_ADDR': '10.0.0.1'}
+
+        first = client.post('/api/login', data=data, headers={'X-Forwarded-For': '200.1.1.1'}, environ_base=proxy)
+        second = client.post('/api/login', data=data, headers={'X-Forwarded-For': '200.2.2.2'}, environ_base=proxy)
+        again = client.post('/api/login', data=data, headers={'X-Forwarded-For': '200.1.1.1'}, environ_base=proxy)
+
+        assert first.status_code == 401
+        assert second.status_code == 401
+        assert again.status_code == 429
+
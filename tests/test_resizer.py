@@ -0,0 +1,282 @@
+"""
+Tests unitarios para app.resizer
+
+Prueba el redimensionado bajo demanda:
+- DiskLRUCache
+- SingleFlight
+- GET /uploads/<filename>?w=&h=&fmt=
+"""
+import pytest
+import os
+import threading
+import time
+from io import BytesIO
+from PIL import Image
+from werkzeug.datastructures import MultiDict
+from app.config import Config
+from app import resizer
+from app.resizer import DiskLRUCache, SingleFlight, parse_resize_args
+
+
+def make_png(path, size=(800, 600)):
+    """Helper para crear un PNG"""
+    Image.new("RGB", size, (10, 120, 200)).save(path, format="PNG")
+    return path
+
+
+def write_bytes(n):
+    """Helper que escribe n bytes en la ruta temporal"""
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * n)
+    return write
+
+
+class TestDiskLRUCache:
+    """Tests para DiskLRUCache"""
+
+    def test_put_and_get(self, tmp_path):
+        """Guarda y recupera una entrada"""
+        cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+
+        path = cache.put("a.webp", write_bytes(10))
+
+        assert cache.get("a.webp") == path
+        assert cache.get("b.webp") is None
+        assert cache.total_bytes == 10
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Desaloja la entrada menos usada al exceder el límite"""
+        cache = DiskLRUCache(str(tmp_path), max_bytes=25)
+        cache.put("a", write_bytes(10))
+        cache.put("b", write_bytes(10))
+        cache.get("a")
+
+        cache.put("c", write_bytes(10))
+
+        assert cache.get("b") is None
+        assert not os.path.exists(tmp_path / "b")
+        assert cache.get("a") is not None
+        assert cache.total_bytes == 20
+
+    def test_rebuilds_index_from_disk(self, tmp_path):
+        """Reconstruye el índice desde los archivos existentes"""
+        DiskLRUCache(str(tmp_path), max_bytes=1000).put("a", write_bytes(10))
+
+        cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+
+        assert cache.get("a") is not None
+        assert cache.total_bytes == 10
+
+    def test_missing_file_is_a_miss(self, tmp_path):
+        """Una entrada borrada por otro proceso cuenta como fallo"""
+        cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+        os.remove(cache.put("a", write_bytes(10)))
+
+        assert cache.get("a") is None
+        assert cache.total_bytes == 0
+
+    def test_evicted_during_get_is_a_miss(self, tmp_path, monkeypatch):
+        """Si otro hilo desaloja el archivo al marcarlo como usado, es un fallo y no un error"""
+        cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+        cache.put("a", write_bytes(10))
+
+        def evicted(path):
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(resizer.os, "utime", evicted)
+
+        assert cache.get("a") is None
+        assert cache.total_bytes == 0
+
+    def test_failed_write_leaves_no_files(self, tmp_path):
+        """Un error al escribir no deja temporales"""
+        cache = DiskLRUCache(str(tmp_path), max_bytes=1000)
+
+        def fail(path):
+            with open(path, "wb") as f:
+                f.write(b"x")
+            raise OSError("disco lleno")
+
+        with pytest.raises(OSError):
+            cache.put("a", fail)
+        assert os.listdir(tmp_path) == []
+
+
+class TestSingleFlight:
+    """Tests para SingleFlight"""
+
+    def test_concurrent_calls_run_once(self):
+        """Las llamadas concurrentes comparten una sola ejecución"""
+        flights = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "listo"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("k", work))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["listo"] * 8
+
+    def test_exception_is_shared_and_cleared(self):
+        """La excepción se propaga y la llave se libera"""
+        flights = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flights.do("k", lambda: (_ for _ in ()).throw(ValueError("falló")))
+
+        assert flights.do("k", lambda: 1) == 1
+
+
+class TestParseResizeArgs:
+    """Tests para parse_resize_args"""
+
+    def test_defaults(self):
+        """Sin dimensiones usa 0 (libre) y el formato por defecto"""
+        assert parse_resize_args(MultiDict({"w": "320"})) == (320, 0, "webp")
+
+    def test_jpeg_alias(self):
+        """Acepta jpeg y jpg"""
+        assert parse_resize_args(MultiDict({"h": "100", "fmt": "JPEG"}))[2] == "jpg"
+
+    def test_allowed_dimensions(self, monkeypatch):
+        """Solo se admiten las dimensiones configuradas, hasta RESIZE_MAX_DIMENSION"""
+        monkeypatch.setattr(Config, "RESIZE_ALLOWED_DIMENSIONS", "160, 320,4096")
+
+        assert parse_resize_args(MultiDict({"w": "160", "h": "320"}))[:2] == (160, 320)
+        with pytest.raises(ValueError, match="160, 320"):
+            parse_resize_args(MultiDict({"w": "161"}))
+        with pytest.raises(ValueError):
+            parse_resize_args(MultiDict({"w": "4096"}))
+
+    @pytest.mark.parametrize("args", [{"w": "abc"}, {"w": "-1"}, {"w": "321"}, {"h": "99999"}, {"fmt": "bmp"}])
+    def test_invalid(self, args):
+        """Rechaza parámetros inválidos"""
+        with pytest.raises(ValueError):
+            parse_resize_args(MultiDict(args))
+
+
+class TestResizeEndpoint:
+    """Tests para GET /uploads/<filename>?w=&h=&fmt="""
+
+    def test_resize_width(self, client, upload_folder):
+        """Redimensiona conservando la proporción"""
+        make_png(str(upload_folder / "foto.png"))
+
+        response = client.get("/uploads/foto.png?w=200")
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/webp"
+        with Image.open(BytesIO(response.data)) as image:
+            assert image.size == (200, 150)
+
+    def test_resize_box_and_format(self, client, upload_folder):
+        """Ajusta la imagen dentro de la caja en el formato pedido"""
+        make_png(str(upload_folder / "foto.png"))
+
+        response = client.get("/uploads/foto.png?w=320&h=100&fmt=jpeg")
+
+        assert response.mimetype == "image/jpeg"
+        with Image.open(BytesIO(response.data)) as image:
+            assert image.size == (133, 100)
+
+    def test_resize_is_cached(self, client, upload_folder, monkeypatch):
+        """La segunda petición se sirve desde la caché"""
+        make_png(str(upload_folder / "foto.png"))
+        calls = []
+        original = resizer.resize_image
+        monkeypatch.setattr(resizer, "resize_image", lambda *a: calls.append(1) or original(*a))
+
+        client.get("/uploads/foto.png?w=100")
+        response = client.get("/uploads/foto.png?w=100")
+
+        assert response.status_code == 200
+        assert len(calls) == 1
+        assert len(os.listdir(Config.RESIZE_CACHE_FOLDER)) == 1
+
+    def test_resize_content_addressed_is_immutable(self, client, upload_folder):
+        """Las variantes de archivos direccionados por contenido son inmutables"""
+        name = "a" * 64 + ".png"
+        make_png(str(upload_folder / name))
+
+        response = client.get(f"/uploads/{name}?w=100")
+
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_resize_invalid_params(self, client, upload_folder):
+        """Retorna 400 con parámetros inválidos"""
+        make_png(str(upload_folder / "foto.png"))
+
+        assert client.get("/uploads/foto.png?w=abc").status_code == 400
+
+    def test_resize_missing_source(self, client, upload_folder):
+        """Retorna 404 si el original no existe"""
+        assert client.get("/uploads/nada.png?w=100").status_code == 404
+
+    def test_resize_not_an_image(self, client, upload_folder):
+        """Retorna 415 si el original no es una imagen válida"""
+        (upload_folder / "roto.png").write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 10)
+
+        assert client.get("/uploads/roto.png?w=100").status_code == 415
+
+    def test_resize_decompression_bomb(self, client, upload_folder, monkeypatch):
+        """Retorna 413 si la imagen excede el límite de píxeles de Pillow"""
+        make_png(str(upload_folder / "foto.png"))
+        monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+        response = client.get("/uploads/foto.png?w=100")
+
+        assert response.status_code == 413
+
+    @pytest.mark.parametrize("mode,fmt", [("CMYK", "png"), ("P", "webp"), ("CMYK", "webp"), ("LA", "jpeg")])
+    def test_resize_converts_modes(self, client, upload_folder, mode, fmt):
+        """Las imágenes CMYK, con paleta o en grises se convierten al formato pedido"""
+        source = "foto.jpg" if mode == "CMYK" else "foto.png"
+        image = Image.new(mode, (400, 300))
+        if mode == "P":
+            image.info["transparency"] = 0
+        image.save(upload_folder / source, format="JPEG" if mode == "CMYK" else "PNG")
+
+        response = client.get(f"/uploads/{source}?w=100&fmt={fmt}")
+
+        assert response.status_code == 200
+        with Image.open(BytesIO(response.data)) as resized:
+            assert resized.size == (100, 75)
+            assert resized.mode in ("RGB", "RGBA")
+
+    def test_resize_regenerates_evicted_variant(self, client, upload_folder, monkeypatch):
+        """Si la variante se desaloja antes de enviarla, se genera de nuevo"""
+        make_png(str(upload_folder / "foto.png"))
+        original = resizer.get_resized
+        calls = []
+
+        def evict_first(*args):
+            path = original(*args)
+            calls.append(path)
+            if len(calls) == 1:
+                os.remove(path)
+            return path
+
+        monkeypatch.setattr(resizer, "get_resized", evict_first)
+
+        response = client.get("/uploads/foto.png?w=100")
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+    def test_resize_x_accel_redirect(self, client, upload_folder, monkeypatch):
+        """Delega la variante en caché al proxy"""
+        monkeypatch.setattr(Config, "UPLOAD_OFFLOAD", "x-accel-redirect")
+        make_png(str(upload_folder / "foto.png"))
+
+        response = client.get("/uploads/foto.png?w=100")
+
+        assert response.headers["X-Accel-Redirect"] == "/_protected_resized/foto_png-100x0.webp"
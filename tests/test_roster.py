@@ -0,0 +1,174 @@
+"""
+Tests unitarios para app.roster
+
+Prueba el registro masivo de estudiantes:
+- register_students(stream, fmt)
+- POST /api/admin/students
+- flask register-students
+"""
+import pytest
+import io
+import json
+from sqlalchemy import event, select
+from app.config import Config
+from app.db.models import db, User
+from app.passwords import verify_password
+from app import roster
+from app.roster import find_registered, register_students
+
+CSV_ROSTER = (
+    "name,email,password\n"
+    "Ana,ana@alumnos.udg.mx,secreto1\n"
+    "Luis,luis@alumnos.udg.mx,secreto2\n"
+    "Ana otra vez,ana@alumnos.udg.mx,secreto3\n"
+    "Externo,externo@gmail.com,secreto4\n"
+    "Sin contraseña,vacio@alumnos.udg.mx,\n"
+    "Test User,testuser@alumnos.udg.mx,secreto5\n"
+)
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    """Usa un costo bajo para que los tests sean rápidos"""
+    monkeypatch.setattr(Config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 0)
+
+
+class TestRegisterStudents:
+    """Tests para register_students"""
+
+    def test_register_csv(self, app, test_user, fast_hashing):
+        """Registra las filas válidas y reporta errores y conflictos por fila"""
+        report = register_students(io.StringIO(CSV_ROSTER), "csv")
+
+        assert report["rows"] == 6
+        assert report["registered"] == 2
+        assert [e["row"] for e in report["errors"]] == [5, 6]
+        assert [(c["row"], c["email"]) for c in report["conflicts"]] == [
+            (4, "ana@alumnos.udg.mx"),
+            (7, "testuser@alumnos.udg.mx")
+        ]
+        assert report["rows_per_second"] > 0
+
+        ana = db.session.execute(select(User).where(User.email == "ana@alumnos.udg.mx")).scalar_one()
+        assert ana.name == "Ana"
+        assert verify_password(ana.password_hash, "secreto1")
+        assert ana.created_at is not None
+
+    def test_register_jsonl(self, app, fast_hashing):
+        """Acepta JSONL y reporta las líneas inválidas"""
+        stream = io.StringIO(
+            json.dumps({"name": "Ana", "email": "ana@alumnos.udg.mx", "password": "x"}) + "\n"
+            + "no es json\n"
+        )
+
+        report = register_students(stream, "jsonl")
+
+        assert report["registered"] == 1
+        assert report["errors"][0]["row"] == 2
+
+    def test_single_duplicate_query_and_batches(self, app, test_user, fast_hashing):
+        """Verifica los duplicados con una consulta e inserta por lotes"""
+        roster = "name,email,password\n" + "".join(
+            f"Alumno {i},alumno{i}@alumnos.udg.mx,pw{i}\n" for i in range(25)
+        )
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement.split()[0].upper(), executemany))
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            report = register_students(io.StringIO(roster), "csv", batch_size=10)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert report["registered"] == 25
+        assert [s for s, _ in statements].count("SELECT") == 1
+        assert statements.count(("INSERT", True)) == 3
+
+    def test_lookup_in_chunks(self, app, test_user, monkeypatch):
+        """Los correos se buscan por bloques para no exceder los parámetros de SQLite"""
+        monkeypatch.setattr(roster, "LOOKUP_CHUNK_SIZE", 2)
+        emails = [f"alumno{i}@alumnos.udg.mx" for i in range(4)] + ["testuser@alumnos.udg.mx"]
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            registered = find_registered(db.session, emails)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert registered == {"testuser@alumnos.udg.mx"}
+        assert len(statements) == 3
+
+    def test_parallel_hashing(self, app, fast_hashing, monkeypatch):
+        """Calcula los hashes en el pool de procesos"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 2)
+        roster = "name,email,password\n" + "".join(
+            f"Alumno {i},alumno{i}@alumnos.udg.mx,pw{i}\n" for i in range(6)
+        )
+
+        report = register_students(io.StringIO(roster), "csv")
+
+        assert report["registered"] == 6
+        user = db.session.execute(select(User).where(User.email == "alumno3@alumnos.udg.mx")).scalar_one()
+        assert verify_password(user.password_hash, "pw3")
+
+    def test_unknown_format(self, app):
+        """Rechaza formatos desconocidos"""
+        with pytest.raises(ValueError):
+            register_students(io.StringIO(""), "xml")
+
+
+class TestRosterEndpoint:
+    """Tests para POST /api/admin/students"""
+
+    def test_requires_admin_token(self, client, admin_token):
+        """Rechaza peticiones sin token de administración"""
+        assert client.post("/api/admin/students").status_code == 403
+
+    def test_register_file(self, client, admin_token, fast_hashing):
+        """Registra desde un archivo y retorna el reporte"""
+        response = client.post("/api/admin/students", data={
+            "file": (io.BytesIO(CSV_ROSTER.encode("utf-8")), "roster.csv")
+        }, headers={"X-Admin-Token": admin_token}, content_type="multipart/form-data")
+
+        assert response.status_code == 200
+        assert response.json["registered"] == 3
+        assert len(response.json["conflicts"]) == 1
+
+    def test_too_many_rows(self, client, app, admin_token, fast_hashing, monkeypatch):
+        """Las listas mayores a ROSTER_WEB_MAX_ROWS se rechazan con 413 sin registrar a nadie"""
+        monkeypatch.setattr(Config, "ROSTER_WEB_MAX_ROWS", 2)
+
+        response = client.post("/api/admin/students", data={
+            "file": (io.BytesIO(CSV_ROSTER.encode("utf-8")), "roster.csv")
+        }, headers={"X-Admin-Token": admin_token}, content_type="multipart/form-data")
+
+        assert response.status_code == 413
+        assert "register-students" in response.json["message"]
+        assert db.session.execute(select(User).where(User.email == "ana@alumnos.udg.mx")).first() is None
+
+    def test_missing_file(self, client, admin_token):
+        """Retorna 400 sin archivo"""
+        response = client.post("/api/admin/students", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 400
+
+
+class TestRosterCommand:
+    """Tests para flask register-students"""
+
+    def test_command(self, app, runner, tmp_path, fast_hashing):
+        """Registra desde la línea de comandos y muestra el resumen"""
+        path = tmp_path / "roster.csv"
+        path.write_text(CSV_ROSTER, encoding="utf-8")
+
+        result = runner.invoke(args=["register-students", str(path)])
+
+        assert result.exit_code == 0
+        assert "3 estudiantes registrados" in result.output
@@ -0,0 +1,206 @@
+"""
+Tests unitarios para app.sampler
+
+Prueba el muestreo continuo de pilas:
+- StackSampler (límite de pilas, profundidad y costo)
+- Formato plegado
+- GET /api/admin/profile/stacks y /api/admin/profile/sampler
+"""
+import os
+import threading
+import time
+import pytest
+from app import sampler as sampler_module
+from app.config import Config
+from app.sampler import StackSampler, clear_stacks, collapsed, parse_collapsed, remove_stacks
+
+
+@pytest.fixture
+def sampling(monkeypatch):
+    """Sampler habilitado a 1 ms; se detiene al terminar el test"""
+    monkeypatch.setattr(Config, "SAMPLER_ENABLED", True)
+    monkeypatch.setattr(Config, "SAMPLER_INTERVAL_MS", 1)
+    sampler_module.stop_sampler()
+    yield
+    sampler_module.stop_sampler()
+
+
+def busy_thread(stop):
+    """Hilo que consume CPU hasta que stop se activa; retorna cuando ya está en spin"""
+    spinning = threading.Event()
+
+    def spin():
+        spinning.set()
+        while not stop.is_set():
+            sum(range(1000))
+    thread = threading.Thread(target=spin)
+    thread.start()
+    spinning.wait()
+    return thread
+
+
+class TestStackSampler:
+    """Tests para StackSampler"""
+
+    def test_samples_registered_threads(self):
+        """Solo muestrea los hilos registrados"""
+        sampler = StackSampler(0.001, 100, 64)
+        stop = threading.Event()
+        thread = busy_thread(stop)
+        try:
+            sampler.sample()
+            assert sampler.samples == 0
+
+            sampler.threads.add(thread.ident)
+            for _ in range(5):
+                sampler.sample()
+        finally:
+            stop.set()
+            thread.join()
+
+        assert sampler.samples == 5
+        assert any(stack[-1][0] == "busy_thread.<locals>.spin" for stack in sampler.stacks)
+
+    def test_bounded_stacks(self):
+        """Con el límite alcanzado las pilas nuevas se descartan"""
+        sampler = StackSampler(0.001, 1, 64)
+        sampler.threads.add(threading.get_ident())
+
+        sampler.sample()
+        (lambda: sampler.sample())()
+
+        assert len(sampler.stacks) == 1
+        assert sampler.dropped == 1
+
+    def test_max_depth(self):
+        """Las pilas conservan los frames más cercanos a la hoja"""
+        sampler = StackSampler(0.001, 100, 3)
+        sampler.threads.add(threading.get_ident())
+
+        sampler.sample()
+
+        (stack,) = sampler.stacks
+        assert len(stack) == 3
+        assert stack[-1][0] == "StackSampler.sample"
+
+    def test_status_reports_overhead(self):
+        """El estado incluye la CPU consumida por el sampler"""
+        sampler = StackSampler(0.001, 100, 64)
+        sampler.threads.add(threading.get_ident())
+        sampler.start()
+        time.sleep(0.05)
+        sampler.stop()
+
+        status = sampler.status()
+
+        assert status["samples"] > 0
+        assert status["sampler_cpu_seconds"] > 0
+        assert 0 < status["overhead_percent"] < 100
+
+    def test_flush(self, tmp_path):
+        """flush escribe las pilas del proceso en formato plegado"""
+        sampler = StackSampler(0.001, 100, 64)
+        sampler.threads.add(threading.get_ident())
+        sampler.sample()
+
+        sampler.flush(str(tmp_path))
+
+        text = (tmp_path / f"stacks-{os.getpid()}.folded").read_text()
+        assert parse_collapsed(text) == sampler.stacks
+
+    def test_remove_and_clear(self, tmp_path, monkeypatch):
+        """remove_stacks borra el archivo de un proceso y clear_stacks todos"""
+        monkeypatch.setattr(Config, "SAMPLER_DIR", str(tmp_path))
+        for pid in (101, 102, 103):
+            (tmp_path / f"stacks-{pid}.folded").write_text("f (app.py:1) 1\n")
+
+        remove_stacks(101)
+        remove_stacks(101)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["stacks-102.folded", "stacks-103.folded"]
+
+        clear_stacks()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestCollapsed:
+    """Tests para el formato plegado"""
+
+    def test_round_trip(self):
+        """Las pilas se escriben y leen sin cambios"""
+        stacks = {
+            (("main", "app.py", 1), ("get", "routes/places.py", 80)): 7,
+            (("main", "app.py", 1),): 2,
+        }
+
+        text = collapsed(stacks.items())
+
+        assert text.splitlines()[0] == "main (app.py:1);get (routes/places.py:80) 7"
+        assert parse_collapsed(text) == stacks
+
+
+class TestSamplerEndpoints:
+    """Tests para los endpoints de administración del sampler"""
+
+    def test_collapsed(self, client, admin_token, sampling, test_multiple_places):
+        """Las peticiones atendidas aparecen en las pilas"""
+        deadline = time.monotonic() + 5
+        while sampler_module.get_sampler().samples < 5 and time.monotonic() < deadline:
+            client.get("/api/places")
+
+        response = client.get("/api/admin/profile/stacks", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        assert "wsgi_app" in response.get_data(as_text=True)
+
+    def test_speedscope(self, client, admin_token, sampling):
+        """format=speedscope retorna un documento de speedscope"""
+        client.get("/api/places")
+
+        response = client.get("/api/admin/profile/stacks?format=speedscope", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert response.json["profiles"][0]["type"] == "sampled"
+
+    def test_combines_workers(self, client, admin_token, sampling, tmp_path, monkeypatch):
+        """Con SAMPLER_DIR se combinan las pilas de todos los procesos"""
+        monkeypatch.setattr(Config, "SAMPLER_DIR", str(tmp_path))
+        (tmp_path / f"stacks-{os.getppid()}.folded").write_text("otro_worker (app.py:1) 5\n")
+
+        response = client.get("/api/admin/profile/stacks", headers={"X-Admin-Token": admin_token})
+
+        assert "otro_worker (app.py:1) 5" in response.get_data(as_text=True)
+
+    def test_skips_dead_workers(self, client, admin_token, sampling, tmp_path, monkeypatch):
+        """Las pilas de procesos que ya no existen no se suman y se borran"""
+        monkeypatch.setattr(Config, "SAMPLER_DIR", str(tmp_path))
+        monkeypatch.setattr(sampler_module, "_pid_alive", lambda pid: pid == os.getpid())
+        dead = tmp_path / "stacks-99999.folded"
+        dead.write_text("worker_muerto (app.py:1) 5\n")
+
+        response = client.get("/api/admin/profile/stacks", headers={"X-Admin-Token": admin_token})
+
+        assert "worker_muerto" not in response.get_data(as_text=True)
+        assert not dead.exists()
+
+    def test_status(self, client, admin_token, sampling):
+        """El estado reporta las muestras y el costo"""
+        client.get("/api/places")
+
+        response = client.get("/api/admin/profile/sampler", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert response.json["pid"] == os.getpid()
+        assert "overhead_percent" in response.json
+
+    def test_disabled(self, client, admin_token):
+        """Sin SAMPLER_ENABLED los endpoints responden 404"""
+        response = client.get("/api/admin/profile/stacks", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 404
+
+    def test_requires_admin(self, client, admin_token, sampling):
+        """Los endpoints requieren el token de administración"""
+        response = client.get("/api/admin/profile/stacks")
+
+        assert response.status_code == 403
@@ -0,0 +1,163 @@
+"""
+Tests unitarios para app.server
+
+Prueba el servidor de producción:
+- default_workers y server_options
+- preload, post_fork, warm_worker y worker_exited
+- Comando serve sin gunicorn instalado
+"""
+import gc
+import pytest
+from flask import request
+from app import server
+from app.config import Config
+from app.db.models import db
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    """Archivo SQLite para tener un pool de conexiones real"""
+    return f"sqlite:///{tmp_path / 'server.db'}"
+
+
+@pytest.fixture
+def fresh_tables(monkeypatch, upload_folder):
+    """Sin tablas compartidas ni caché creadas todavía"""
+    monkeypatch.setattr("app.tokens._revoked", None)
+    monkeypatch.setattr("app.ratelimit._limiters", None)
+    monkeypatch.setattr("app.resizer._cache", None)
+
+
+class TestServerOptions:
+    """Tests para default_workers y server_options"""
+
+    def test_workers_from_cpu_count(self, monkeypatch):
+        """Por defecto 2 workers por núcleo + 1"""
+        monkeypatch.setattr(Config, "WEB_WORKERS", 0)
+        monkeypatch.setattr(server.os, "cpu_count", lambda: 4)
+
+        assert server.default_workers() == 9
+
+    def test_configured_workers(self, monkeypatch):
+        """WEB_WORKERS tiene prioridad"""
+        monkeypatch.setattr(Config, "WEB_WORKERS", 3)
+
+        assert server.default_workers() == 3
+
+    def test_wsgi_options(self, monkeypatch):
+        """WSGI usa workers con hilos y precarga la aplicación"""
+        monkeypatch.setattr(Config, "WEB_THREADS", 8)
+
+        options = server.server_options(bind="127.0.0.1:9000", workers=2)
+
+        assert options["bind"] == "127.0.0.1:9000"
+        assert options["workers"] == 2
+        assert options["worker_class"] == "gthread"
+        assert options["threads"] == 8
+        assert options["preload_app"] is True
+        assert "forwarded_allow_ips" not in options
+
+    def test_trusted_proxies(self, monkeypatch):
+        """Con proxies de confianza gunicorn acepta sus encabezados X-Forwarded-*"""
+        monkeypatch.setattr(Config, "TRUSTED_PROXIES", 1)
+        monkeypatch.setattr(Config, "FORWARDED_ALLOW_IPS", "10.0.0.1")
+
+        assert server.server_options(workers=2)["forwarded_allow_ips"] == "10.0.0.1"
+
+    def test_asgi_options(self):
+        """ASGI usa workers de uvicorn"""
+        options = server.server_options(asgi=True)
+
+        assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+        assert "threads" not in options
+
+
+class TestPreload:
+    """Tests para preload, post_fork y warm_worker"""
+
+    def test_preload_shares_tables_and_freezes(self, app, fresh_tables):
+        """Crea las tablas compartidas, cierra conexiones y congela el GC"""
+        from app import ratelimit, resizer, tokens
+
+        with app.app_context():
+            with db.engine.connect():
+                pass
+        try:
+            server.preload(app)
+
+            assert tokens._revoked is not None
+            assert ratelimit._limiters is not None
+            assert resizer._cache is not None
+            assert gc.get_freeze_count() > 0
+            with app.app_context():
+                assert db.engine.pool.checkedin() == 0
+        finally:
+            gc.unfreeze()
+
+    def test_post_fork_discards_pool(self, app):
+        """El worker empieza con un pool vacío"""
+        with app.app_context():
+            with db.engine.connect():
+                pass
+
+        server.post_fork(app)
+
+        with app.app_context():
+            assert db.engine.pool.checkedin() == 0
+
+    def test_warm_worker(self, app, test_place, monkeypatch):
+        """Deja una conexión en el pool y pide las rutas de calentamiento"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 0)
+        monkeypatch.setattr(Config, "WARMUP_PATHS", "/api/places/counts, /api/places")
+        requested = []
+        app.before_request(lambda: requested.append(request.path))
+
+        server.warm_worker(app)
+
+        assert requested == ["/api/places/counts", "/api/places"]
+        with app.app_context():
+            assert db.engine.pool.checkedin() >= 1
+
+
+    def test_warm_worker_skips_automatic_hash_pool(self, app, monkeypatch):
+        """En automático no arranca procesos de hash por adelantado"""
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", -1)
+        monkeypatch.setattr(Config, "WARMUP_PATHS", "")
+        warmed = []
+        monkeypatch.setattr(server, "warm_up_passwords", lambda: warmed.append(1))
+
+        server.warm_worker(app)
+        assert warmed == []
+
+        monkeypatch.setattr(Config, "PASSWORD_HASH_WORKERS", 2)
+        server.warm_worker(app)
+        assert warmed == [1]
+
+    def test_password_pool_size(self, monkeypatch):
+        """Los núcleos se reparten entre los workers, con al menos un proceso"""
+        monkeypatch.setattr(server.os, "cpu_count", lambda: 8)
+
+        assert server.password_pool_size(2) == 4
+        assert server.password_pool_size(17) == 1
+
+    def test_worker_exited_removes_stacks(self, tmp_path, monkeypatch):
+        """Al terminar un worker se borran sus pilas muestreadas"""
+        monkeypatch.setattr(Config, "SAMPLER_DIR", str(tmp_path))
+        (tmp_path / "stacks-4242.folded").write_text("f (app.py:1) 1\n")
+
+        server.worker_exited(4242)
+
+        assert not (tmp_path / "stacks-4242.folded").exists()
+
+
+class TestServeCommand:
+    """Tests para el comando serve"""
+
+    def test_requires_gunicorn(self, runner, monkeypatch):
+        """Sin gunicorn el comando falla con un mensaje claro"""
+        monkeypatch.setattr(server, "BaseApplication", None)
+
+        result = runner.invoke(args=["serve"])
+
+        assert result.exit_code != 0
+        assert "gunicorn" in result.output
@@ -0,0 +1,231 @@
+"""
+Tests unitarios para app.slowqueries
+
+Prueba el registro de consultas lentas:
+- fingerprint y redact_parameters
+- FingerprintStats
+- Registro de consultas lentas y captura del plan
+- GET/DELETE /api/admin/queries
+"""
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool
+from app import slowqueries
+from app.config import Config
+from app.db.models import db
+from app.slowqueries import FingerprintStats, fingerprint, get_query_stats, redact_parameters, schedule_explain
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    """Cada test empieza con estadísticas vacías"""
+    monkeypatch.setattr(slowqueries, "_stats", None)
+    monkeypatch.setattr(slowqueries, "_explained_at", {})
+
+
+@pytest.fixture
+def everything_slow(monkeypatch):
+    """Toda consulta cuenta como lenta"""
+    monkeypatch.setattr(Config, "SLOW_QUERY_MS", 1e-9)
+
+
+class TestFingerprint:
+    """Tests para fingerprint"""
+
+    def test_literals_and_parameters(self):
+        """Los literales y los marcadores de parámetros se normalizan"""
+        _, first = fingerprint("SELECT * FROM places WHERE rating > 4 AND name = 'Tacos'")
+        _, second = fingerprint("SELECT *  FROM places\n WHERE rating > %(rating)s AND name = :name")
+
+        assert first == second == "SELECT * FROM places WHERE rating > ? AND name = ?"
+
+    def test_in_lists(self):
+        """Las listas IN de cualquier tamaño comparten huella"""
+        assert fingerprint("SELECT 1 FROM users WHERE id IN (?, ?)")[0] == \
+            fingerprint("SELECT 1 FROM users WHERE id IN (?, ?, ?, ?)")[0]
+
+    def test_keeps_identifiers(self):
+        """Los números dentro de identificadores no se alteran"""
+        _, query = fingerprint("SELECT count(*) AS count_1 FROM places AS anon_1")
+
+        assert query == "SELECT count(*) AS count_1 FROM places AS anon_1"
+
+
+class TestRedactParameters:
+    """Tests para redact_parameters"""
+
+    def test_redacts_text(self):
+        """Los textos se reemplazan por su longitud; números y nulos se conservan"""
+        assert redact_parameters(("juan@alumnos.udg.mx", 5, None, 2.5)) == ["<str:19>", 5, None, 2.5]
+
+    def test_dict(self):
+        """Los parámetros con nombre conservan sus llaves"""
+        assert redact_parameters({"password_hash": "scrypt$abc", "limit": 10}) == {"password_hash": "<str:10>", "limit": 10}
+
+
+class TestFingerprintStats:
+    """Tests para FingerprintStats"""
+
+    def test_aggregates(self):
+        """Acumula conteo, total y máximo por huella"""
+        stats = FingerprintStats(10)
+        stats.record("a", "SELECT ?", 0.1, False)
+        stats.record("a", "SELECT ?", 0.3, True)
+
+        (entry,) = stats.top()
+        assert entry["count"] == 2
+        assert entry["slow"] == 1
+        assert entry["total_seconds"] == pytest.approx(0.4)
+        assert entry["max_seconds"] == pytest.approx(0.3)
+        assert entry["mean_seconds"] == pytest.approx(0.2)
+
+    def test_bounded(self):
+        """Las huellas que no caben se agregan en una sola entrada"""
+        stats = FingerprintStats(1)
+        stats.record("a", "SELECT 1", 0.1, False)
+        stats.record("b", "SELECT 2", 0.1, False)
+        stats.record("c", "SELECT 3", 0.1, False)
+
+        assert {entry["fingerprint"]: entry["count"] for entry in stats.top()} == {"a": 1, "otras": 2}
+
+    def test_order(self):
+        """Ordena por el campo pedido"""
+        stats = FingerprintStats(10)
+        stats.record("frecuente", "", 0.01, False)
+        stats.record("frecuente", "", 0.01, False)
+        stats.record("lenta", "", 1.0, True)
+
+        assert [e["fingerprint"] for e in stats.top(order="count")] == ["frecuente", "lenta"]
+        assert [e["fingerprint"] for e in stats.top(1)] == ["lenta"]
+
+
+class TestSlowQueryLog:
+    """Tests para el registro de consultas lentas"""
+
+    def test_records_every_statement(self, app):
+        """Cada ejecución suma a las estadísticas de su huella"""
+        db.session.execute(text("SELECT 1"))
+        db.session.execute(text("SELECT 2"))
+
+        entries = {e["query"]: e for e in get_query_stats().top()}
+        assert entries["SELECT ?"]["count"] == 2
+
+    def test_logs_slow_query_with_route(self, client, caplog, everything_slow, test_user):
+        """El log incluye huella, duración, ruta y parámetros redactados"""
+        with caplog.at_level(logging.WARNING, logger="app.slowqueries"):
+            client.post("/api/login", data={"email": "testuser@alumnos.udg.mx", "password": "password123"})
+
+        message = next(r.getMessage() for r in caplog.records if "FROM users" in r.getMessage())
+        assert "en POST /api/login" in message
+        assert "<str:23>" in message
+        assert "testuser@alumnos.udg.mx" not in message
+
+    def test_fast_queries_are_not_logged(self, app, caplog):
+        """Por debajo del umbral no hay registro"""
+        with caplog.at_level(logging.WARNING, logger="app.slowqueries"):
+            db.session.execute(text("SELECT 1"))
+
+        assert caplog.text == ""
+
+    def test_disabled(self, app, monkeypatch):
+        """QUERY_FINGERPRINTS=0 no mide las consultas"""
+        monkeypatch.setattr(Config, "QUERY_FINGERPRINTS", False)
+        get_query_stats().reset()
+
+        db.session.execute(text("SELECT 1"))
+
+        assert get_query_stats().top() == []
+
+
+class TestExplain:
+    """Tests para la captura del plan"""
+
+    def test_captures_plan(self, app, monkeypatch):
+        """El plan se captura en segundo plano y queda en las estadísticas"""
+        monkeypatch.setitem(slowqueries.EXPLAIN_PREFIXES, "sqlite", "EXPLAIN QUERY PLAN ")
+        key, _ = fingerprint("SELECT * FROM places WHERE category = ?")
+
+        get_query_stats().record(key, "", 1.0, True)
+        future = schedule_explain(db.engine, key, "SELECT * FROM places WHERE category = ?", ("Snacks",))
+        future.result()
+
+        entry = next(e for e in get_query_stats().top() if e["fingerprint"] == key)
+        assert "SCAN places" in entry["plan"]
+
+    def test_once_per_interval(self, app, monkeypatch):
+        """La misma consulta se analiza a lo sumo una vez por intervalo"""
+        monkeypatch.setitem(slowqueries.EXPLAIN_PREFIXES, "sqlite", "EXPLAIN QUERY PLAN ")
+
+        first = schedule_explain(db.engine, "k", "SELECT 1", ())
+        second = schedule_explain(db.engine, "k", "SELECT 1", ())
+
+        first.result()
+        assert second is None
+
+    def test_pooled_connection_is_not_marked(self, app, tmp_path, monkeypatch):
+        """Tras el EXPLAIN, las consultas en la misma conexión del pool se registran"""
+        monkeypatch.setitem(slowqueries.EXPLAIN_PREFIXES, "sqlite", "EXPLAIN QUERY PLAN ")
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1, max_overflow=0)
+
+        schedule_explain(engine, "k", "SELECT 1", ()).result()
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+        engine.dispose()
+
+        entries = {e["query"]: e for e in get_query_stats().top()}
+        assert entries["SELECT ?"]["count"] == 1
+        assert not any(query.startswith("EXPLAIN") for query in entries)
+
+    def test_only_selects(self, app, monkeypatch):
+        """Las sentencias que modifican datos no se analizan"""
+        monkeypatch.setitem(slowqueries.EXPLAIN_PREFIXES, "sqlite", "EXPLAIN QUERY PLAN ")
+
+        assert schedule_explain(db.engine, "k", "DELETE FROM places", ()) is None
+
+    def test_skips_async_engines(self, app, monkeypatch):
+        """Las consultas del engine asíncrono (modo ASGI) no se analizan"""
+        monkeypatch.setitem(slowqueries.EXPLAIN_PREFIXES, "sqlite", "EXPLAIN QUERY PLAN ")
+        engine = create_async_engine("sqlite+aiosqlite://")
+
+        assert schedule_explain(engine.sync_engine, "k", "SELECT 1", ()) is None
+
+    def test_only_postgresql(self, app):
+        """En otros dialectos no se captura plan"""
+        assert schedule_explain(db.engine, "k", "SELECT 1", ()) is None
+
+
+class TestQueriesEndpoint:
+    """Tests para /api/admin/queries"""
+
+    def test_list(self, client, admin_token, test_place):
+        """Retorna las consultas ordenadas por tiempo total"""
+        client.get(f"/api/places/{test_place.id}")
+
+        response = client.get("/api/admin/queries?limit=5", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert 0 < len(response.json) <= 5
+        totals = [e["total_seconds"] for e in response.json]
+        assert totals == sorted(totals, reverse=True)
+        assert any("FROM places" in e["query"] for e in response.json)
+
+    def test_invalid_order(self, client, admin_token):
+        """Un orden desconocido responde 400"""
+        response = client.get("/api/admin/queries?order=foo", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 400
+
+    def test_reset(self, client, admin_token, test_place):
+        """DELETE reinicia las estadísticas"""
+        client.get(f"/api/places/{test_place.id}")
+
+        response = client.delete("/api/admin/queries", headers={"X-Admin-Token": admin_token})
+
+        assert response.status_code == 200
+        assert get_query_stats().top() == []
+
+    def test_requires_admin(self, client, admin_token):
+        """Requiere el token de administración"""
+        assert client.get("/api/admin/queries").status_code == 403
@@ -0,0 +1,267 @@
+"""
+Tests unitarios para app.storage
+
+Prueba los backends de almacenamiento:
+- StorageBackend (interfaz)
+- LocalStorage
+- S3Storage (contra moto)
+- GET /uploads/<filename> con almacenamiento remoto
+"""
+import pytest
+import hashlib
+import os
+from io import BytesIO
+from werkzeug.datastructures import FileStorage
+from app.config import Config
+from app.storage import StorageBackend, get_storage
+from app.storage.local import LocalStorage
+from app.routes.uploads import save_upload_file
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+
+
+def write_temp(folder, content):
+    """Helper que escribe un temporal listo para save()"""
+    path = os.path.join(folder, "subida.part")
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture
+def s3(monkeypatch, upload_folder):
+    """Configura el backend S3 contra un bucket simulado con moto"""
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="cucei-foods")
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "s3")
+        monkeypatch.setattr(Config, "S3_BUCKET", "cucei-foods")
+        monkeypatch.setattr(Config, "S3_REGION", "us-east-1")
+        monkeypatch.setattr(Config, "IMAGE_PROCESSING", False)
+        # Forzar un cliente nuevo dentro del mock
+        monkeypatch.setattr("app.storage._s3_storage", None)
+        yield get_storage()
+
+
+class TestStorageBackend:
+    """Tests para la interfaz StorageBackend"""
+
+    def test_incomplete_backend_fails_on_instantiation(self):
+        """Un backend sin todos los métodos no puede instanciarse"""
+        class Incomplete(StorageBackend):
+            def exists(self, name):
+                return False
+
+        with pytest.raises(TypeError, match="abstract"):
+            Incomplete()
+
+
+class TestLocalStorage:
+    """Tests para LocalStorage"""
+
+    def test_save_and_open(self, tmp_path):
+        """Mueve el temporal a su nombre final"""
+        storage = LocalStorage(str(tmp_path))
+
+        storage.save("a.png", write_temp(tmp_path, PNG))
+
+        assert storage.exists("a.png")
+        with storage.open("a.png") as f:
+            assert f.read() == PNG
+        assert not os.path.exists(tmp_path / "subida.part")
+
+    def test_stat_and_iter_files(self, tmp_path):
+        """Lista los archivos ignorando los temporales"""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("a.png", write_temp(tmp_path, PNG))
+        (tmp_path / "en_curso.part").write_bytes(b"x")
+
+        files = list(storage.iter_files())
+
+        assert [f.name for f in files] == ["a.png"]
+        assert storage.stat("a.png").size == len(PNG)
+        assert storage.stat("b.png") is None
+
+    def test_delete(self, tmp_path):
+        """Elimina archivos sin fallar si no existen"""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("a.png", write_temp(tmp_path, PNG))
+
+        storage.delete("a.png")
+        storage.delete("a.png")
+
+        assert not storage.exists("a.png")
+
+    def test_quarantine(self, tmp_path):
+        """Mueve el archivo a una subcarpeta que no se lista"""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("a.png", write_temp(tmp_path, PNG))
+
+        storage.quarantine("a.png", "quarantine")
+
+        assert not storage.exists("a.png")
+        assert (tmp_path / "quarantine" / "a.png").read_bytes() == PNG
+        assert list(storage.iter_files()) == []
+
+    def test_touch(self, tmp_path):
+        """touch renueva la fecha de modificación y no falla si el archivo no existe"""
+        storage = LocalStorage(str(tmp_path))
+        storage.save("a.png", write_temp(tmp_path, PNG))
+        os.utime(tmp_path / "a.png", (0, 0))
+
+        storage.touch("a.png")
+        storage.touch("no-existe.png")
+
+        assert storage.stat("a.png").modified > 0
+
+    def test_rejects_path_traversal(self, tmp_path):
+        """No permite nombres fuera del directorio"""
+        storage = LocalStorage(str(tmp_path / "uploads"))
+
+        assert storage.local_path("../secreto") is None
+        assert not storage.exists("../secreto")
+        with pytest.raises(ValueError):
+            storage.open("../secreto")
+
+    def test_unknown_backend(self, monkeypatch):
+        """Falla con un backend desconocido"""
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "ftp")
+
+        with pytest.raises(ValueError):
+            get_storage()
+
+
+class TestS3Storage:
+    """Tests para S3Storage"""
+
+    def test_save_open_and_stat(self, s3, tmp_path):
+        """Sube un archivo y lo lee de vuelta"""
+        s3.save("a.png", write_temp(tmp_path, PNG))
+
+        assert s3.exists("a.png")
+        assert s3.stat("a.png").size == len(PNG)
+        with s3.open("a.png") as f:
+            assert f.read() == PNG
+        assert b"".join(s3.iter_chunks("a.png")) == PNG
+        assert not os.path.exists(tmp_path / "subida.part")
+
+    def test_missing_object(self, s3):
+        """Un objeto inexistente no existe"""
+        assert not s3.exists("nada.png")
+        assert s3.stat("nada.png") is None
+
+    def test_content_type_and_cache_control(self, s3, tmp_path):
+        """Guarda el tipo de contenido y el Cache-Control inmutable"""
+        name = "b" * 64 + ".png"
+        s3.save(name, write_temp(tmp_path, PNG))
+
+        head = s3.client.head_object(Bucket="cucei-foods", Key=f"uploads/{name}")
+
+        assert head["ContentType"] == "image/png"
+        assert "immutable" in head["CacheControl"]
+
+    def test_multipart_upload(self, s3, tmp_path):
+        """Los archivos grandes se suben en varias partes"""
+        s3.transfer_config.multipart_threshold = 5 * 1024 * 1024
+        s3.transfer_config.multipart_chunksize = 5 * 1024 * 1024
+        content = os.urandom(11 * 1024 * 1024)
+
+        s3.save("grande.png", write_temp(tmp_path, content))
+
+        head = s3.client.head_object(Bucket="cucei-foods", Key="uploads/grande.png")
+        assert head["ETag"].strip('"').endswith("-3")
+        assert s3.stat("grande.png").size == len(content)
+
+    def test_iter_files_and_delete(self, s3, tmp_path):
+        """Lista solo los objetos bajo el prefijo"""
+        s3.save("a.png", write_temp(tmp_path, PNG))
+        s3.client.put_object(Bucket="cucei-foods", Key="otros/x.png", Body=b"x")
+
+        assert [f.name for f in s3.iter_files()] == ["a.png"]
+
+        s3.delete("a.png")
+        assert list(s3.iter_files()) == []
+
+    def test_quarantine(self, s3, tmp_path):
+        """Copia el objeto bajo el prefijo de cuarentena y lo elimina"""
+        s3.save("a.png", write_temp(tmp_path, PNG))
+
+        s3.quarantine("a.png", "quarantine")
+
+        assert not s3.exists("a.png")
+        assert list(s3.iter_files()) == []
+        body = s3.client.get_object(Bucket="cucei-foods", Key="uploads/quarantine/a.png")["Body"]
+        assert body.read() == PNG
+
+    def test_touch_keeps_metadata(self, s3, tmp_path, monkeypatch):
+        """touch copia el objeto sobre sí mismo sin perder tipo ni Cache-Control"""
+        s3.cache_control = lambda name: "public, max-age=60"
+        s3.save("a.png", write_temp(tmp_path, PNG))
+        before = s3.stat("a.png").modified
+        copies = []
+        copy_object = s3.client.copy_object
+        monkeypatch.setattr(s3.client, "copy_object", lambda **kwargs: copies.append(kwargs) or copy_object(**kwargs))
+
+        s3.touch("a.png")
+
+        assert copies[0]["MetadataDirective"] == "REPLACE"
+        head = s3.client.head_object(Bucket="cucei-foods", Key="uploads/a.png")
+        assert head["ContentType"] == "image/png"
+        assert head["CacheControl"] == "public, max-age=60"
+        assert s3.stat("a.png").modified >= before
+        assert s3.open("a.png").read() == PNG
+
+    def test_read_url(self, s3):
+        """Genera URLs firmadas de lectura"""
+        url = s3.read_url("a.png", 60)
+
+        assert "uploads/a.png" in url
+        assert "Signature" in url or "X-Amz-Signature" in url
+
+
+class TestS3Uploads:
+    """Tests de save_upload_file y GET /uploads con S3"""
+
+    def test_save_upload_file_to_s3(self, s3, upload_folder):
+        """Los uploads se guardan en el bucket y no en disco"""
+        url = save_upload_file(FileStorage(stream=BytesIO(PNG), filename="foto.png"))
+
+        name = url.rsplit("/", 1)[1]
+        assert name == f"{hashlib.sha256(PNG).hexdigest()}.png"
+        assert s3.exists(name)
+        assert os.listdir(upload_folder) == []
+
+    def test_get_upload_presigned_redirect(self, client, s3):
+        """Redirige a una URL firmada"""
+        url = save_upload_file(FileStorage(stream=BytesIO(PNG), filename="foto.png"))
+
+        response = client.get(url)
+
+        assert response.status_code == 302
+        assert "X-Amz-Signature" in response.headers["Location"] or "Signature" in response.headers["Location"]
+
+    def test_get_upload_proxy(self, client, s3, monkeypatch):
+        """En modo proxy retransmite el contenido y soporta 304"""
+        monkeypatch.setattr(Config, "STORAGE_READ_MODE", "proxy")
+        url = save_upload_file(FileStorage(stream=BytesIO(PNG), filename="foto.png"))
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.data == PNG
+        assert "immutable" in response.headers["Cache-Control"]
+
+        cached = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        assert cached.status_code == 304
+
+    def test_get_missing_upload_proxy(self, client, s3, monkeypatch):
+        """En modo proxy retorna 404 si el objeto no existe"""
+        monkeypatch.setattr(Config, "STORAGE_READ_MODE", "proxy")
+
+        assert client.get("/uploads/nada.png").status_code == 404
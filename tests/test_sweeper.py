@@ -0,0 +1,163 @@
+"""
+Tests unitarios para app.sweeper
+
+Prueba el barrido de uploads huérfanos:
+- sweep_uploads(dry_run, action, grace_seconds, batch_size)
+- flask sweep-uploads
+"""
+import pytest
+import os
+import time
+from app.db.models import db, Place
+from app import sweeper
+from app.storage import get_storage
+from app.storage.local import LocalStorage
+from app.sweeper import sweep_uploads
+
+
+def make_upload(folder, name, age=7 * 24 * 3600):
+    """Helper que crea un archivo subido con la antigüedad indicada"""
+    path = folder / name
+    path.write_bytes(b"imagen")
+    modified = time.time() - age
+    os.utime(path, (modified, modified))
+    return path
+
+
+def add_place(image_url):
+    """Helper que crea un lugar con la imagen indicada"""
+    place = Place(name="Con foto", schedule={}, category="Snacks", image_url=image_url)
+    db.session.add(place)
+    db.session.commit()
+    return place
+
+
+class TestSweepUploads:
+    """Tests para sweep_uploads"""
+
+    def test_dry_run_reports_without_changes(self, app, upload_folder):
+        """La simulación reporta los huérfanos sin tocarlos"""
+        add_place("/uploads/usada.png")
+        make_upload(upload_folder, "usada.png")
+        make_upload(upload_folder, "vieja.png")
+
+        report = sweep_uploads(dry_run=True)
+
+        assert report["scanned"] == 2
+        assert report["referenced"] == 1
+        assert report["orphans"] == ["vieja.png"]
+        assert report["orphaned_bytes"] == len(b"imagen")
+        assert (upload_folder / "vieja.png").exists()
+
+    def test_keeps_variants_of_referenced_images(self, app, upload_folder):
+        """Las variantes siguen vivas mientras su original esté referenciado"""
+        add_place("/uploads/foto.jpg")
+        make_upload(upload_folder, "foto.jpg")
+        make_upload(upload_folder, "foto_sm.webp")
+        make_upload(upload_folder, "otra_sm.webp")
+
+        report = sweep_uploads(dry_run=True)
+
+        assert report["orphans"] == ["otra_sm.webp"]
+
+    def test_grace_period(self, app, upload_folder):
+        """Los archivos recientes no se retiran"""
+        make_upload(upload_folder, "recien.png", age=60)
+
+        report = sweep_uploads(dry_run=True, grace_seconds=3600)
+
+        assert report["recent"] == 1
+        assert report["orphans"] == []
+
+    def test_quarantine(self, app, upload_folder):
+        """La cuarentena mueve el archivo fuera de los uploads servidos"""
+        make_upload(upload_folder, "vieja.png")
+
+        sweep_uploads(dry_run=False, action="quarantine")
+
+        assert not (upload_folder / "vieja.png").exists()
+        assert (upload_folder / "quarantine" / "vieja.png").exists()
+        assert sweep_uploads(dry_run=True)["scanned"] == 0
+
+    def test_delete(self, app, upload_folder):
+        """Elimina los huérfanos con la acción delete"""
+        add_place("/uploads/usada.png")
+        make_upload(upload_folder, "usada.png")
+        make_upload(upload_folder, "vieja.png")
+
+        sweep_uploads(dry_run=False, action="delete")
+
+        assert os.listdir(upload_folder) == ["usada.png"]
+
+    def test_keeps_orphan_reused_during_sweep(self, app, upload_folder, monkeypatch):
+        """Un huérfano renovado por un duplicado después de listarlo se conserva"""
+        path = make_upload(upload_folder, "vieja.png")
+        listed = list(get_storage().iter_files())
+        os.utime(path)
+        monkeypatch.setattr(LocalStorage, "iter_files", lambda self: iter(listed))
+
+        report = sweep_uploads(dry_run=False, action="delete")
+
+        assert report["orphans"] == []
+        assert report["recent"] == 1
+        assert path.exists()
+
+    def test_keeps_orphan_referenced_during_sweep(self, app, upload_folder, monkeypatch):
+        """Un huérfano que un lugar empieza a usar después de revisar su lote se conserva"""
+        make_upload(upload_folder, "vieja.png")
+        referenced_urls = sweeper._referenced_urls
+        calls = []
+
+        def referenced_then_used(urls):
+            result = referenced_urls(urls)
+            if not calls:
+                add_place("/uploads/vieja.png")
+            calls.append(urls)
+            return result
+
+        monkeypatch.setattr(sweeper, "_referenced_urls", referenced_then_used)
+
+        report = sweep_uploads(dry_run=False, action="delete")
+
+        assert report["orphans"] == []
+        assert (upload_folder / "vieja.png").exists()
+
+    def test_batches(self, app, upload_folder):
+        """Revisa el almacenamiento en varios lotes"""
+        add_place("/uploads/f3.png")
+        for i in range(7):
+            make_upload(upload_folder, f"f{i}.png")
+
+        report = sweep_uploads(dry_run=True, batch_size=2)
+
+        assert report["scanned"] == 7
+        assert report["referenced"] == 1
+        assert len(report["orphans"]) == 6
+
+    def test_unknown_action(self, app, upload_folder):
+        """Rechaza acciones desconocidas"""
+        with pytest.raises(ValueError):
+            sweep_uploads(action="shred")
+
+
+class TestSweepCommand:
+    """Tests para flask sweep-uploads"""
+
+    def test_sweep_command_dry_run(self, app, runner, upload_folder):
+        """Por defecto solo lista los huérfanos"""
+        make_upload(upload_folder, "vieja.png")
+
+        result = runner.invoke(args=["sweep-uploads"])
+
+        assert result.exit_code == 0
+        assert "vieja.png" in result.output
+        assert (upload_folder / "vieja.png").exists()
+
+    def test_sweep_command_apply(self, app, runner, upload_folder):
+        """Con --apply retira los huérfanos"""
+        make_upload(upload_folder, "vieja.png")
+
+        result = runner.invoke(args=["sweep-uploads", "--apply", "--action", "delete", "--grace-hours", "1"])
+
+        assert result.exit_code == 0
+        assert not (upload_folder / "vieja.png").exists()
@@ -0,0 +1,185 @@
+"""
+Tests unitarios para app.tokens
+
+Prueba los tokens de acceso:
+- issue_token / decode_token
+- RevocationList
+- POST /api/login, POST /api/logout y escrituras de comentarios con token
+"""
+import pytest
+import os
+import time
+from sqlalchemy import event
+from app.config import Config
+from app.db.models import db, Comment
+from app.tokens import RevocationList, decode_token, issue_token, revoke_token
+
+
+def login(client):
+    """Helper que inicia sesión con test_user y retorna el encabezado Authorization"""
+    response = client.post('/api/login', data={
+        'email': 'testuser@alumnos.udg.mx',
+        'password': 'password123'
+    })
+    return {"Authorization": f"Bearer {response.json['access_token']}"}
+
+
+class TestIssueToken:
+    """Tests para issue_token y decode_token"""
+
+    def test_roundtrip(self):
+        """Un token emitido se verifica con sus claims"""
+        issued = issue_token("u1", "Ana")
+
+        claims = decode_token(issued["access_token"])
+
+        assert claims["sub"] == "u1"
+        assert claims["name"] == "Ana"
+        assert issued["token_type"] == "Bearer"
+        assert issued["expires_in"] == Config.TOKEN_TTL
+
+    def test_tampered_payload(self):
+        """Rechaza un token con el payload modificado"""
+        payload, signature = issue_token("u1")["access_token"].split(".")
+        other = issue_token("u2")["access_token"].split(".")[0]
+
+        assert decode_token(f"{other}.{signature}") is None
+
+    def test_other_secret(self, monkeypatch):
+        """Rechaza tokens firmados con otro secreto"""
+        token = issue_token("u1")["access_token"]
+        monkeypatch.setattr(Config, "TOKEN_SECRET", "otro-secreto")
+
+        assert decode_token(token) is None
+
+    def test_expired(self, monkeypatch):
+        """Rechaza tokens expirados"""
+        monkeypatch.setattr(Config, "TOKEN_TTL", -1)
+
+        assert decode_token(issue_token("u1")["access_token"]) is None
+
+    @pytest.mark.parametrize("token", [None, "", "basura", "a.b.c", "ñ.ñ", "e30.x"])
+    def test_malformed(self, token):
+        """Rechaza tokens mal formados sin excepciones"""
+        assert decode_token(token) is None
+
+    def test_revoked(self):
+        """Rechaza tokens revocados"""
+        token = issue_token("u1")["access_token"]
+
+        revoke_token(decode_token(token))
+
+        assert decode_token(token) is None
+
+
+class TestRevocationList:
+    """Tests para RevocationList"""
+
+    def test_add_and_contains(self):
+        """Contiene los tokens revocados hasta su expiración"""
+        revoked = RevocationList(64)
+
+        revoked.add("vigente", time.time() + 60)
+        revoked.add("expirado", time.time() - 60)
+
+        assert "vigente" in revoked
+        assert "expirado" not in revoked
+        assert "otro" not in revoked
+
+    def test_saturated_table_keeps_latest(self):
+        """Con la tabla llena sacrifica la revocación que expira antes"""
+        revoked = RevocationList(4)
+        for i in range(4):
+            revoked.add(f"t{i}", time.time() + 60 + i)
+
+        revoked.add("nuevo", time.time() + 600)
+
+        assert "nuevo" in revoked
+        assert sum(f"t{i}" in revoked for i in range(4)) == 3
+
+    def test_shared_file(self, tmp_path):
+        """Dos instancias sobre el mismo archivo comparten las revocaciones"""
+        path = str(tmp_path / "revoked")
+        first, second = RevocationList(64, path), RevocationList(64, path)
+
+        first.add("jti", time.time() + 60)
+
+        assert "jti" in second
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="Requiere fork")
+    def test_shared_after_fork(self):
+        """Un proceso hijo revoca y el padre lo ve sin archivo"""
+        revoked = RevocationList(64)
+
+        pid = os.fork()
+        if pid == 0:
+            revoked.add("del-hijo", time.time() + 60)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        assert "del-hijo" in revoked
+
+
+class TestTokenEndpoints:
+    """Tests para login, logout y comentarios con token"""
+
+    def test_login_returns_token(self, client, test_user):
+        """El login emite un token del usuario"""
+        response = client.post('/api/login', data={
+            'email': 'testuser@alumnos.udg.mx',
+            'password': 'password123'
+        })
+
+        claims = decode_token(response.json["access_token"])
+        assert claims["sub"] == test_user.id
+        assert response.json["token_type"] == "Bearer"
+
+    def test_logout_revokes_token(self, client, test_user, test_place):
+        """Tras el logout el token ya no autoriza escrituras"""
+        headers = login(client)
+
+        assert client.post('/api/logout', headers=headers).status_code == 200
+
+        response = client.post(f"/api/places/{test_place.id}/comments", data={'text': 'Hola'}, headers=headers)
+        assert response.status_code == 401
+
+    def test_comment_requires_token(self, client, test_user, test_place):
+        """Rechaza comentarios sin token"""
+        response = client.post(f"/api/places/{test_place.id}/comments", data={
+            'user_id': test_user.id,
+            'text': 'Hola'
+        })
+
+        assert response.status_code == 401
+
+    def test_comment_author_from_token(self, client, app, test_user, test_place, auth_headers):
+        """El autor sale del token, no del formulario"""
+        response = client.post(f"/api/places/{test_place.id}/comments", data={
+            'user_id': 'otro-usuario',
+            'text': 'Hola'
+        }, headers=auth_headers)
+
+        assert db.session.get(Comment, response.json["id"]).user_id == test_user.id
+
+    def test_comment_write_skips_user_lookup(self, client, app, test_place, auth_headers):
+        """Crear un comentario no consulta la tabla de usuarios"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement.lower())
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            response = client.post(f"/api/places/{test_place.id}/comments", data={'text': 'Hola'}, headers=auth_headers)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert response.status_code == 201
+        assert not any("from users" in s for s in statements)
+
+    def test_only_author_can_edit(self, client, test_comment):
+        """Otro usuario no puede editar ni eliminar el comentario"""
+        headers = {"Authorization": f"Bearer {issue_token('otro-usuario')['access_token']}"}
+
+        assert client.put(f"/api/comments/{test_comment.id}", json={'text': 'x'}, headers=headers).status_code == 403
+        assert client.delete(f"/api/comments/{test_comment.id}", headers=headers).status_code == 403
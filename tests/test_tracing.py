@@ -0,0 +1,224 @@
+"""
+Tests unitarios para app.tracing
+
+Prueba las trazas de las peticiones:
+- span, traced y start_trace (incluido el encabezado traceparent)
+- Spans de la petición: manejador, SQL (también si falla), update_place_rating, guardado y serialización
+- Exportación a archivo en formato Zipkin
+"""
+import json
+from io import BytesIO
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from werkzeug.datastructures import FileStorage
+from app import tracing
+from app.config import Config
+from app.db.models import db
+from app.routes.uploads import save_upload_file
+from app.tracing import Trace, Span, current_span, finish_trace, span, start_trace, traced, traceparent
+
+INCOMING = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Exporta las trazas a un archivo temporal"""
+    path = tmp_path / "trazas.jsonl"
+    monkeypatch.setattr(Config, "TRACE_FILE", str(path))
+    monkeypatch.setattr(Config, "TRACE_COLLECTOR_URL", "")
+    monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 1.0)
+    return path
+
+
+def exported(path) -> list:
+    """Spans escritos en el archivo de trazas"""
+    tracing.flush()
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestSpans:
+    """Tests para span, traced y start_trace"""
+
+    def test_noop_without_trace(self):
+        """Sin traza activa span no crea nada"""
+        with span("suelto") as created:
+            assert created is None
+        assert current_span() is None
+
+    def test_nesting(self, monkeypatch):
+        """Los spans hijos apuntan a su padre y comparten traza"""
+        monkeypatch.setattr(tracing, "export", lambda spans: None)
+        root, token = start_trace("raiz")
+        with span("hijo", clave="valor") as child:
+            with span("nieto") as grandchild:
+                assert current_span() is grandchild
+        finish_trace(root, token)
+
+        assert child.parent_id == root.span_id
+        assert grandchild.parent_id == child.span_id
+        assert [s.name for s in root.trace.spans] == ["nieto", "hijo", "raiz"]
+        assert child.to_zipkin()["tags"] == {"clave": "valor"}
+        assert current_span() is None
+
+    def test_error_tag(self):
+        """Una excepción dentro del span queda registrada"""
+        root = Span(Trace(), "raiz")
+        token = tracing._current.set(root)
+        try:
+            with pytest.raises(ValueError):
+                with span("falla") as failing:
+                    raise ValueError("x")
+        finally:
+            tracing._current.reset(token)
+
+        assert failing.attributes["error"] == "ValueError"
+        assert failing.end_ns is not None
+
+    def test_traced_decorator(self):
+        """traced envuelve la función en un span solo si hay traza"""
+        @traced("trabajo")
+        def work():
+            return current_span()
+
+        assert work() is None
+        root = Span(Trace(), "raiz")
+        token = tracing._current.set(root)
+        try:
+            inner = work()
+        finally:
+            tracing._current.reset(token)
+        assert inner.name == "trabajo"
+
+    def test_continues_incoming_trace(self):
+        """Un traceparent válido continúa la traza del llamador"""
+        root, token = start_trace("raiz", INCOMING)
+        tracing._current.reset(token)
+
+        assert root.trace.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert root.parent_id == "b7ad6b7169203331"
+        assert traceparent(root).startswith("00-0af7651916cd43dd8448eb211c80319c-")
+
+    def test_respects_unsampled_flag(self):
+        """Si el llamador no muestrea la traza, tampoco se traza aquí"""
+        assert start_trace("raiz", INCOMING[:-2] + "00") is None
+
+    def test_sample_rate(self, monkeypatch):
+        """Sin traceparent se aplica TRACE_SAMPLE_RATE"""
+        monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 0.0)
+
+        assert start_trace("raiz") is None
+        assert start_trace("raiz", "basura") is None
+
+    def test_untrusted_sampled_flag_uses_sample_rate(self, monkeypatch):
+        """Sin TRACE_TRUST_INCOMING la marca de muestreada no evita TRACE_SAMPLE_RATE"""
+        monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr(Config, "TRACE_TRUST_INCOMING", False)
+
+        assert start_trace("raiz", INCOMING) is None
+
+    def test_trusted_sampled_flag(self, monkeypatch):
+        """Con TRACE_TRUST_INCOMING se sigue la decisión del llamador"""
+        monkeypatch.setattr(Config, "TRACE_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr(Config, "TRACE_TRUST_INCOMING", True)
+
+        root, token = start_trace("raiz", INCOMING)
+        tracing._current.reset(token)
+
+        assert root.trace.trace_id == "0af7651916cd43dd8448eb211c80319c"
+
+
+class TestRequestTracing:
+    """Tests para las trazas de las peticiones"""
+
+    def test_disabled_by_default(self, client, test_place, monkeypatch):
+        """Sin destino no hay traza ni encabezado traceparent"""
+        monkeypatch.setattr(Config, "TRACE_FILE", "")
+        monkeypatch.setattr(Config, "TRACE_COLLECTOR_URL", "")
+
+        response = client.get(f"/api/places/{test_place.id}")
+
+        assert response.status_code == 200
+        assert "traceparent" not in response.headers
+
+    def test_request_spans(self, client, test_place, trace_file):
+        """La petición produce spans de manejador, SQL y serialización"""
+        response = client.get(f"/api/places/{test_place.id}", headers={"traceparent": INCOMING})
+
+        assert response.status_code == 200
+        trace_id = response.headers["traceparent"].split("-")[1]
+        assert trace_id == "0af7651916cd43dd8448eb211c80319c"
+
+        spans = exported(trace_file)
+        by_name = {s["name"]: s for s in spans}
+        root = by_name["GET /api/places/<string:place_id>"]
+        assert root["kind"] == "SERVER"
+        assert root["parentId"] == "b7ad6b7169203331"
+        assert root["tags"]["http.status_code"] == "200"
+        assert by_name["handler"]["parentId"] == root["id"]
+        assert by_name["serialize"]["parentId"] == by_name["handler"]["id"]
+        sql = [s for s in spans if s["name"] == "sql"]
+        assert sql and all(s["parentId"] == by_name["handler"]["id"] for s in sql)
+        assert all("?" in s["tags"]["db.statement"] for s in sql)
+        assert {s["traceId"] for s in spans} == {trace_id}
+
+    def test_target_without_query_string(self, client, trace_file):
+        """http.target no incluye la query string (puede llevar tokens)"""
+        client.get("/api/places?_profile=secreto&category=Snacks")
+
+        root = next(s for s in exported(trace_file) if s.get("kind") == "SERVER")
+        assert root["tags"]["http.target"] == "/api/places"
+
+    def test_failed_statement_span(self, app, trace_file):
+        """Una sentencia que falla cierra su span con la etiqueta de error"""
+        with app.test_request_context():
+            root, token = start_trace("consulta")
+            with pytest.raises(OperationalError):
+                db.session.execute(text("SELECT * FROM no_existe"))
+            db.session.rollback()
+            finish_trace(root, token)
+
+        sql = next(s for s in exported(trace_file) if s["name"] == "sql")
+        assert sql["tags"]["error"] == "OperationalError"
+        assert sql["parentId"] == root.span_id
+
+    def test_rating_span(self, client, test_place, auth_headers, trace_file):
+        """Crear un comentario traza update_place_rating y sus consultas"""
+        response = client.post(f"/api/places/{test_place.id}/comments",
+                               data={"text": "Muy bueno", "rating": "4"}, headers=auth_headers)
+
+        assert response.status_code == 201
+        spans = exported(trace_file)
+        rating = next(s for s in spans if s["name"] == "update_place_rating")
+        assert any(s["name"] == "sql" and s["parentId"] == rating["id"] for s in spans)
+
+    def test_upload_spans(self, app, upload_folder, trace_file):
+        """save_upload_file traza la ingesta y el guardado del archivo"""
+        content = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+        file = FileStorage(stream=BytesIO(content), filename="foto.png", name="file")
+
+        with app.test_request_context():
+            root, token = start_trace("subida")
+            url = save_upload_file(file)
+            finish_trace(root, token)
+
+        spans = {s["name"]: s for s in exported(trace_file)}
+        assert spans["upload.ingest"]["parentId"] == spans["subida"]["id"]
+        assert spans["upload.save"]["tags"]["filename"] == url.rsplit("/", 1)[1]
+
+
+class TestExport:
+    """Tests para la exportación de spans"""
+
+    def test_export_failure_is_logged(self, monkeypatch, caplog):
+        """Un error al exportar no se propaga"""
+        monkeypatch.setattr(Config, "TRACE_FILE", "/nonexistent/dir/trazas.jsonl")
+        root = Span(Trace(), "raiz")
+        root.end()
+
+        tracing.export(root.trace.spans)
+        tracing.flush()
+
+        assert "No se pudieron exportar 1 spans" in caplog.text
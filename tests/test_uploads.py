@@ -8,12 +8,19 @@ Prueba los endpoints y funciones:
 """
 import pytest
 import os
+import hashlib
 from io import BytesIO
 from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
 from app.routes.uploads import allowed_file, save_upload_file
 from app.config import Config
 
 
+def expected_url(content, ext):
+    """Helper para calcular la URL direccionada por contenido"""
+    return f"/uploads/{hashlib.sha256(content).hexdigest()}.{ext}"
+
+
 def create_file_storage(content, filename):
     """Helper para crear FileStorage objects"""
     return FileStorage(
@@ -99,8 +106,8 @@ class TestSaveUploadFile:
         
         result = save_upload_file(file)
         
-        assert result == "/uploads/test_image.png"
-        assert os.path.exists(os.path.join(Config.UPLOAD_FOLDER, 'test_image.png'))
+        assert result == expected_url(file_content, 'png')
+        assert os.path.exists(os.path.join(Config.UPLOAD_FOLDER, result.rsplit('/', 1)[1]))
 
     def test_save_upload_file_jpg(self, upload_folder):
         """Guarda exitosamente un archivo JPG"""
@@ -109,8 +116,8 @@ class TestSaveUploadFile:
         
         result = save_upload_file(file)
         
-        assert result == "/uploads/test_image.jpg"
-        assert os.path.exists(os.path.join(Config.UPLOAD_FOLDER, 'test_image.jpg'))
+        assert result == expected_url(file_content, 'jpg')
+        assert os.path.exists(os.path.join(Config.UPLOAD_FOLDER, result.rsplit('/', 1)[1]))
 
     def test_save_upload_file_gif(self, upload_folder):
         """Guarda exitosamente un archivo GIF"""
@@ -119,7 +126,7 @@ class TestSaveUploadFile:
         
         result = save_upload_file(file)
         
-        assert result == "/uploads/test_image.gif"
+        assert result == expected_url(file_content, 'gif')
 
     def test_save_upload_file_none(self, upload_folder):
         """Retorna string vacío si el archivo es None"""
@@ -197,8 +204,8 @@ class TestSaveUploadFile:
         assert os.path.exists(Config.UPLOAD_FOLDER)
         assert result != ""
 
-    def test_save_upload_file_overwrites_existing(self, upload_folder):
-        """Sobrescribe archivos existentes"""
+    def test_save_upload_file_same_name_does_not_overwrite(self, upload_folder):
+        """Archivos distintos con el mismo nombre no se sobrescriben"""
         file_content1 = b'\x89PNG\r\n\x1a\n' + b'\x00' * 50
         file1 = create_file_storage(file_content1, 'same_name.png')
         
@@ -211,18 +218,77 @@ class TestSaveUploadFile:
         
         result2 = save_upload_file(file2)
         
+        assert result1 != result2
+        assert len(os.listdir(Config.UPLOAD_FOLDER)) == 2
+
+    def test_save_upload_file_deduplicates_content(self, upload_folder):
+        """Contenido idéntico se guarda una sola vez bajo la misma URL"""
+        file_content = b'\x89PNG\r\n\x1a\n' + b'\x00' * 50
+        
+        result1 = save_upload_file(create_file_storage(file_content, 'menu.png'))
+        result2 = save_upload_file(create_file_storage(file_content, 'otro_nombre.PNG'))
+        
         assert result1 == result2
-        assert os.path.exists(os.path.join(Config.UPLOAD_FOLDER, 'same_name.png'))
+        assert os.listdir(Config.UPLOAD_FOLDER) == [result1.rsplit('/', 1)[1]]
+
+    def test_save_upload_file_duplicate_renews_mtime(self, upload_folder):
+        """Un duplicado renueva la fecha del archivo para que el barrido no lo retire"""
+        file_content = b'\x89PNG\r\n\x1a\n' + b'\x00' * 50
+        url = save_upload_file(create_file_storage(file_content, 'menu.png'))
+        path = os.path.join(Config.UPLOAD_FOLDER, url.rsplit('/', 1)[1])
+        os.utime(path, (0, 0))
+
+        save_upload_file(create_file_storage(file_content, 'otra.png'))
+
+        assert os.path.getmtime(path) > 0
 
     def test_save_upload_file_empty_file(self, upload_folder):
-        """Maneja archivos vacíos"""
+        """Rechaza archivos vacíos (no son una imagen válida)"""
         file_content = b''
         file = create_file_storage(file_content, 'empty.png')
         
         result = save_upload_file(file)
         
-        # Debería guardar el archivo aunque esté vacío
-        assert result == "/uploads/empty.png"
+        assert result == ""
+        assert os.listdir(Config.UPLOAD_FOLDER) == []
+
+    def test_save_upload_file_type_from_content(self, upload_folder):
+        """La extensión se determina por el contenido y no por el nombre"""
+        file_content = b'\x89PNG\r\n\x1a\n' + b'\x00' * 50
+        file = create_file_storage(file_content, 'foto.jpg')
+        
+        result = save_upload_file(file)
+        
+        assert result == expected_url(file_content, 'png')
+
+    def test_save_upload_file_rejects_non_image_content(self, upload_folder):
+        """Rechaza contenido que no es una imagen aunque la extensión sea válida"""
+        file = create_file_storage(b'<?php echo "hola"; ?>', 'shell.png')
+        
+        result = save_upload_file(file)
+        
+        assert result == ""
+        assert os.listdir(Config.UPLOAD_FOLDER) == []
+
+    def test_save_upload_file_too_large(self, upload_folder, monkeypatch):
+        """Rechaza archivos que exceden el tamaño máximo sin dejar temporales"""
+        monkeypatch.setattr(Config, "MAX_UPLOAD_SIZE", 1024)
+        file = create_file_storage(b'\x89PNG\r\n\x1a\n' + b'\x00' * 200 * 1024, 'big.png')
+        
+        with pytest.raises(RequestEntityTooLarge):
+            save_upload_file(file)
+        
+        assert os.listdir(Config.UPLOAD_FOLDER) == []
+
+    def test_save_upload_file_at_size_limit(self, upload_folder, monkeypatch):
+        """Acepta archivos exactamente del tamaño máximo"""
+        file_content = b'\x89PNG\r\n\x1a\n' + b'\x00' * (300 * 1024 - 8)
+        monkeypatch.setattr(Config, "MAX_UPLOAD_SIZE", len(file_content))
+        
+        result = save_upload_file(create_file_storage(file_content, 'limit.png'))
+        
+        assert result == expected_url(file_content, 'png')
+        assert os.path.getsize(os.path.join(Config.UPLOAD_FOLDER, result.rsplit('/', 1)[1])) == len(file_content)
 
 
 class TestUploadEndpoint:
@@ -312,6 +378,95 @@ class TestUploadEndpoint:
         assert response.status_code in [200, 404]
 
 
+class TestUploadDelivery:
+    """Tests para peticiones condicionales, Range y delegación al proxy"""
+
+    def save_png(self, size=1000):
+        """Helper que guarda un PNG direccionado por contenido"""
+        file_content = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * (size // 256)
+        return save_upload_file(create_file_storage(file_content, 'foto.png')), file_content
+
+    def test_etag_is_content_hash(self, client, upload_folder):
+        """El ETag de un archivo direccionado por contenido es su hash"""
+        url, content = self.save_png()
+        
+        response = client.get(url)
+        
+        assert response.headers["ETag"] == f'"{hashlib.sha256(content).hexdigest()}"'
+        assert "Last-Modified" in response.headers
+
+    def test_if_none_match_returns_304(self, client, upload_folder):
+        """Retorna 304 sin cuerpo si el ETag coincide"""
+        url, _ = self.save_png()
+        etag = client.get(url).headers["ETag"]
+        
+        response = client.get(url, headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_if_modified_since_returns_304(self, client, upload_folder):
+        """Retorna 304 si el archivo no cambió desde la fecha indicada"""
+        url, _ = self.save_png()
+        last_modified = client.get(url).headers["Last-Modified"]
+        
+        response = client.get(url, headers={"If-Modified-Since": last_modified})
+        
+        assert response.status_code == 304
+
+    def test_range_request(self, client, upload_folder):
+        """Soporta peticiones parciales con Range"""
+        url, content = self.save_png()
+        
+        response = client.get(url, headers={"Range": "bytes=8-15"})
+        
+        assert response.status_code == 206
+        assert response.data == content[8:16]
+        assert response.headers["Content-Range"] == f"bytes 8-15/{len(content)}"
+
+    def test_legacy_file_has_etag(self, client, upload_folder):
+        """Los archivos con nombre antiguo también soportan 304"""
+        (upload_folder / 'antiguo.png').write_bytes(b'\x89PNG\r\n\x1a\n')
+        etag = client.get("/uploads/antiguo.png").headers["ETag"]
+        
+        response = client.get("/uploads/antiguo.png", headers={"If-None-Match": etag})
+        
+        assert response.status_code == 304
+
+    def test_x_accel_redirect(self, client, upload_folder, monkeypatch):
+        """Delega la transferencia a nginx con X-Accel-Redirect"""
+        monkeypatch.setattr(Config, "UPLOAD_OFFLOAD", "x-accel-redirect")
+        url, _ = self.save_png()
+        filename = url.rsplit('/', 1)[1]
+        
+        response = client.get(url)
+        
+        assert response.status_code == 200
+        assert response.data == b""
+        assert response.headers["X-Accel-Redirect"] == f"/_protected_uploads/{filename}"
+        assert response.mimetype == "image/png"
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_x_sendfile(self, client, upload_folder, monkeypatch):
+        """Delega la transferencia con X-Sendfile usando la ruta absoluta"""
+        monkeypatch.setattr(Config, "UPLOAD_OFFLOAD", "x-sendfile")
+        url, _ = self.save_png()
+        
+        response = client.get(url)
+        
+        assert response.data == b""
+        assert response.headers["X-Sendfile"] == str(upload_folder / url.rsplit('/', 1)[1])
+
+    def test_offload_missing_file(self, client, upload_folder, monkeypatch):
+        """Retorna 404 sin delegar si el archivo no existe"""
+        monkeypatch.setattr(Config, "UPLOAD_OFFLOAD", "x-accel-redirect")
+        
+        response = client.get("/uploads/nonexistent.png")
+        
+        assert response.status_code == 404
+        assert "X-Accel-Redirect" not in response.headers
+
+
 class TestUploadIntegration:
     """Tests de integración para flujos completos"""
 
@@ -323,7 +478,7 @@ class TestUploadIntegration:
         
         # Guardar
         save_path = save_upload_file(file)
-        assert save_path == "/uploads/integration_test.png"
+        assert save_path == expected_url(file_content, 'png')
         
         # Descargar
         response = client.get(save_path)
@@ -349,8 +504,8 @@ class TestUploadIntegration:
             response = client.get(result)
             assert response.status_code == 200
 
-    def test_upload_overwrites_previous(self, client, upload_folder):
-        """Archivos con mismo nombre sobrescriben anteriores"""
+    def test_upload_same_name_keeps_both(self, client, upload_folder):
+        """Archivos con mismo nombre y distinto contenido conviven"""
         # Primer upload
         file_content1 = b'\x89PNG\r\n\x1a\n' + b'A' * 50
         file1 = create_file_storage(file_content1, 'overwrite_test.png')
@@ -361,11 +516,44 @@ class TestUploadIntegration:
         file2 = create_file_storage(file_content2, 'overwrite_test.png')
         result2 = save_upload_file(file2)
         
-        assert result1 == result2
+        assert result1 != result2
+        
+        # Cada URL retorna su propio contenido
+        assert client.get(result1).data == file_content1
+        assert client.get(result2).data == file_content2
+
+    def test_content_addressed_upload_is_immutable(self, client, upload_folder):
+        """Los archivos direccionados por contenido se cachean indefinidamente"""
+        file = create_file_storage(b'\x89PNG\r\n\x1a\n' + b'\x00' * 50, 'cache.png')
+        
+        response = client.get(save_upload_file(file))
         
-        # Descargar debería retornar el segundo archivo
-        response = client.get(result1)
         assert response.status_code == 200
+        assert "immutable" in response.headers["Cache-Control"]
+        assert "max-age=31536000" in response.headers["Cache-Control"]
+
+
+    def test_post_place_with_oversized_image(self, client, upload_folder, monkeypatch):
+        """POST /api/places con una imagen demasiado grande retorna 413"""
+        monkeypatch.setattr(Config, "MAX_UPLOAD_SIZE", 1024)
+        data = {
+            'name': 'Lugar',
+            'category': 'Snacks',
+            'image': (BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 4096), 'grande.png')
+        }
+        
+        response = client.post("/api/places", data=data, content_type='multipart/form-data')
+        
+        assert response.status_code == 413
+
+    def test_request_body_rejected_early(self, app, client, upload_folder):
+        """Cuerpos mayores a MAX_CONTENT_LENGTH se rechazan antes de procesarlos"""
+        app.config['MAX_CONTENT_LENGTH'] = 1024
+        data = {'name': 'Lugar', 'image': (BytesIO(b'\x00' * 4096), 'grande.png')}
+        
+        response = client.post("/api/places", data=data, content_type='multipart/form-data')
+        
+        assert response.status_code == 413
 
 
 class TestUploadEdgeCases:
@@ -378,7 +566,7 @@ class TestUploadEdgeCases:
         
         result = save_upload_file(file)
         
-        assert result == "/uploads/large_image.png"
+        assert result == expected_url(large_content, 'png')
 
     def test_filename_with_multiple_extensions(self, upload_folder):
         """Maneja nombres con múltiples puntos"""
@@ -387,7 +575,7 @@ class TestUploadEdgeCases:
         
         result = save_upload_file(file)
         
-        assert result == "/uploads/image.backup.png"
+        assert result == expected_url(file_content, 'png')
 
     def test_filename_with_spaces(self, upload_folder):
         """Maneja nombres con espacios"""